@@ -1,10 +1,12 @@
-from typing import List
+from typing import Any, Dict, List
 from fastapi import APIRouter, Depends
 
 from app.models.chat import ChatCreate, ChatOut, MessageCreate, MessageOut
 from app.schemas.chat_api import ChatTurnResponse
 from app.services.chat import ChatService
-from app.core.dependencies import get_chat_service
+from app.services.llm_cache import LLMResponseCache
+from app.services.sandbox_pool import SandboxMetrics
+from app.core.dependencies import get_chat_service, get_llm_response_cache, get_sandbox_metrics
 
 router = APIRouter()
 
@@ -43,4 +45,22 @@ async def get_messages(
     chat_svc: ChatService = Depends(get_chat_service)
 ):
     """Get all messages for a chat."""
-    return chat_svc.get_messages(chat_id)
\ No newline at end of file
+    return chat_svc.get_messages(chat_id)
+
+
+@router.get("/sandbox/metrics", response_model=Dict[str, Any])
+async def get_sandbox_metrics_summary(
+    metrics: SandboxMetrics = Depends(get_sandbox_metrics),
+):
+    """Return exit reasons and p50/p95 worker wait, wall time, CPU time and peak RSS of recent sandbox runs."""
+    return metrics.summary()
+
+
+@router.get("/cache/llm", response_model=Dict[str, Any])
+async def get_llm_cache_stats(
+    cache: LLMResponseCache | None = Depends(get_llm_response_cache),
+):
+    """Return hit/miss/bypass counters of the structured LLM response cache."""
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
@@ -1,10 +1,12 @@
 from typing import Any, Dict, List
 
-from fastapi import APIRouter, Depends, File, UploadFile, Form
+from fastapi import APIRouter, Depends, File, UploadFile, Form, Query
+from fastapi.responses import Response, StreamingResponse
 
-from app.models.datasets import DatasetOut, DatasetSchema
+from app.models.datasets import DatasetOut, DatasetSchema, PipelineJobOut
+from app.services.data_pipeline.metrics import PipelineMetricsRegistry
 from app.services.datasets import DatasetService
-from app.core.dependencies import get_dataset_service
+from app.core.dependencies import get_dataset_service, get_pipeline_metrics_registry
 
 
 router = APIRouter()
@@ -12,10 +14,18 @@ router = APIRouter()
 
 @router.post("/datasets", response_model=DatasetOut, status_code=201)
 async def upload_dataset(
-    file: UploadFile = File(...), ds_svc: DatasetService = Depends(get_dataset_service)
+    file: UploadFile = File(...),
+    missing_tokens: str | None = Form(None),
+    ds_svc: DatasetService = Depends(get_dataset_service),
 ):
-    """Upload a tabular dataset file (csv, xlsx, parquet, json)."""
-    created = ds_svc.create_from_upload(file)
+    """Upload a tabular dataset file (csv, xlsx, parquet, json).
+
+    Returns immediately; the data pipeline runs in the background under `pipeline_job_id`.
+    `missing_tokens` is an optional comma-separated list that replaces the default
+    missing-value markers (e.g. "n/a,-,?") for this dataset.
+    """
+    tokens = None if missing_tokens is None else [token.strip() for token in missing_tokens.split(",")]
+    created = ds_svc.create_from_upload(file, missing_tokens=tokens)
     return created
 
 
@@ -60,18 +70,76 @@ async def get_dataset_schema(
     return ds_svc.infer_schema(dataset_id)
 
 
-@router.get("/datasets/{dataset_id}/preview", response_model=List[List])
+@router.get("/datasets/{dataset_id}/pipeline-status", response_model=PipelineJobOut)
+async def get_pipeline_status(
+    dataset_id: str, ds_svc: DatasetService = Depends(get_dataset_service)
+):
+    """Return the background pipeline job status with per-step progress and timing."""
+    return ds_svc.get_pipeline_status(dataset_id)
+
+
+@router.get(
+    "/datasets/{dataset_id}/preview",
+    response_class=Response,
+    responses={
+        200: {
+            "description": "Rows as a JSON array of arrays, the column names first",
+            "content": {"application/json": {"schema": {"type": "array", "items": {"type": "array", "items": {}}}}},
+        }
+    },
+)
 async def get_dataset_preview(
     dataset_id: str,
-    limit: int = 100,
+    limit: int = Query(100, ge=0),
+    offset: int = Query(0, ge=0),
     use_cleaned: bool = False,
+    columns: List[str] | None = Query(None),
     ds_svc: DatasetService = Depends(get_dataset_service),
 ):
-    """Return a preview of the dataset data (columns + top rows)."""
-    return ds_svc.get_preview_data(dataset_id, limit, use_cleaned=use_cleaned)
+    """Return a page of the dataset data (columns + `limit` rows from row `offset`).
+
+    Pass `columns` (repeatable) to read and return only those columns. The total row
+    count is sent in the `X-Total-Count` header; the first page of a raw CSV/JSON Lines
+    file omits it rather than scanning the whole file, later pages always have it.
+    """
+    body, row_count = ds_svc.get_preview_data(
+        dataset_id, limit, use_cleaned=use_cleaned, columns=columns, offset=offset
+    )
+    headers = {} if row_count is None else {"X-Total-Count": str(row_count)}
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/datasets/{dataset_id}/export")
+async def export_dataset_csv(
+    dataset_id: str,
+    use_cleaned: bool = True,
+    ds_svc: DatasetService = Depends(get_dataset_service),
+):
+    """Download the dataset as CSV; the cleaned data is converted from Parquet on demand."""
+    filename, chunks = ds_svc.export_csv(dataset_id, use_cleaned=use_cleaned)
+    return StreamingResponse(
+        chunks,
+        media_type="text/csv",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
 
 @router.get("/datasets/{dataset_id}/quality-report", response_model=Dict[str, Any])
 async def get_quality_report(
     dataset_id: str, ds_svc: DatasetService = Depends(get_dataset_service)
 ):
     return ds_svc.get_quality_report(dataset_id)
+
+
+@router.get("/cache/dataframes", response_model=Dict[str, Any])
+async def get_dataframe_cache_stats(ds_svc: DatasetService = Depends(get_dataset_service)):
+    """Return hit/miss/eviction counters and memory use of the loaded-DataFrame cache."""
+    return ds_svc.frame_cache_stats()
+
+
+@router.get("/pipeline/metrics", response_model=Dict[str, Any])
+async def get_pipeline_metrics_summary(
+    metrics: PipelineMetricsRegistry = Depends(get_pipeline_metrics_registry),
+):
+    """Return p50/p95 wall time, CPU time and memory per pipeline step over recent runs."""
+    return metrics.summary()
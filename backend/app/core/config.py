@@ -7,10 +7,43 @@ from dotenv import load_dotenv
 @dataclass
 class Settings:
     storage_dir: Path = Path("./storage")
-    max_upload_size: int = 50 * 1024 * 1024  # 50 MB
+    max_upload_size: int = 10 * 1024 * 1024 * 1024  # 10 GB, checked on upload and update; large CSVs use the streaming pipeline
     allowed_extensions: tuple = (".csv", ".xlsx", ".parquet", ".json")
     database_url: str = "sqlite:///./mnemos.db"
     openai_model_name: str = "gpt-4o-mini"
+    ingest_engine: str = "pyarrow"  # pyarrow | c | python
+    pipeline_max_workers: int = 4
+    pipeline_column_executor: str = "thread"  # thread | process | none
+    pipeline_column_workers: int = 4
+    pipeline_trace_memory: bool = False  # tracemalloc per step; slows the pipeline noticeably
+    pipeline_job_workers: int = 2  # uploads processed concurrently
+    pipeline_job_queue_size: int = 16  # queued uploads before new ones are rejected
+    pipeline_job_history: int = 1000  # finished jobs kept for status polls; older ones are dropped
+    pipeline_streaming_min_bytes: int = 256 * 1024 * 1024  # CSV uploads from this size are processed in chunks
+    pipeline_streaming_chunk_rows: int = 100_000  # rows per chunk; bounds streaming memory
+    cleaned_row_group_size: int = 10_000  # rows per Parquet row group; previews read only the first groups
+    row_index_stride: int = 1_000  # CSV/JSON Lines row offsets kept per this many rows for paginated reads
+    dataframe_cache_max_bytes: int = 512 * 1024 * 1024  # loaded frames kept in memory; 0 disables
+    pipeline_cache_enabled: bool = True  # reuse results for uploads with identical content
+    pipeline_cache_max_age_seconds: int = 7 * 24 * 3600
+    pipeline_cache_max_bytes: int = 1024 * 1024 * 1024  # 1 GB
+    pipeline_outlier_isolation: bool = False  # also run the isolation-forest detector in outlier_analysis
+    pipeline_outlier_sample_rows: int = 1_000_000  # outlier thresholds are fitted on a row sample above this; 0 disables
+    sandbox_pool_size: int = 2  # warm workers for generated analysis code; 0 starts an interpreter per run
+    sandbox_timeout_seconds: int = 30
+    sandbox_stdout_limit: int = 4096  # characters of output kept per run
+    sandbox_stderr_limit: int = 2048
+    # Per-run resource limits; 0 disables a limit
+    sandbox_cpu_seconds: int = 30
+    sandbox_memory_limit_bytes: int = 2 * 1024 * 1024 * 1024  # address space a run may add to its worker's
+    sandbox_max_file_bytes: int = 64 * 1024 * 1024  # largest file a run may write
+    sandbox_max_processes: int = 16  # processes a run may start
+    llm_cache_enabled: bool = True  # reuse structured LLM responses for identical prompts
+    llm_cache_max_entries: int = 1024  # responses kept in memory and in the SQLite file
+    llm_cache_sqlite: bool = False  # also keep responses in storage_dir/llm_cache.sqlite3 across restarts
+    llm_cache_ttl_seconds: int = 24 * 3600
+    llm_cache_max_temperature: float = 0.3  # calls sampled above this temperature are never cached
+    profiler_approx_row_threshold: int = 5_000_000  # profile with sketches from this many rows; 0 disables
 
 
 @lru_cache()
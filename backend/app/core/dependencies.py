@@ -3,6 +3,9 @@ from app.core.config import get_settings
 from app.services.storage import StorageService
 from app.services.datasets import DatasetService
 from app.services.chat import ChatService
+from app.services.data_pipeline.metrics import PipelineMetricsRegistry, get_pipeline_metrics
+from app.services.llm_cache import LLMResponseCache, get_llm_cache
+from app.services.sandbox_pool import SandboxMetrics, get_sandbox_pool
 
 
 @lru_cache()
@@ -22,3 +25,18 @@ def get_chat_service() -> ChatService:
     settings = get_settings()
     dataset_service = get_dataset_service()
     return ChatService(dataset_service=dataset_service, storage_dir=settings.storage_dir)
+
+
+def get_pipeline_metrics_registry() -> PipelineMetricsRegistry:
+    # Shared with build_default_pipeline, which records into the same registry
+    return get_pipeline_metrics()
+
+
+def get_sandbox_metrics() -> SandboxMetrics:
+    # Kept by the shared pool that chat runs execute their code on
+    return get_sandbox_pool().metrics
+
+
+def get_llm_response_cache() -> LLMResponseCache | None:
+    # The cache LLMService instances of chat runs share; None when disabled
+    return get_llm_cache()
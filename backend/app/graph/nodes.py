@@ -5,8 +5,6 @@ from pathlib import Path
 import mimetypes
 import re
 import shutil
-import subprocess
-import sys
 import tempfile
 
 from langgraph.types import interrupt
@@ -22,11 +20,20 @@ from app.schemas.agent import (
     ArtifactType,
     SandboxResult,
 )
+from app.services.code_columns import required_columns
 from app.services.dataset_profiler import DatasetProfiler
+from app.services.dataset_snapshots import snapshot_columns
 from app.services.datasets import DatasetService
 from app.services.llm_service import LLMService
+from app.services.sandbox_pool import SandboxPool, get_sandbox_pool
 from app.state.workflow import WorkflowState
 
+_LIMIT_MESSAGES = {
+    "cpu_limit": "Sandbox execution exceeded its CPU time limit.",
+    "memory_limit": "Sandbox execution exceeded its memory limit.",
+    "file_size_limit": "Sandbox execution exceeded its file size limit.",
+}
+
 
 @dataclass
 class GraphDependencies:
@@ -36,6 +43,7 @@ class GraphDependencies:
     renderer: ChartRenderer
     policies: AgentPolicyEngine
     storage_dir: Path
+    sandbox: SandboxPool | None = None
 
 
 class AnalysisNodes:
@@ -66,15 +74,14 @@ class AnalysisNodes:
             "should_request_clarification": False,
             "spec_revision_context": [],
             "free_code_spec": None,
+            "free_code_cache_key": None,
             "sandbox_result": None,
             "code_review_result": None,
             "sandbox_attempts": 0,
         }
 
     def profile_dataset(self, state: WorkflowState) -> dict:
-        dataset_meta = self.deps.dataset_service.get(state.dataset_id)
-        df = self.deps.dataset_service._load_dataframe(dataset_meta, use_cleaned=True)
-        profile, schema = self.deps.profiler.profile(state.dataset_id, df)
+        profile, schema = self.deps.dataset_service.get_profile(state.dataset_id, self.deps.profiler)
         return {
             "dataset_profile": profile,
             "dataset_schema": schema,
@@ -262,7 +269,10 @@ class AnalysisNodes:
         if state.chart_spec is None:
             raise ValueError("chart_spec is required before render_artifact")
         dataset_meta = self.deps.dataset_service.get(state.dataset_id)
-        df = self.deps.dataset_service._load_dataframe(dataset_meta, use_cleaned=True)
+        # The chart only needs the columns its spec names
+        spec = state.chart_spec
+        columns = [name for name in (spec.x_column, spec.y_column, spec.color_by) if name]
+        df = self.deps.dataset_service._load_dataframe(dataset_meta, use_cleaned=True, columns=columns)
         output_path = self.deps.storage_dir / "images" / str(state.chat_id or "adhoc") / f"{state.request_id}.png"
         artifact = self.deps.renderer.render(state.chart_spec, df, str(output_path))
         relative_path = output_path.relative_to(self.deps.storage_dir)
@@ -275,14 +285,11 @@ class AnalysisNodes:
     def generate_free_code(self, state: WorkflowState) -> dict:
         if state.analysis_plan is None or state.dataset_profile is None:
             raise ValueError("analysis_plan and dataset_profile are required before generate_free_code")
-        free_code_spec = self.deps.llm_service.generate_free_code(
-            state.user_question,
-            state.analysis_plan,
-            state.dataset_profile,
-            state.spec_revision_context,
-        )
+        arguments = (state.user_question, state.analysis_plan, state.dataset_profile, state.spec_revision_context)
+        free_code_spec = self.deps.llm_service.generate_free_code(*arguments)
         return {
             "free_code_spec": free_code_spec,
+            "free_code_cache_key": self.deps.llm_service.free_code_cache_key(*arguments),
             "sandbox_result": None,
             "code_review_result": None,
         }
@@ -290,53 +297,45 @@ class AnalysisNodes:
     def execute_sandbox(self, state: WorkflowState) -> dict:
         if state.free_code_spec is None:
             raise ValueError("free_code_spec is required before execute_sandbox")
-        dataset_meta = self.deps.dataset_service.get(state.dataset_id)
-        df = self.deps.dataset_service._load_dataframe(dataset_meta, use_cleaned=True)
+        # The snapshot is written once per dataset version and reused by retries
+        snapshot_path, dataset_key = self.deps.dataset_service.sandbox_snapshot(state.dataset_id)
+        # Only the columns the code reads are loaded; None (analysis inconclusive) loads all
+        columns = required_columns(state.free_code_spec.code, snapshot_columns(snapshot_path))
+        sandbox = self.deps.sandbox or get_sandbox_pool()
 
         with tempfile.TemporaryDirectory() as tmpdir:
             tmp_path = Path(tmpdir)
-            dataset_parquet = tmp_path / "dataset.parquet"
-            df.to_parquet(str(dataset_parquet), index=False)
-
             artifact_filename = state.free_code_spec.artifact_filename or "artifact.png"
             sandbox_artifact_path = tmp_path / artifact_filename
 
-            preamble = (
-                "import pandas as pd\n"
-                "import numpy as np\n"
-                "import matplotlib\n"
-                "matplotlib.use('Agg')\n"
-                "import matplotlib.pyplot as plt\n"
-                f"df = pd.read_parquet({str(dataset_parquet)!r})\n"
-                f"OUTPUT_PATH = {str(sandbox_artifact_path)!r}\n"
+            run = sandbox.run(
+                state.free_code_spec.code, tmp_path, snapshot_path, dataset_key, sandbox_artifact_path, columns
             )
-            full_code = preamble + "\n" + state.free_code_spec.code
-            code_file = tmp_path / "sandbox_code.py"
-            code_file.write_text(full_code, encoding="utf-8")
-
-            try:
-                proc = subprocess.run(
-                    [sys.executable, str(code_file)],
-                    capture_output=True,
-                    text=True,
-                    timeout=30,
-                    cwd=str(tmp_path),
-                )
-                success = proc.returncode == 0
-                stdout = proc.stdout[:4096]
-                stderr = proc.stderr[:2048]
-                exit_code = proc.returncode
-            except subprocess.TimeoutExpired:
+            usage = {
+                "exit_reason": run.exit_reason,
+                "wall_time_seconds": run.wall_seconds,
+                "cpu_time_seconds": run.cpu_seconds,
+                "peak_rss_bytes": run.peak_rss_bytes,
+            }
+            if run.timed_out:
                 return {
                     "sandbox_result": SandboxResult(
                         success=False,
                         stdout="",
-                        stderr="Sandbox execution timed out after 30 seconds.",
+                        stderr=f"Sandbox execution timed out after {sandbox.timeout_seconds:g} seconds.",
                         exit_code=-1,
+                        **usage,
                     ),
                     "sandbox_attempts": state.sandbox_attempts + 1,
                     "artifacts": [],
                 }
+            success = run.exit_code == 0
+            stdout = run.stdout
+            stderr = run.stderr
+            exit_code = run.exit_code
+            if run.exit_reason in _LIMIT_MESSAGES:
+                # A limit may end the run without a traceback; say which one was hit
+                stderr = f"{stderr}\n{_LIMIT_MESSAGES[run.exit_reason]}".lstrip()
 
             public_path: str | None = None
             artifacts: list[ArtifactRef] = []
@@ -366,6 +365,7 @@ class AnalysisNodes:
                 stderr=stderr,
                 artifact_path=public_path,
                 exit_code=exit_code,
+                **usage,
             ),
             "sandbox_attempts": state.sandbox_attempts + 1,
             "artifacts": artifacts,
@@ -380,6 +380,9 @@ class AnalysisNodes:
             state.free_code_spec,
             state.sandbox_result,
         )
+        if not review.approved and state.free_code_cache_key:
+            # Rejected code must not be served again, neither to the retry nor when re-asked
+            self.deps.llm_service.discard_cached(state.free_code_cache_key)
         revision_hints = [issue.message for issue in review.issues]
         if review.revision_hint:
             revision_hints.append(review.revision_hint)
@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 import logging
 
 from fastapi import FastAPI
@@ -7,11 +8,21 @@ from fastapi.staticfiles import StaticFiles
 from app.api.v1 import datasets as datasets_router
 from app.api.v1 import chat as chat_router
 from app.core.config import get_settings
+from app.services.sandbox_pool import get_sandbox_pool
 
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s:%(name)s:%(message)s")
 
-app = FastAPI(title="mnemos API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Sandbox workers import the scientific stack before the first analysis request
+    sandbox = get_sandbox_pool()
+    sandbox.start()
+    yield
+    sandbox.close()
+
+
+app = FastAPI(title="mnemos API", lifespan=lifespan)
 settings = get_settings()
 
 
@@ -21,6 +32,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count"],
 )
 
 
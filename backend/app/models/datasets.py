@@ -1,7 +1,7 @@
 from datetime import datetime
 from enum import Enum
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 from sqlmodel import SQLModel, Field as SQLField
 
 
@@ -34,6 +34,8 @@ class DatasetOut(BaseModel):
     status: DatasetStatus
     created_at: datetime
     storage_key: str
+    pipeline_job_id: Optional[str] = None
+    content_hash: Optional[str] = None
 
 
 class DatasetUpdate(BaseModel):
@@ -42,3 +44,40 @@ class DatasetUpdate(BaseModel):
 
 class DatasetCreateResult(BaseModel):
     dataset: DatasetOut
+
+
+class PipelineJobStatus(str, Enum):
+    queued = "queued"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+
+
+class PipelineStepStatus(str, Enum):
+    pending = "pending"
+    running = "running"
+    completed = "completed"
+    skipped = "skipped"
+    failed = "failed"
+    cached = "cached"
+
+
+class PipelineStepProgress(BaseModel):
+    name: str
+    status: PipelineStepStatus = PipelineStepStatus.pending
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    duration_ms: Optional[float] = None
+
+
+class PipelineJobOut(BaseModel):
+    job_id: str
+    dataset_id: str
+    status: PipelineJobStatus
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    steps: List[PipelineStepProgress]
+    completed_steps: int = 0
+    total_steps: int = 0
+    error: Optional[str] = None
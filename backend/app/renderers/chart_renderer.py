@@ -84,15 +84,17 @@ class ChartRenderer:
         plt.close(fig)
 
     def _prepare_categorical_frame(self, spec: ChartSpec, df: pd.DataFrame) -> pd.DataFrame:
+        # observed=True: cleaned text columns load as category, and categories without rows
+        # must not show up as empty bars
         if spec.y_column is None:
-            grouped = df.groupby(spec.x_column, dropna=False).size().reset_index(name="_value")
+            grouped = df.groupby(spec.x_column, dropna=False, observed=True).size().reset_index(name="_value")
         elif spec.aggregation is None:
             grouped = df[[spec.x_column, spec.y_column]].dropna().rename(columns={spec.y_column: "_value"})
         else:
             grouped = (
                 df[[spec.x_column, spec.y_column]]
                 .dropna()
-                .groupby(spec.x_column, dropna=False)[spec.y_column]
+                .groupby(spec.x_column, dropna=False, observed=True)[spec.y_column]
                 .agg(spec.aggregation.value)
                 .reset_index(name="_value")
             )
@@ -75,6 +75,14 @@ class CategoryValue(BaseModel):
     ratio: float
 
 
+class SketchErrorBounds(BaseModel):
+    # Bounds for approximate profiles: relative std error of unique_count, normalized rank
+    # error of the median, and the most any top_categories count can be under the true count.
+    unique_count_relative_error: float
+    median_rank_error: float | None = None
+    top_category_count_error: int | None = None
+
+
 class ColumnProfile(BaseModel):
     name: str
     dtype: str
@@ -87,6 +95,8 @@ class ColumnProfile(BaseModel):
     top_categories: list[CategoryValue] = Field(default_factory=list)
     visualization_hints: list[str] = Field(default_factory=list)
     issues: list[str] = Field(default_factory=list)
+    approximate: bool = False
+    error_bounds: SketchErrorBounds | None = None
 
 
 class DatasetProfile(BaseModel):
@@ -164,6 +174,11 @@ class SandboxResult(BaseModel):
     stderr: str = ""
     artifact_path: str | None = None
     exit_code: int = 0
+    # Why the run ended (ok, error, timeout or the resource limit it hit) and what it used
+    exit_reason: str | None = None
+    wall_time_seconds: float | None = None
+    cpu_time_seconds: float | None = None
+    peak_rss_bytes: int | None = None
 
 
 class CodeReviewResult(BaseModel):
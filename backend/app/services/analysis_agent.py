@@ -15,6 +15,7 @@ from app.schemas.agent import ChatHistoryItem, FinalResponse, InterruptKind
 from app.schemas.chat_api import InterruptPayload
 from app.services.dataset_profiler import DatasetProfiler
 from app.services.datasets import DatasetService
+from app.services.llm_cache import get_llm_cache
 from app.services.llm_service import LLMService
 from app.state.workflow import WorkflowState
 
@@ -40,7 +41,7 @@ class AnalysisAgentService:
         deps = GraphDependencies(
             dataset_service=dataset_service,
             profiler=profiler or DatasetProfiler(),
-            llm_service=llm_service or LLMService(),
+            llm_service=llm_service or LLMService(cache=get_llm_cache()),
             renderer=renderer or ChartRenderer(),
             policies=policies or AgentPolicyEngine(),
             storage_dir=storage_dir,
@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import ast
+from dataclasses import dataclass, field
+from typing import Collection, Dict, List, Optional, Set
+
+FRAME_NAME = "df"
+
+# Methods that return the frame's rows in some order or subset, computed only from the
+# columns named in their arguments
+_ROW_METHODS = {
+    "copy",
+    "head",
+    "tail",
+    "sample",
+    "reset_index",
+    "set_index",
+    "sort_values",
+    "sort_index",
+    "nlargest",
+    "nsmallest",
+}
+# Row methods that look at every column unless given a subset
+_SUBSET_METHODS = {"dropna", "drop_duplicates", "duplicated"}
+# Group-by results that do not aggregate the remaining columns
+_GROUP_ATTRIBUTES = {"size", "ngroups", "groups", "indices", "ngroup"}
+# Calls that only count the frame's rows
+_ROW_COUNT_FUNCTIONS = {"len"}
+# Series methods and ``.str`` methods that return a boolean row mask
+_MASK_METHODS = {"isin", "between", "notna", "notnull", "isna", "isnull", "duplicated", "eq", "ne", "lt", "le", "gt", "ge"}
+_STR_MASK_METHODS = {
+    "contains",
+    "startswith",
+    "endswith",
+    "match",
+    "fullmatch",
+    "isalnum",
+    "isalpha",
+    "isdigit",
+    "isdecimal",
+    "isnumeric",
+    "isspace",
+    "islower",
+    "isupper",
+    "istitle",
+}
+
+
+@dataclass
+class ColumnUse:
+    """Columns code reads from the frame; ``complete`` is False when it may read any other one."""
+
+    columns: Set[str] = field(default_factory=set)
+    complete: bool = True
+
+
+class _FrameUseVisitor:
+    # Follows every use of the frame (and names assigned from it) up the syntax tree; a use
+    # that is not a known column access makes the analysis incomplete.
+
+    def __init__(self, tree: ast.AST, frame: str, known: Collection[str]):
+        self.known = set(known)
+        self.use = ColumnUse()
+        self.parents: Dict[ast.AST, ast.AST] = {
+            child: node for node in ast.walk(tree) for child in ast.iter_child_nodes(node)
+        }
+        self.assignments: Dict[str, List[ast.AST]] = {}
+        for node in ast.walk(tree):
+            if isinstance(node, (ast.Assign, ast.AnnAssign, ast.AugAssign)):
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                for target in targets:
+                    for name in ast.walk(target):
+                        if isinstance(name, ast.Name):
+                            # Unpacking assigns parts of the value; treat them as unknown
+                            value = node.value if target is name else None
+                            self.assignments.setdefault(name.id, []).append(value)
+            elif isinstance(node, (ast.For, ast.comprehension, ast.withitem, ast.NamedExpr)):
+                target = node.optional_vars if isinstance(node, ast.withitem) else node.target
+                iterable = getattr(node, "iter", None)
+                for name in ast.walk(target) if target is not None else ():
+                    if isinstance(name, ast.Name):
+                        values = iterable.elts if isinstance(iterable, (ast.List, ast.Tuple)) and target is name else [None]
+                        self.assignments.setdefault(name.id, []).extend(values)
+        self.frames = {frame}
+        self.tree = tree
+
+    def run(self) -> ColumnUse:
+        visited: Set[str] = set()
+        while self.frames - visited:
+            name = next(iter(self.frames - visited))
+            visited.add(name)
+            for node in ast.walk(self.tree):
+                if isinstance(node, ast.Name) and node.id == name and not isinstance(node.ctx, ast.Store):
+                    self._frame(node)
+        return self.use
+
+    def _incomplete(self) -> None:
+        self.use.complete = False
+
+    def _frame(self, node: ast.AST) -> None:
+        # ``node`` evaluates to the frame, possibly with fewer rows
+        parent = self.parents.get(node)
+        if isinstance(parent, ast.Subscript) and parent.value is node:
+            self._subscript(parent)
+        elif isinstance(parent, ast.Attribute) and parent.value is node:
+            self._attribute(parent)
+        elif (
+            isinstance(parent, ast.Call)
+            and node in parent.args
+            and isinstance(parent.func, ast.Name)
+            and parent.func.id in _ROW_COUNT_FUNCTIONS
+        ):
+            return
+        elif isinstance(parent, ast.Assign) and parent.value is node and all(
+            isinstance(target, ast.Name) for target in parent.targets
+        ):
+            self.frames.update(target.id for target in parent.targets)
+        else:
+            self._incomplete()
+
+    def _subscript(self, node: ast.Subscript) -> None:
+        key = node.slice
+        names = _string_list(key)
+        if names is not None:
+            self.use.columns.update(names)
+        elif isinstance(key, ast.Slice) or _is_mask(key):
+            # Row selection; the mask's own column accesses are followed separately
+            self._frame(node)
+        elif isinstance(key, ast.Name) and key.id in self.assignments:
+            self._named_key(node, key.id)
+        else:
+            self._incomplete()
+
+    def _attribute(self, node: ast.Attribute) -> None:
+        parent = self.parents.get(node)
+        called = isinstance(parent, ast.Call) and parent.func is node
+        if node.attr in self.known and not called:
+            self.use.columns.add(node.attr)
+        elif node.attr in ("loc", "at") and isinstance(parent, ast.Subscript):
+            self._loc(parent)
+        elif called and node.attr in _ROW_METHODS:
+            self._frame(parent)
+        elif called and node.attr in _SUBSET_METHODS and any(keyword.arg == "subset" for keyword in parent.keywords):
+            self._frame(parent)
+        elif called and node.attr == "groupby":
+            self._groupby(parent)
+        elif called and node.attr == "query" and parent.args:
+            self._query(parent)
+        elif called and node.attr == "pivot_table" and any(keyword.arg == "values" for keyword in parent.keywords):
+            return
+        elif called and node.attr == "plot" and {"x", "y"} <= {keyword.arg for keyword in parent.keywords}:
+            return
+        else:
+            self._incomplete()
+
+    def _loc(self, node: ast.Subscript) -> None:
+        key = node.slice
+        if not isinstance(key, ast.Tuple):
+            self._frame(node)
+            return
+        names = _string_list(key.elts[1]) if len(key.elts) == 2 else None
+        if names is None:
+            self._incomplete()
+        else:
+            self.use.columns.update(names)
+
+    def _groupby(self, call: ast.Call) -> None:
+        parent = self.parents.get(call)
+        if isinstance(parent, ast.Subscript) and parent.value is call:
+            names = _string_list(parent.slice)
+            if names is None:
+                self._incomplete()
+            else:
+                self.use.columns.update(names)
+            return
+        if isinstance(parent, ast.Attribute) and parent.value is call:
+            outer = self.parents.get(parent)
+            if parent.attr in self.known and not (isinstance(outer, ast.Call) and outer.func is parent):
+                self.use.columns.add(parent.attr)
+                return
+            if parent.attr in _GROUP_ATTRIBUTES:
+                return
+            # Named or per-column aggregations only touch the columns they name
+            if parent.attr in ("agg", "aggregate") and isinstance(outer, ast.Call):
+                if (outer.args and isinstance(outer.args[0], ast.Dict)) or (
+                    not outer.args and outer.keywords and all(isinstance(keyword.value, ast.Tuple) for keyword in outer.keywords)
+                ):
+                    return
+        self._incomplete()
+
+    def _query(self, call: ast.Call) -> None:
+        expression = call.args[0]
+        if not (isinstance(expression, ast.Constant) and isinstance(expression.value, str)) or "`" in expression.value:
+            self._incomplete()
+            return
+        try:
+            parsed = ast.parse(expression.value, mode="eval")
+        except SyntaxError:
+            self._incomplete()
+            return
+        self.use.columns.update(node.id for node in ast.walk(parsed) if isinstance(node, ast.Name) and node.id in self.known)
+        self._frame(call)
+
+    def _named_key(self, node: ast.Subscript, name: str) -> None:
+        # ``df[name]`` is conclusive when every value assigned to ``name`` is a column name,
+        # a list of them or a row mask; with a mask the selected rows are followed further
+        masks = False
+        for value in self.assignments[name]:
+            names = _string_list(value) if value is not None else None
+            if names is not None:
+                self.use.columns.update(names)
+            elif value is not None and _is_mask(value):
+                masks = True
+            else:
+                self._incomplete()
+                return
+        if masks and isinstance(node.ctx, ast.Load):
+            self._frame(node)
+
+
+def _string_list(node: ast.AST) -> Optional[List[str]]:
+    # A string constant or a list/tuple of them
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return [node.value]
+    if isinstance(node, (ast.List, ast.Tuple)) and all(
+        isinstance(element, ast.Constant) and isinstance(element.value, str) for element in node.elts
+    ):
+        return [element.value for element in node.elts]
+    return None
+
+
+def _is_mask(node: ast.AST) -> bool:
+    # Expressions that select rows: comparisons, their combinations and the Series methods
+    # that return booleans, such as ``df["a"].isin(...)`` or ``df["a"].str.contains(...)``.
+    # Other calls (``df[other.columns.tolist()]``) may well return column names.
+    if isinstance(node, (ast.Compare, ast.BoolOp)):
+        return True
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.Invert, ast.Not)):
+        return True
+    if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.BitAnd, ast.BitOr, ast.BitXor)):
+        return True
+    if not isinstance(node, ast.Call) or not isinstance(node.func, ast.Attribute):
+        return False
+    receiver = node.func.value
+    if isinstance(receiver, ast.Attribute) and receiver.attr == "str":
+        return node.func.attr in _STR_MASK_METHODS
+    return node.func.attr in _MASK_METHODS and isinstance(receiver, (ast.Subscript, ast.Attribute))
+
+
+def analyze_columns(code: str, known: Collection[str] = (), frame: str = FRAME_NAME) -> ColumnUse:
+    """Columns ``code`` reads from ``frame``; attribute access counts for ``known`` columns."""
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return ColumnUse(complete=False)
+    return _FrameUseVisitor(tree, frame, known).run()
+
+
+def required_columns(code: str, columns: List[str], frame: str = FRAME_NAME) -> Optional[List[str]]:
+    """The columns of ``columns`` that ``code`` needs, in frame order; None when it may need all.
+
+    Any string literal naming a column is kept as well, since it may reach the frame through
+    a variable (``by=``, ``x=``, a loop over names).
+    """
+    use = analyze_columns(code, columns, frame)
+    if not use.complete:
+        return None
+    try:
+        literals = {
+            node.value for node in ast.walk(ast.parse(code)) if isinstance(node, ast.Constant) and isinstance(node.value, str)
+        }
+    except SyntaxError:
+        return None
+    needed = use.columns | literals
+    selected = [column for column in columns if column in needed]
+    # Keep one column so the frame still has its rows
+    return selected or columns[:1]
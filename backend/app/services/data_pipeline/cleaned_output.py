@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import io
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from app.services.data_pipeline.models import EncodedColumn, EncodedFrame
+from app.services.data_pipeline.pipeline_services.type_inference import (
+    _BOOL_FALSE,
+    _BOOL_TRUE,
+    _DATE_CANDIDATES,
+)
+from app.services.storage import StorageService
+
+CLEANED_FILENAME = "cleaned.parquet"
+# Written by older pipeline versions; still read when no Parquet artifact exists
+LEGACY_CLEANED_FILENAME = "cleaned.csv"
+# Text columns become categoricals when few distinct values repeat across many rows
+CATEGORY_MAX_DISTINCT = 1000
+_CATEGORY_MAX_RATIO = 0.5
+
+
+def cleaned_key(dataset_id: str) -> str:
+    return f"datasets/{dataset_id}/{CLEANED_FILENAME}"
+
+
+def legacy_cleaned_key(dataset_id: str) -> str:
+    return f"datasets/{dataset_id}/{LEGACY_CLEANED_FILENAME}"
+
+
+def _lossless(converted: pd.Series, original: pd.Series) -> bool:
+    # A conversion is only applied when it keeps every non-missing value.
+    return not (converted.isna() & original.notna()).any()
+
+
+def _to_numeric(values: pd.Series, details: Dict[str, Any]) -> Optional[pd.Series]:
+    # Leading zeros (zip codes, ids) would be lost in a number, so keep those as text.
+    if values.str.fullmatch(r"[+-]?0\d+").any():
+        return None
+    parsed = pd.to_numeric(values, errors="coerce")
+    if not _lossless(parsed, values):
+        return None
+    numbers = parsed.to_numpy(dtype=float)
+    if np.isfinite(numbers).all() and (np.round(numbers) == numbers).all() and np.abs(numbers).max(initial=0) < 2**53:
+        return parsed.astype("Int64")
+    return parsed.astype("Float64")
+
+
+def _to_boolean(values: pd.Series, details: Dict[str, Any]) -> Optional[pd.Series]:
+    lowered = values.str.lower()
+    parsed = pd.Series(pd.NA, index=values.index, dtype="boolean")
+    parsed[lowered.isin(_BOOL_TRUE)] = True
+    parsed[lowered.isin(_BOOL_FALSE)] = False
+    return parsed if _lossless(parsed, values) else None
+
+
+def _to_datetime(values: pd.Series, details: Dict[str, Any]) -> Optional[pd.Series]:
+    # Try the format type inference detected first; when it was picked on a sample (or the
+    # report predates stored formats) fall back to the first candidate that parses every value.
+    detected = details.get("datetime_format")
+    candidates = [*_DATE_CANDIDATES, "%Y%m%d"]
+    for fmt in dict.fromkeys([detected, *candidates] if detected else candidates):
+        parsed = pd.to_datetime(values, errors="coerce", format=fmt)
+        if _lossless(parsed, values):
+            return parsed
+    return None
+
+
+def is_low_cardinality(distinct_count: int, value_count: int) -> bool:
+    return 0 < distinct_count <= CATEGORY_MAX_DISTINCT and distinct_count <= value_count * _CATEGORY_MAX_RATIO
+
+
+def _to_category(column: EncodedColumn, index: pd.Index, name: Any) -> Optional[pd.Series]:
+    # Build the categorical straight from the codes; unused values are dropped first.
+    used = column.drop_values(column.counts == 0)
+    categories = pd.Index(used.uniques, dtype=object).astype(str)
+    if categories.has_duplicates:
+        return None
+    return pd.Series(pd.Categorical.from_codes(used.codes, categories=categories), index=index, name=name)
+
+
+_CONVERTERS: Dict[str, Callable[[pd.Series, Dict[str, Any]], Optional[pd.Series]]] = {
+    "numeric": _to_numeric,
+    "boolean": _to_boolean,
+    "datetime": _to_datetime,
+}
+
+
+def _typed_column(
+    column: EncodedColumn, details: Dict[str, Any], index: pd.Index, name: Any, categorize: bool = False
+) -> pd.Series:
+    # Convert the distinct values once and expand them through the codes.
+    converter = _CONVERTERS.get(details.get("inferred_type", "string"))
+    converted = None
+    if converter is not None and column.distinct_count:
+        converted = converter(column.values().astype(str).str.strip(), details)
+    if converted is None:
+        categorical = _to_category(column, index, name) if categorize else None
+        if categorical is not None:
+            return categorical
+        return column.to_series(index=index, name=name).astype("string")
+    # Appending a missing slot lets the -1 codes pick it up.
+    lookup = pd.concat([converted, pd.Series([None], dtype=converted.dtype)], ignore_index=True)
+    return pd.Series(lookup.array.take(column.codes), index=index, name=name)
+
+
+def typed_frame(df: pd.DataFrame, type_inference: Optional[Dict[str, Any]], encoded: Optional[EncodedFrame] = None) -> pd.DataFrame:
+    """Return ``df`` with columns converted to the types chosen by type inference.
+
+    Conversions are lossless: a column stays text when any value would not survive.
+    Remaining text columns with few distinct values become ``category``.
+    """
+    if encoded is None or not encoded.describes(df):
+        encoded = EncodedFrame.from_frame(df)
+    columns = (type_inference or {}).get("columns", {})
+    data = {
+        position: _typed_column(
+            column,
+            columns.get(str(name), {}),
+            df.index,
+            name,
+            categorize=is_low_cardinality(int((column.counts > 0).sum()), column.row_count - column.null_count),
+        )
+        for position, (name, column) in enumerate(zip(encoded.column_names, encoded.columns))
+    }
+    frame = pd.DataFrame(data, index=df.index)
+    frame.columns = pd.Index([str(name) for name in encoded.column_names])
+    return frame
+
+
+def write_parquet(storage: StorageService, key: str, df: pd.DataFrame, row_group_size: int) -> int:
+    """Write ``df`` as Parquet with fixed-size row groups so previews only read the first groups."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer, row_group_size=max(1, row_group_size), compression="snappy")
+    buffer.seek(0)
+    return storage.save(key, buffer)
+
+
+def read_parquet(
+    handle: Any,
+    max_rows: Optional[int] = None,
+    columns: Optional[Sequence[str]] = None,
+    start_row: int = 0,
+) -> pd.DataFrame:
+    # Only the requested columns are decoded, and with a row range only the row groups that
+    # overlap it; unknown column names are ignored.
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(handle)
+    names = parquet_file.schema_arrow.names
+    selected = None if columns is None else [name for name in dict.fromkeys(columns) if name in names]
+    if max_rows is None and start_row <= 0:
+        return parquet_file.read(columns=selected).to_pandas()
+
+    metadata = parquet_file.metadata
+    end_row = metadata.num_rows if max_rows is None else min(metadata.num_rows, start_row + max(0, max_rows))
+    groups = []
+    first_row = None
+    offset = 0
+    for index in range(metadata.num_row_groups):
+        group_rows = metadata.row_group(index).num_rows
+        if offset < end_row and offset + group_rows > start_row:
+            groups.append(index)
+            first_row = offset if first_row is None else first_row
+        offset += group_rows
+    if not groups:
+        schema = parquet_file.schema_arrow
+        fields = schema if selected is None else [schema.field(name) for name in selected]
+        return pa.schema(fields, metadata=schema.metadata).empty_table().to_pandas()
+    table = parquet_file.read_row_groups(groups, columns=selected)
+    return table.slice(start_row - first_row, end_row - start_row).to_pandas()
+
+
+def parquet_row_count(handle: Any) -> int:
+    # Read from the footer; no column data is decoded
+    import pyarrow.parquet as pq
+
+    return pq.ParquetFile(handle).metadata.num_rows
+
+
+def iter_csv_chunks(handle: Any) -> Iterator[bytes]:
+    """Stream a Parquet file as CSV, one row group at a time."""
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(handle)
+    header = True
+    for index in range(parquet_file.num_row_groups):
+        chunk = parquet_file.read_row_group(index).to_pandas()
+        yield chunk.to_csv(index=False, header=header).encode("utf-8")
+        header = False
+    if header:
+        yield parquet_file.schema_arrow.empty_table().to_pandas().to_csv(index=False).encode("utf-8")
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+from collections import deque
+from contextlib import contextmanager
+from functools import lru_cache
+import threading
+import time
+import tracemalloc
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:  # resource is POSIX-only
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None  # type: ignore[assignment]
+
+PipelineContext = Dict[str, Any]
+StepMetrics = Dict[str, Any]
+
+_AGGREGATED_FIELDS = ("wall_ms", "cpu_ms", "rss_peak_delta_bytes", "traced_delta_bytes", "traced_peak_bytes")
+_TRACE_LOCK = threading.Lock()
+_TRACE_USERS = 0
+
+
+@contextmanager
+def trace_memory(enabled: bool) -> Iterator[None]:
+    # Keep tracemalloc running while at least one pipeline asked for it.
+    global _TRACE_USERS
+    if not enabled:
+        yield
+        return
+    with _TRACE_LOCK:
+        if _TRACE_USERS == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _TRACE_USERS += 1
+    try:
+        yield
+    finally:
+        with _TRACE_LOCK:
+            _TRACE_USERS -= 1
+            if _TRACE_USERS == 0 and tracemalloc.is_tracing():
+                tracemalloc.stop()
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    # ru_maxrss is the process high-water mark, reported in KiB on Linux.
+    if resource is None:
+        return None
+    return int(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss) * 1024
+
+
+def _frame_stats(frame: Any) -> tuple[Optional[int], Optional[int]]:
+    if not isinstance(frame, pd.DataFrame):
+        return None, None
+    return int(frame.shape[0]), int(frame.memory_usage(index=True, deep=True).sum())
+
+
+class StepMeter:
+    """Measures one step: wall and thread CPU time, peak RSS, traced allocations, rows and frame size.
+
+    CPU time is the step thread's own time, so work fanned out to column workers is not included.
+    Peak RSS and the tracemalloc peak are process-wide and overlap when steps run in parallel.
+    """
+
+    def __init__(self, context: PipelineContext):
+        self._input_frame = context.get("dataframe")
+        self._rows_in, _ = _frame_stats(self._input_frame)
+        self._rss_before = _peak_rss_bytes()
+        self._tracing = tracemalloc.is_tracing()
+        self._traced_before = tracemalloc.get_traced_memory()[0] if self._tracing else 0
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.thread_time()
+
+    def finish(self, result: Optional[PipelineContext]) -> StepMetrics:
+        wall_ms = (time.perf_counter() - self._wall_start) * 1000
+        cpu_ms = (time.thread_time() - self._cpu_start) * 1000
+        metrics: StepMetrics = {
+            "wall_ms": round(wall_ms, 3),
+            "cpu_ms": round(cpu_ms, 3),
+            "rss_peak_bytes": None,
+            "rss_peak_delta_bytes": None,
+            "traced_delta_bytes": None,
+            "traced_peak_bytes": None,
+            "rows_in": self._rows_in,
+            "rows_out": self._rows_in,
+            "dataframe_bytes": None,
+        }
+        rss_after = _peak_rss_bytes()
+        if rss_after is not None and self._rss_before is not None:
+            metrics["rss_peak_bytes"] = rss_after
+            metrics["rss_peak_delta_bytes"] = rss_after - self._rss_before
+        if self._tracing and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            metrics["traced_delta_bytes"] = current - self._traced_before
+            metrics["traced_peak_bytes"] = peak
+
+        frame = (result or {}).get("dataframe", self._input_frame)
+        rows_out, frame_bytes = _frame_stats(frame)
+        metrics["rows_out"] = rows_out
+        metrics["dataframe_bytes"] = frame_bytes
+        return metrics
+
+
+class PipelineMetricsRegistry:
+    """Keeps the step metrics of recent pipeline runs and summarizes them as percentiles."""
+
+    def __init__(self, max_runs: int = 500):
+        self._lock = threading.Lock()
+        self._max_runs = max_runs
+        self._runs = 0
+        self._steps: Dict[str, Deque[StepMetrics]] = {}
+
+    def record(self, run_metrics: Dict[str, StepMetrics]) -> None:
+        with self._lock:
+            self._runs += 1
+            for step_name, metrics in run_metrics.items():
+                history = self._steps.setdefault(step_name, deque(maxlen=self._max_runs))
+                history.append(dict(metrics))
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            steps = {name: list(history) for name, history in self._steps.items()}
+            runs = self._runs
+
+        summary: Dict[str, Any] = {}
+        for step_name, history in steps.items():
+            step_summary: Dict[str, Any] = {"count": len(history)}
+            for field in _AGGREGATED_FIELDS:
+                values = [item[field] for item in history if item.get(field) is not None]
+                step_summary[field] = percentiles(values)
+            summary[step_name] = step_summary
+        return {"runs": runs, "steps": summary}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._runs = 0
+            self._steps.clear()
+
+
+def percentiles(values: List[float]) -> Optional[Dict[str, float]]:
+    if not values:
+        return None
+    p50, p95 = np.percentile(np.asarray(values, dtype=float), [50, 95])
+    return {"p50": round(float(p50), 3), "p95": round(float(p95), 3), "max": round(float(max(values)), 3)}
+
+
+@lru_cache()
+def get_pipeline_metrics() -> PipelineMetricsRegistry:
+    return PipelineMetricsRegistry()
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+PipelineContext = Dict[str, Any]
+
+
+@dataclass(frozen=True)
+class EncodedColumn:
+    """Dictionary-encoded column: integer codes into distinct values plus counts.
+
+    Missing cells are stored as code -1 and are not part of ``uniques``.
+    """
+
+    codes: np.ndarray
+    uniques: np.ndarray
+    counts: np.ndarray
+    dtype: Any = object
+
+    @classmethod
+    def from_series(cls, series: pd.Series) -> "EncodedColumn":
+        # Factorize once; uniques keep first-appearance order like Series.unique().
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        uniques = np.asarray(uniques, dtype=object)
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        return cls(codes=codes, uniques=uniques, counts=counts, dtype=series.dtype)
+
+    @property
+    def row_count(self) -> int:
+        return int(len(self.codes))
+
+    @property
+    def distinct_count(self) -> int:
+        return int(len(self.uniques))
+
+    @property
+    def null_count(self) -> int:
+        return self.row_count - int(self.counts.sum())
+
+    def values(self) -> pd.Series:
+        # Distinct non-missing values as an object Series (aligned with counts).
+        return pd.Series(self.uniques, dtype=object)
+
+    def remap(self, new_values: Sequence[Any]) -> "EncodedColumn":
+        # Replace each distinct value (NA marks it missing) and merge values that collide.
+        value_codes, new_uniques = pd.factorize(pd.Series(new_values, dtype=object), use_na_sentinel=True)
+        # Appending -1 lets the existing -1 codes index the last slot and stay missing.
+        lookup = np.append(value_codes, -1)
+        codes = lookup[self.codes]
+        new_uniques = np.asarray(new_uniques, dtype=object)
+        counts = np.bincount(codes[codes >= 0], minlength=len(new_uniques))
+        return EncodedColumn(codes=codes, uniques=new_uniques, counts=counts, dtype=self.dtype)
+
+    def drop_values(self, mask: np.ndarray) -> "EncodedColumn":
+        # Mark the distinct values selected by ``mask`` as missing; the others keep their order,
+        # so no refactorization is needed.
+        if not mask.any():
+            return self
+        keep = ~mask
+        lookup = np.append(np.where(keep, np.cumsum(keep) - 1, -1), -1)
+        return EncodedColumn(
+            codes=lookup[self.codes],
+            uniques=self.uniques[keep],
+            counts=self.counts[keep],
+            dtype=self.dtype,
+        )
+
+    def take(self, indexer: np.ndarray) -> "EncodedColumn":
+        # Select rows by boolean mask or positions, keeping the dictionary intact.
+        codes = self.codes[indexer]
+        counts = np.bincount(codes[codes >= 0], minlength=len(self.uniques))
+        return EncodedColumn(codes=codes, uniques=self.uniques, counts=counts, dtype=self.dtype)
+
+    def to_series(self, index: Optional[pd.Index] = None, name: Any = None) -> pd.Series:
+        # Materialize the column by looking every code up in the dictionary.
+        lookup = np.append(self.uniques, np.array([pd.NA], dtype=object))
+        series = pd.Series(lookup.take(self.codes), index=index, name=name, dtype=object)
+        if self.dtype != object:
+            series = series.infer_objects()
+        return series
+
+
+@dataclass
+class EncodedFrame:
+    """Column-wise dictionary encoding of a DataFrame shared by the quality steps."""
+
+    columns: List[EncodedColumn]
+    column_names: List[Any]
+    index: pd.Index
+    _frame: Optional[pd.DataFrame] = field(default=None, repr=False)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "EncodedFrame":
+        columns = [EncodedColumn.from_series(df.iloc[:, idx]) for idx in range(df.shape[1])]
+        return cls(columns=columns, column_names=list(df.columns), index=df.index, _frame=df)
+
+    @property
+    def row_count(self) -> int:
+        return int(len(self.index))
+
+    def describes(self, df: Any) -> bool:
+        # True when this encoding was built from (or materialized as) exactly this frame.
+        return self._frame is not None and self._frame is df
+
+    def with_columns(self, columns: List[EncodedColumn]) -> "EncodedFrame":
+        return EncodedFrame(columns=columns, column_names=self.column_names, index=self.index)
+
+    def all_missing_rows(self) -> np.ndarray:
+        # Boolean mask of rows where every column is missing.
+        if not self.columns:
+            return np.zeros(self.row_count, dtype=bool)
+        mask = np.ones(self.row_count, dtype=bool)
+        for column in self.columns:
+            mask &= column.codes < 0
+        return mask
+
+    def take_rows(self, mask: np.ndarray) -> "EncodedFrame":
+        columns = [column.take(mask) for column in self.columns]
+        return EncodedFrame(columns=columns, column_names=self.column_names, index=self.index[mask])
+
+    def to_frame(self) -> pd.DataFrame:
+        if self._frame is None:
+            data = {
+                position: column.to_series(index=self.index)
+                for position, column in enumerate(self.columns)
+            }
+            frame = pd.DataFrame(data, index=self.index)
+            frame.columns = pd.Index(self.column_names)
+            self._frame = frame
+        return self._frame
+
+
+def encoded_frame_for(context: PipelineContext) -> EncodedFrame:
+    # Reuse the shared encoding when it still matches the context dataframe.
+    df = context.get("dataframe")
+    encoded = context.get("encoded_frame")
+    if isinstance(encoded, EncodedFrame) and encoded.describes(df):
+        return encoded
+    return EncodedFrame.from_frame(df)
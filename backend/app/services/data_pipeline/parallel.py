@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Sequence, TypeVar
+
+PipelineContext = Dict[str, Any]
+
+Item = TypeVar("Item")
+Result = TypeVar("Result")
+
+
+def map_columns(context: PipelineContext, func: Callable[[Item], Result], items: Sequence[Item]) -> List[Result]:
+    # Fan per-column work out to the pipeline's column executor, keeping input order.
+    # With a process pool, ``func`` must be a module-level function and items picklable.
+    executor: Executor | None = context.get("column_executor")
+    if executor is None or len(items) < 2:
+        return [func(item) for item in items]
+    return list(executor.map(func, items))
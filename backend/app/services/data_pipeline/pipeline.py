@@ -1,14 +1,43 @@
 from __future__ import annotations
 
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
 from dataclasses import dataclass
+import hashlib
 import importlib
+import inspect
+import json
 import logging
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from app.core.config import get_settings
+from app.services.data_pipeline.metrics import (
+    PipelineMetricsRegistry,
+    StepMeter,
+    StepMetrics,
+    get_pipeline_metrics,
+    trace_memory,
+)
+from app.services.data_pipeline.result_cache import PipelineResultCache
 
 PipelineContext = Dict[str, Any]
 PipelineHandler = Callable[[PipelineContext], Optional[PipelineContext]]
+# Receives (event, step_name) with event one of "start", "end", "skip", "error" or "cached".
+PipelineListener = Callable[[str, str], None]
 
 BASE_SERVICE_PATH = "app.services.data_pipeline.pipeline_services"
+# Helpers every step builds on; editing them changes the output of all steps
+_SHARED_MODULES = (
+    "app.services.data_pipeline.models",
+    "app.services.data_pipeline.parallel",
+    "app.services.data_pipeline.cleaned_output",
+)
 logger = logging.getLogger(__name__)
 
 
@@ -16,31 +45,256 @@ logger = logging.getLogger(__name__)
 class PipelineStep:
     name: str
     handler: PipelineHandler
+    # Context keys produced by earlier steps that this step reads, and keys it may write.
+    # Steps without declarations act as barriers and see the full sequential context.
+    reads: Optional[Tuple[str, ...]] = None
+    writes: Optional[Tuple[str, ...]] = None
 
 
 class DataQualityPipeline:
-    def __init__(self, steps: List[PipelineStep]):
-        # Store the ordered pipeline steps
+    def __init__(
+        self,
+        steps: List[PipelineStep],
+        max_workers: int = 1,
+        column_executor: str = "none",
+        column_workers: int = 1,
+        metrics_registry: Optional[PipelineMetricsRegistry] = None,
+        trace_memory: bool = False,
+        result_cache: Optional[PipelineResultCache] = None,
+    ):
+        # Store the ordered pipeline steps and derive their dependency graph
         self._steps = steps
+        self._result_cache = result_cache
+        self._version: Optional[str] = None
+        self._metrics_registry = metrics_registry
+        self._trace_memory = trace_memory
+        self._max_workers = max(1, max_workers)
+        self._column_executor = column_executor
+        self._column_workers = max(1, column_workers)
+        self._dependencies = [self._step_dependencies(index) for index in range(len(steps))]
+
+    @property
+    def step_names(self) -> List[str]:
+        return [step.name for step in self._steps]
+
+    @property
+    def step_versions(self) -> Dict[str, str]:
+        return {step.name: _code_version(step.handler) for step in self._steps}
+
+    @property
+    def version(self) -> str:
+        # Hash of the step order and every step's code, so editing any step invalidates cached results
+        if self._version is None:
+            digest = hashlib.sha256()
+            for name, step_version in self.step_versions.items():
+                digest.update(f"{name}={step_version};".encode("utf-8"))
+            for module_path in _SHARED_MODULES:
+                digest.update(f"{module_path}={_module_version(module_path)};".encode("utf-8"))
+            self._version = digest.hexdigest()[:16]
+        return self._version
+
+    def _may_write(self, step: PipelineStep, key: str) -> bool:
+        return step.writes is None or key in step.writes
+
+    def _step_dependencies(self, index: int) -> Set[int]:
+        # A step waits for every earlier step that may write a key it reads (or an error).
+        step = self._steps[index]
+        if step.reads is None:
+            return set(range(index))
+        keys = set(step.reads) | {"pipeline_error"}
+        return {
+            earlier
+            for earlier in range(index)
+            if any(self._may_write(self._steps[earlier], key) for key in keys)
+        }
+
+    def _resolve(self, base: PipelineContext, index: int, outputs: Dict[int, PipelineContext]) -> PipelineContext:
+        # Build the input for a step from the base context plus writes of the steps it depends on,
+        # applied in declaration order so the result matches a sequential run.
+        context = dict(base)
+        for earlier in sorted(self._dependencies[index]):
+            context.update(outputs.get(earlier, {}))
+        return context
+
+    def _written(self, step: PipelineStep, inputs: PipelineContext, result: Optional[PipelineContext]) -> PipelineContext:
+        # Keep only the keys the step actually changed and is allowed to write.
+        if result is None:
+            return {}
+        keys = result.keys() if step.writes is None else [key for key in step.writes if key in result]
+        return {
+            key: result[key]
+            for key in keys
+            if key not in inputs or inputs[key] is not result[key]
+        }
 
-    def run(self, context: PipelineContext) -> PipelineContext:
-        # Run each step sequentially, allowing handlers to replace the context
-        current = context
+    def _run_step(
+        self, step: PipelineStep, context: PipelineContext, listener: Optional[PipelineListener]
+    ) -> Tuple[PipelineContext, StepMetrics]:
+        logger.info("PIPELINE: data_pipeline.start_step %s", step.name)
+        _notify(listener, "start", step.name)
+        meter = StepMeter(context)
+        try:
+            result = step.handler(context)
+        except Exception:
+            _notify(listener, "error", step.name)
+            raise
+        metrics = meter.finish(result)
+        logger.info(
+            "PIPELINE: data_pipeline.end_step %s wall_ms=%.1f cpu_ms=%.1f rows_out=%s",
+            step.name,
+            metrics["wall_ms"],
+            metrics["cpu_ms"],
+            metrics["rows_out"],
+        )
+        _notify(listener, "end", step.name)
+        return self._written(step, context, result), metrics
+
+    def _build_column_executor(self) -> Optional[Executor]:
+        if self._column_executor == "thread" and self._column_workers > 1:
+            return ThreadPoolExecutor(max_workers=self._column_workers, thread_name_prefix="pipeline-column")
+        if self._column_executor == "process" and self._column_workers > 1:
+            return ProcessPoolExecutor(max_workers=self._column_workers)
+        return None
+
+    def run(self, context: PipelineContext, listener: Optional[PipelineListener] = None) -> PipelineContext:
+        # Reuse a cached result for identical uploads, otherwise run the steps and cache the outcome
+        cached = self._restore_cached(context, listener)
+        if cached is not None:
+            return cached
+        result = self._run_steps(context, listener)
+        self._store_cached(result)
+        return result
+
+    def _restore_cached(self, context: PipelineContext, listener: Optional[PipelineListener]) -> Optional[PipelineContext]:
+        content_hash = _cache_hash(context)
+        if self._result_cache is None or not content_hash or not context.get("dataset_id"):
+            return None
+        try:
+            restored = self._result_cache.restore(content_hash, self.version, context["dataset_id"])
+        except Exception:
+            logger.exception("ERROR: data_pipeline.cache_restore_failed %s", content_hash)
+            return None
+        if restored is None:
+            return None
+        logger.info("PIPELINE: data_pipeline.cache_hit %s version=%s", content_hash, self.version)
         for step in self._steps:
-            if current.get("pipeline_error") and step.name != "quality_report":
-                logger.info(
-                    "ERROR: data_pipeline.skip_step %s (pipeline_error in %s)",
-                    step.name,
-                    current["pipeline_error"].get("step"), # Error Catching
-                )
-                continue
-            logger.info("PIPELINE: data_pipeline.start_step %s", step.name)
-            result = step.handler(current)
-            if result is not None:
-                current = result
-            logger.info("PIPELINE: data_pipeline.end_step %s", step.name)
+            _notify(listener, "cached", step.name)
+        current = dict(context)
+        current["quality_report"] = restored
+        current["pipeline_metrics"] = {}
+        # The profile step takes over the profile restored with the other artifacts
+        for step in self._steps:
+            if step.name == "dataset_profile":
+                current = step.handler(current) or current
         return current
 
+    def _store_cached(self, result: PipelineContext) -> None:
+        content_hash = _cache_hash(result)
+        quality_report = result.get("quality_report")
+        if self._result_cache is None or not content_hash or not quality_report or result.get("pipeline_error"):
+            return
+        profile = result.get("dataset_profile") or {}
+        extra_keys = [profile["storage_key"]] if profile.get("storage_key") else []
+        try:
+            self._result_cache.store(content_hash, self.version, result.get("dataset_id"), quality_report, extra_keys)
+        except Exception:
+            logger.exception("ERROR: data_pipeline.cache_store_failed %s", content_hash)
+
+    def _run_steps(self, context: PipelineContext, listener: Optional[PipelineListener]) -> PipelineContext:
+        # Run steps as soon as their dependencies finished, allowing handlers to replace the context
+        base = dict(context)
+        column_pool = self._build_column_executor()
+        if column_pool is not None:
+            base["column_executor"] = column_pool
+
+        outputs: Dict[int, PipelineContext] = {}
+        step_metrics: Dict[int, StepMetrics] = {}
+        pending = list(range(len(self._steps)))
+        running: Dict[Future, int] = {}
+        try:
+            with trace_memory(self._trace_memory), ThreadPoolExecutor(
+                max_workers=self._max_workers, thread_name_prefix="pipeline-step"
+            ) as pool:
+                while pending or running:
+                    for index in list(pending):
+                        if not self._dependencies[index] <= outputs.keys():
+                            continue
+                        pending.remove(index)
+                        step = self._steps[index]
+                        step_context = self._resolve(base, index, outputs)
+                        step_context["pipeline_metrics"] = self._collected_metrics(step_metrics)
+                        if step_context.get("pipeline_error") and step.name != "quality_report":
+                            logger.info(
+                                "ERROR: data_pipeline.skip_step %s (pipeline_error in %s)",
+                                step.name,
+                                step_context["pipeline_error"].get("step"), # Error Catching
+                            )
+                            outputs[index] = {}
+                            _notify(listener, "skip", step.name)
+                            continue
+                        running[pool.submit(self._run_step, step, step_context, listener)] = index
+                    if not running:
+                        continue
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        index = running.pop(future)
+                        outputs[index], step_metrics[index] = future.result()
+        finally:
+            if column_pool is not None:
+                column_pool.shutdown(wait=True)
+
+        # Merge step outputs in declaration order for a deterministic final context
+        current = dict(context)
+        for index in range(len(self._steps)):
+            current.update(outputs.get(index, {}))
+        current["pipeline_metrics"] = self._collected_metrics(step_metrics)
+        if self._metrics_registry is not None:
+            self._metrics_registry.record(current["pipeline_metrics"])
+        return current
+
+    def _collected_metrics(self, step_metrics: Dict[int, StepMetrics]) -> Dict[str, StepMetrics]:
+        return {self._steps[index].name: step_metrics[index] for index in sorted(step_metrics)}
+
+
+def _notify(listener: Optional[PipelineListener], event: str, step_name: str) -> None:
+    # Progress listeners must never break the pipeline itself
+    if listener is None:
+        return
+    try:
+        listener(event, step_name)
+    except Exception:
+        logger.exception("ERROR: data_pipeline.listener_failed %s %s", event, step_name)
+
+
+def _cache_hash(context: PipelineContext) -> Optional[str]:
+    # Per-dataset options change the output, so they are part of the cache key with the content
+    content_hash = context.get("content_hash")
+    tokens = context.get("missing_tokens")
+    if not content_hash or tokens is None:
+        return content_hash
+    options = json.dumps({"missing_tokens": list(tokens)}, sort_keys=True)
+    return hashlib.sha256(f"{content_hash}:{options}".encode("utf-8")).hexdigest()
+
+
+def _module_version(module_path: str) -> str:
+    try:
+        source = inspect.getsource(importlib.import_module(module_path))
+    except (ImportError, OSError, TypeError):
+        source = module_path
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+
+
+def _code_version(handler: PipelineHandler) -> str:
+    # Steps live in their own modules, so the module source is the step's code version
+    module = inspect.getmodule(handler)
+    if module is None:
+        return hashlib.sha256(repr(handler).encode("utf-8")).hexdigest()[:16]
+    try:
+        source = inspect.getsource(module)
+    except (OSError, TypeError):
+        source = f"{module.__name__}.{getattr(handler, '__qualname__', '')}"
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+
 
 def _missing_handler(step_name: str, module_path: str, func_name: str) -> PipelineHandler:
     # Catches Pipeline errors
@@ -67,16 +321,79 @@ def _load_handler(step_name: str, module_path: str, func_name: str = "run") -> P
     return handler
 
 
-def build_default_pipeline() -> DataQualityPipeline:
-    # Build the default pipeline steps in order
+def build_default_pipeline(result_cache: Optional[PipelineResultCache] = None) -> DataQualityPipeline:
+    # Build the default pipeline steps in order, declaring the context keys each step reads and writes
     steps = [
-        PipelineStep("ingestion", _load_handler("ingestion", f"{BASE_SERVICE_PATH}.ingest")),
-        PipelineStep("header_detection", _load_handler("header_detection", f"{BASE_SERVICE_PATH}.header_detection"),),
-        PipelineStep("schema_check", _load_handler("schema_check", f"{BASE_SERVICE_PATH}.schema_check")),
-        PipelineStep("missing_values", _load_handler("missing_values", f"{BASE_SERVICE_PATH}.missing_values")),
-        PipelineStep("type_inference", _load_handler("type_inference", f"{BASE_SERVICE_PATH}.type_inference")),
-        PipelineStep("inconsistencies", _load_handler("inconsistencies", f"{BASE_SERVICE_PATH}.inconsistencies")),
-        # Not Implemented yet: PipelineStep("outlier_analysis", _load_handler("outlier_analysis", f"{BASE_SERVICE_PATH}.outlier_analysis"),),
-        PipelineStep("quality_report", _load_handler("quality_report", f"{BASE_SERVICE_PATH}.quality_report"),)
+        PipelineStep(
+            "ingestion",
+            _load_handler("ingestion", f"{BASE_SERVICE_PATH}.ingest"),
+            reads=(),
+            writes=("dataframe", "ingestion", "pipeline_error"),
+        ),
+        PipelineStep(
+            "header_detection",
+            _load_handler("header_detection", f"{BASE_SERVICE_PATH}.header_detection"),
+            reads=("dataframe",),
+            writes=("dataframe", "header_detection"),
+        ),
+        PipelineStep(
+            "column_encoding",
+            _load_handler("column_encoding", f"{BASE_SERVICE_PATH}.column_encoding"),
+            reads=("dataframe",),
+            writes=("encoded_frame",),
+        ),
+        PipelineStep(
+            "schema_check",
+            _load_handler("schema_check", f"{BASE_SERVICE_PATH}.schema_check"),
+            reads=("dataframe", "encoded_frame"),
+            writes=("schema_check",),
+        ),
+        PipelineStep(
+            "missing_values",
+            _load_handler("missing_values", f"{BASE_SERVICE_PATH}.missing_values"),
+            reads=("dataframe", "encoded_frame"),
+            writes=("dataframe", "encoded_frame", "missing_values"),
+        ),
+        PipelineStep(
+            "type_inference",
+            _load_handler("type_inference", f"{BASE_SERVICE_PATH}.type_inference"),
+            reads=("dataframe", "encoded_frame"),
+            writes=("type_inference",),
+        ),
+        PipelineStep(
+            "inconsistencies",
+            _load_handler("inconsistencies", f"{BASE_SERVICE_PATH}.inconsistencies"),
+            reads=("dataframe", "encoded_frame", "type_inference"),
+            writes=("dataframe", "encoded_frame", "inconsistencies"),
+        ),
+        PipelineStep(
+            "outlier_analysis",
+            _load_handler("outlier_analysis", f"{BASE_SERVICE_PATH}.outlier_analysis"),
+            reads=("dataframe", "encoded_frame", "type_inference"),
+            writes=("outlier_analysis",),
+        ),
+        PipelineStep(
+            "type_materialization",
+            _load_handler("type_materialization", f"{BASE_SERVICE_PATH}.type_materialization"),
+            reads=("dataframe", "encoded_frame", "type_inference"),
+            writes=("typed_dataframe", "type_materialization"),
+        ),
+        # The report aggregates everything, so it stays a barrier without declarations
+        PipelineStep("quality_report", _load_handler("quality_report", f"{BASE_SERVICE_PATH}.quality_report"),),
+        PipelineStep(
+            "dataset_profile",
+            _load_handler("dataset_profile", f"{BASE_SERVICE_PATH}.dataset_profile"),
+            reads=("quality_report", "cleaned_dataframe"),
+            writes=("dataset_profile",),
+        ),
     ]
-    return DataQualityPipeline(steps)
+    settings = get_settings()
+    return DataQualityPipeline(
+        steps,
+        max_workers=settings.pipeline_max_workers,
+        column_executor=settings.pipeline_column_executor,
+        column_workers=settings.pipeline_column_workers,
+        metrics_registry=get_pipeline_metrics(),
+        trace_memory=settings.pipeline_trace_memory,
+        result_cache=result_cache,
+    )
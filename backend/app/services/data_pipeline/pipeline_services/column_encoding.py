@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from app.services.data_pipeline.models import EncodedFrame
+
+PipelineContext = Dict[str, Any]
+
+
+def run(context: PipelineContext) -> PipelineContext:
+    # Factorize every column once so later steps work on distinct values plus counts.
+    df = context.get("dataframe")
+    if df is None:
+        raise ValueError("Column encoding requires 'dataframe' in context.")
+
+    context = dict(context)
+    context["encoded_frame"] = EncodedFrame.from_frame(df)
+    return context
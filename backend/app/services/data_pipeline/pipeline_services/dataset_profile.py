@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from app.services.data_pipeline.pipeline_services.quality_report import _resolve_storage
+from app.services.dataset_profiler import DatasetProfiler
+from app.services.profile_store import ProfileStore, profile_version
+
+PipelineContext = Dict[str, Any]
+
+
+def run(context: PipelineContext) -> PipelineContext:
+    # Profile the typed cleaned frame once so chat turns can load it instead of recomputing.
+    dataset_id = context.get("dataset_id")
+    cleaned_key = (context.get("quality_report") or {}).get("cleaned_storage_key")
+    df = context.get("cleaned_dataframe")
+    if not dataset_id or not cleaned_key:
+        return context
+
+    storage = _resolve_storage(context)
+    version = profile_version(storage, cleaned_key)
+    if df is None:
+        # Restored from the result cache: the profile was copied along with the cleaned file
+        storage_key = ProfileStore(storage).adopt(dataset_id, version)
+        if storage_key is None:
+            return context
+    else:
+        profile, schema = DatasetProfiler().profile(dataset_id, df)
+        storage_key = ProfileStore(storage).save(dataset_id, version, profile, schema)
+
+    context = dict(context)
+    context["dataset_profile"] = {"storage_key": storage_key, "version": version}
+    return context
@@ -1,45 +1,89 @@
 from __future__ import annotations
 
-from typing import Any, Dict
-import re
-import unicodedata
+from typing import Any, Dict, Tuple
 
+import numpy as np
 import pandas as pd
 
+from app.services.data_pipeline.models import EncodedColumn, encoded_frame_for
+from app.services.data_pipeline.parallel import map_columns
+
 PipelineContext = Dict[str, Any]
 
 
-def _normalize_text(value: Any) -> Any:
-    # Normalize string with safe, limited transformations (whitespace/control/NFKC).
-    if value is None or pd.isna(value):
-        return pd.NA
-    text = str(value)
-    text = unicodedata.normalize("NFKC", text)
-    text = text.lower()
-    text = re.sub(r"[\t\r\n]+", " ", text)
-    text = text.strip()
-    text = re.sub(r"\s{2,}", " ", text)
-    return text
+# Characters Python's str.strip() and \s treat as whitespace within ASCII
+_ASCII_WHITESPACE = " \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f"
+
+
+def _normalize_unicode(text: pd.Series) -> pd.Series:
+    # Normalize strings with safe, limited transformations (whitespace/control/NFKC).
+    text = text.str.normalize("NFKC").str.lower()
+    text = text.str.replace(r"[\t\r\n]+", " ", regex=True).str.strip()
+    return text.str.replace(r"\s{2,}", " ", regex=True)
+
+
+def _normalize_values(values: pd.Series) -> pd.Series:
+    # Normalize distinct values in bulk. ASCII strings are already NFKC-normal, so Arrow kernels
+    # handle them with the same results; only the rest goes through the slower .str path.
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    text = values.astype(str)
+    array = pa.array(text.to_numpy(dtype=object), type=pa.large_string())
+    normalized = pc.replace_substring_regex(pc.ascii_lower(array), pattern=r"[\t\r\n]+", replacement=" ")
+    normalized = pc.ascii_trim(normalized, characters=_ASCII_WHITESPACE)
+    normalized = pc.replace_substring_regex(normalized, pattern=r"[ \t\n\r\x0b\x0c\x1c-\x1f]{2,}", replacement=" ")
+    result = pd.Series(normalized.to_numpy(zero_copy_only=False), index=values.index, dtype=object)
+
+    unicode_values = ~pc.string_is_ascii(array).to_numpy(zero_copy_only=False)
+    if unicode_values.any():
+        result[unicode_values] = _normalize_unicode(text[unicode_values])
+    return result.where(values.notna())
+
+
+def _variant_table(column: EncodedColumn, normalized: pd.Series) -> pd.DataFrame:
+    # One row per distinct original value with its normalized form and row count.
+    keep = (normalized.notna() & normalized.ne("")).to_numpy() & (column.counts > 0)
+    return pd.DataFrame(
+        {
+            "normalized": normalized.to_numpy()[keep],
+            "variant": column.values().astype(str).to_numpy()[keep],
+            "count": column.counts[keep],
+        }
+    )
+
+
+def _combine_variants(left: pd.DataFrame, right: pd.DataFrame) -> pd.DataFrame:
+    # Merge the variant tables of two chunks, keeping first-appearance order.
+    combined = pd.concat([left, right], ignore_index=True)
+    return combined.groupby(["normalized", "variant"], sort=False, as_index=False)["count"].sum()
+
 
+def _inconsistent_groups(table: pd.DataFrame) -> Dict[str, Any]:
+    # Group on integer codes of the normalized values; only groups with several spellings are
+    # turned into report entries.
+    group_codes, group_values = pd.factorize(table["normalized"])
+    variant_codes, variant_values = pd.factorize(table["variant"])
+    pairs = group_codes.astype(np.int64) * max(len(variant_values), 1) + variant_codes
+    first = ~pd.Series(pairs).duplicated().to_numpy()
+    counts = np.bincount(group_codes, weights=table["count"].to_numpy(), minlength=len(group_values))
+    spellings = np.bincount(group_codes[first], minlength=len(group_values))
 
-def _text_inconsistencies(series: pd.Series) -> Dict[str, Any]:
-    # Detect case/whitespace inconsistencies in string-like columns.
-    normalized = series.map(_normalize_text)
-    if normalized.dropna().empty:
-        return {"inconsistent_values": {}}
+    rows = np.flatnonzero(first & (spellings[group_codes] > 1))
+    rows = rows[np.argsort(group_codes[rows], kind="stable")]
+    groups: Dict[str, Dict[str, Any]] = {}
+    for code, variant in zip(group_codes[rows], table["variant"].to_numpy()[rows]):
+        group = groups.get(group_values[code])
+        if group is None:
+            group = groups[group_values[code]] = {"variants": [], "count": int(counts[code])}
+        group["variants"].append(variant)
+    return {"inconsistent_values": dict(sorted(groups.items()))}
 
-    inconsistencies = {}
-    data = pd.DataFrame({"normalized": normalized, "original": series})
-    data = data[data["normalized"] != ""].dropna(subset=["original"])
-    for norm_value, group in data.groupby("normalized")["original"]:
-        variants = group.astype(str).unique().tolist()
-        if len(variants) > 1:
-            inconsistencies[norm_value] = {
-                "variants": variants,
-                "count": int(len(group)),
-            }
 
-    return {"inconsistent_values": inconsistencies}
+def _clean_text_column(column: EncodedColumn) -> Tuple[Dict[str, Any], EncodedColumn]:
+    # Normalize the distinct values once and reuse them for the report and the rewritten column.
+    normalized = _normalize_values(column.values())
+    return _inconsistent_groups(_variant_table(column, normalized)), column.remap(normalized)
 
 
 def run(context: PipelineContext) -> PipelineContext:
@@ -48,23 +92,27 @@ def run(context: PipelineContext) -> PipelineContext:
     if df is None:
         raise ValueError("Inconsistencies requires 'dataframe' in context.")
 
+    encoded = encoded_frame_for(context)
     inferred = context.get("type_inference", {}).get("columns", {})
-    text_columns = [
-        col
-        for col in df.columns
-        if inferred.get(str(col), {}).get("inferred_type") == "string"
+    text_positions = [
+        position
+        for position, name in enumerate(encoded.column_names)
+        if inferred.get(str(name), {}).get("inferred_type") == "string"
     ]
 
+    # Normalize each distinct value once and reuse it for the report and the rewritten column.
+    results = map_columns(context, _clean_text_column, [encoded.columns[position] for position in text_positions])
     column_inconsistencies = {}
-    for column in text_columns:
-        column_inconsistencies[str(column)] = _text_inconsistencies(df[column])
+    columns = list(encoded.columns)
+    for position, (report, cleaned) in zip(text_positions, results):
+        column_inconsistencies[str(encoded.column_names[position])] = report
+        columns[position] = cleaned
 
     context = dict(context)
-    if text_columns:
-        updated_df = df.copy()
-        for column in text_columns:
-            updated_df[column] = updated_df[column].map(_normalize_text)
-        context["dataframe"] = updated_df
+    if text_positions:
+        encoded = encoded.with_columns(columns)
+        context["dataframe"] = encoded.to_frame()
+    context["encoded_frame"] = encoded
     context["inconsistencies"] = {
         "text_inconsistencies": column_inconsistencies,
     }
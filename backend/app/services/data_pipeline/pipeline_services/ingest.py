@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import csv
+import io
+import logging
 from typing import Any, Dict, List, Tuple
 
 import pandas as pd
@@ -14,6 +16,11 @@ _DELIMITER_CANDIDATES = [",", ";", "\t", "|"]
 _ENCODING_CANDIDATES = ["utf-8-sig", "utf-8", "cp1252", "latin-1"]
 _BAD_ROW_SAMPLE_LIMIT = 100
 
+# Parsers in order of preference; later engines are used as fallbacks.
+INGEST_ENGINES = ("pyarrow", "c", "python")
+
+logger = logging.getLogger(__name__)
+
 
 def _sniff_encoding(sample: bytes) -> str:
     # Try common encodings on the sample and fall back to latin-1.
@@ -54,7 +61,79 @@ def _read_sample(storage: StorageService, storage_key: str, size: int = 8192) ->
         return handle.read(size)
 
 
-def _parse_csv(
+def _header_names(storage: StorageService, storage_key: str, encoding: str, delimiter: str) -> List[str]:
+    # Read the full header record from the file (wide headers outgrow any fixed sample)
+    # and mangle names like pandas does.
+    with storage.open(storage_key) as handle:
+        text = io.TextIOWrapper(handle, encoding=encoding, errors="replace", newline="")
+        raw_names = next(csv.reader(text, delimiter=delimiter), [])
+    names: List[str] = []
+    counts: Dict[str, int] = {}
+    for index, raw in enumerate(raw_names):
+        name = raw if raw != "" else f"Unnamed: {index}"
+        count = counts.get(name, 0)
+        while count > 0:
+            counts[name] = count + 1
+            name = f"{name}.{count}"
+            count = counts.get(name, 0)
+        counts[name] = count + 1
+        names.append(name)
+    return names
+
+
+def _parse_csv_pyarrow(storage: StorageService, storage_key: str, encoding: str, delimiter: str) -> pd.DataFrame:
+    # Parse with the multithreaded Arrow reader, keeping every value as raw text.
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+
+    names = _header_names(storage, storage_key, encoding, delimiter)
+    if not names:
+        # Left to the pandas engines, which skip leading blank lines
+        raise pa.ArrowInvalid("CSV header row is empty.")
+
+    arrow_encoding = "utf8" if encoding in {"utf-8", "utf-8-sig"} else encoding
+    read_options = pacsv.ReadOptions(
+        encoding=arrow_encoding,
+        column_names=names,
+        skip_rows=1,
+        use_threads=True,
+    )
+    parse_options = pacsv.ParseOptions(delimiter=delimiter, newlines_in_values=True)
+    convert_options = pacsv.ConvertOptions(
+        column_types={name: pa.string() for name in names},
+        null_values=[],
+        strings_can_be_null=False,
+        quoted_strings_can_be_null=False,
+    )
+    with storage.open(storage_key) as handle:
+        table = pacsv.read_csv(
+            handle,
+            read_options=read_options,
+            parse_options=parse_options,
+            convert_options=convert_options,
+        )
+    return table.to_pandas()
+
+
+def _parse_csv_c(
+    storage: StorageService, storage_key: str, encoding: str, delimiter: str
+) -> pd.DataFrame:
+    # Parse with the pandas C engine; malformed rows raise instead of being skipped.
+    with storage.open(storage_key) as handle:
+        return pd.read_csv(
+            handle,
+            encoding=encoding,
+            sep=delimiter,
+            engine="c",
+            dtype=str,
+            keep_default_na=False,
+            na_filter=False,
+            low_memory=False,
+            on_bad_lines="error",
+        )
+
+
+def _parse_csv_python(
     storage: StorageService, storage_key: str, encoding: str, delimiter: str
 ) -> Tuple[pd.DataFrame, List[List[str]], int]:
     # Parse CSV robustly, collecting counts and samples of bad rows.
@@ -84,19 +163,55 @@ def _parse_csv(
     return df, bad_rows, bad_row_count
 
 
+def _parse_csv(
+    storage: StorageService,
+    storage_key: str,
+    encoding: str,
+    delimiter: str,
+    engine: str = "pyarrow",
+) -> Tuple[pd.DataFrame, List[List[str]], int, str]:
+    # Try the fast engines first and only fall back to the python engine for malformed rows.
+    if engine not in INGEST_ENGINES:
+        raise ValueError(f"Unknown ingest engine '{engine}'. Expected one of {INGEST_ENGINES}.")
+
+    if engine == "pyarrow":
+        try:
+            from pyarrow.lib import ArrowInvalid
+        except ImportError:
+            logger.info("INGEST: pyarrow not installed, falling back to pandas C engine")
+        else:
+            try:
+                df = _parse_csv_pyarrow(storage, storage_key, encoding, delimiter)
+                return df, [], 0, "pyarrow"
+            except ArrowInvalid as exc:
+                # Malformed rows are rejected by the C engine too, which then hands over to
+                # the python engine
+                logger.info("INGEST: pyarrow reader failed (%s), falling back to pandas C engine", exc)
+        engine = "c"
+
+    if engine == "c":
+        try:
+            df = _parse_csv_c(storage, storage_key, encoding, delimiter)
+            return df, [], 0, "c"
+        except pd.errors.ParserError as exc:
+            logger.info("INGEST: malformed rows detected (%s), using python engine", exc)
+
+    df, bad_rows, bad_row_count = _parse_csv_python(storage, storage_key, encoding, delimiter)
+    return df, bad_rows, bad_row_count, "python"
+
+
 def run(context: PipelineContext) -> PipelineContext:
     # Ingest the CSV from storage, sniff encoding/delimiter, and attach results.
     storage_key = context.get("storage_key")
     if not storage_key:
         raise ValueError("Ingestion requires 'storage_key' in context.")
 
+    settings = get_settings()
     storage = context.get("storage")
     if storage is None:
-        storage_dir = context.get("storage_dir")
-        if storage_dir is None:
-            settings = get_settings()
-            storage_dir = settings.storage_dir
+        storage_dir = context.get("storage_dir") or settings.storage_dir
         storage = StorageService(storage_dir)
+    engine = context.get("ingest_engine") or settings.ingest_engine
 
     try: # Error Catching
         sample_bytes = _read_sample(storage, storage_key)
@@ -104,7 +219,9 @@ def run(context: PipelineContext) -> PipelineContext:
         sample_text = sample_bytes.decode(encoding, errors="replace")
         delimiter = _sniff_delimiter(sample_text)
 
-        df, bad_rows, bad_row_count = _parse_csv(storage, storage_key, encoding, delimiter)
+        df, bad_rows, bad_row_count, used_engine = _parse_csv(
+            storage, storage_key, encoding, delimiter, engine=engine
+        )
     except Exception as exc:
         failed_context = dict(context)
         failed_context["pipeline_error"] = {
@@ -124,6 +241,7 @@ def run(context: PipelineContext) -> PipelineContext:
         "status": "ok",
         "encoding": encoding,
         "delimiter": delimiter,
+        "engine": used_engine,
         "bad_row_count": bad_row_count,
         "bad_row_samples": bad_rows,
         "row_count": int(df.shape[0]),
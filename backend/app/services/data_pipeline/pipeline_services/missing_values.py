@@ -2,8 +2,11 @@ from __future__ import annotations
 
 from typing import Any, Dict, List
 
+import numpy as np
 import pandas as pd
 
+from app.services.data_pipeline.models import EncodedFrame, encoded_frame_for
+
 PipelineContext = Dict[str, Any]
 
 _MISSING_TOKENS = [
@@ -18,33 +21,39 @@ _MISSING_TOKENS = [
 ]
 
 
-def _normalize_missing_tokens(df: pd.DataFrame, tokens: List[str]) -> pd.DataFrame:
-    # Replace common missing-value tokens with actual NaN values.
-    lowered_tokens = {token.lower() for token in tokens}
-    normalized = df.copy()
+def _missing_mask(values: np.ndarray, lowered_tokens: List[str]) -> np.ndarray:
+    # Distinct values that are missing tokens, compared lowercased and stripped in one vectorized pass.
+    series = pd.Series(values, dtype=object)
+    return (series.isna() | series.astype(str).str.strip().str.lower().isin(lowered_tokens)).to_numpy()
+
+
+def _normalize_missing_tokens(encoded: EncodedFrame, tokens: List[str]) -> EncodedFrame:
+    # Replace common missing-value tokens with actual NaN values, checking each distinct value once.
+    lowered_tokens = sorted({token.strip().lower() for token in tokens})
+    columns = [column.drop_values(_missing_mask(column.uniques, lowered_tokens)) for column in encoded.columns]
+    return encoded.with_columns(columns)
 
-    def _to_missing(value: Any) -> Any:
-        if value is None:
-            return pd.NA
-        text = str(value).strip().lower()
-        if text in lowered_tokens:
-            return pd.NA
-        return value
 
-    return normalized.map(_to_missing)
+def missing_tokens_for(context: PipelineContext) -> List[str]:
+    # Datasets may bring their own token list; it replaces the defaults.
+    tokens = context.get("missing_tokens")
+    return list(tokens) if tokens is not None else list(_MISSING_TOKENS)
 
 
-def _missing_stats(df: pd.DataFrame) -> Dict[str, Any]:
+def _missing_stats(encoded: EncodedFrame) -> Dict[str, Any]:
     # Calculate missing counts and rates per column and overall.
-    missing_counts = df.isna().sum()
-    total_cells = int(df.shape[0] * df.shape[1]) if df.shape[0] and df.shape[1] else 0
-    total_missing = int(missing_counts.sum())
+    row_count = encoded.row_count
+    column_count = len(encoded.columns)
+    total_cells = int(row_count * column_count) if row_count and column_count else 0
+    total_missing = 0
 
     per_column = {}
-    for column, count in missing_counts.items():
-        per_column[str(column)] = {
+    for name, column in zip(encoded.column_names, encoded.columns):
+        count = column.null_count
+        total_missing += count
+        per_column[str(name)] = {
             "missing_count": int(count),
-            "missing_rate": float(count / df.shape[0]) if df.shape[0] else 0.0,
+            "missing_rate": float(count / row_count) if row_count else 0.0,
         }
 
     overall_rate = float(total_missing / total_cells) if total_cells else 0.0
@@ -57,11 +66,11 @@ def _missing_stats(df: pd.DataFrame) -> Dict[str, Any]:
     }
 
 
-def _drop_all_missing_rows(df: pd.DataFrame) -> tuple[pd.DataFrame, int, int, int]:
+def _drop_all_missing_rows(encoded: EncodedFrame) -> tuple[EncodedFrame, int, int, int]:
     # Remove rows where all columns are missing after token normalization.
-    rows_before = int(df.shape[0])
-    cleaned = df.dropna(axis=0, how="all")
-    rows_after = int(cleaned.shape[0])
+    rows_before = encoded.row_count
+    cleaned = encoded.take_rows(~encoded.all_missing_rows())
+    rows_after = cleaned.row_count
     removed = rows_before - rows_after
     return cleaned, removed, rows_before, rows_after
 
@@ -72,14 +81,16 @@ def run(context: PipelineContext) -> PipelineContext:
     if df is None:
         raise ValueError("Missing values requires 'dataframe' in context.")
 
-    normalized = _normalize_missing_tokens(df, _MISSING_TOKENS)
-    cleaned_df, removed_rows, rows_before, rows_after = _drop_all_missing_rows(normalized)
-    stats = _missing_stats(cleaned_df)
+    tokens = missing_tokens_for(context)
+    normalized = _normalize_missing_tokens(encoded_frame_for(context), tokens)
+    cleaned, removed_rows, rows_before, rows_after = _drop_all_missing_rows(normalized)
+    stats = _missing_stats(cleaned)
 
     context = dict(context)
-    context["dataframe"] = cleaned_df
+    context["dataframe"] = cleaned.to_frame()
+    context["encoded_frame"] = cleaned
     context["missing_values"] = {
-        "tokens": _MISSING_TOKENS,
+        "tokens": tokens,
         "rows_all_missing_removed": removed_rows,
         "row_count_before": rows_before,
         "row_count_after": rows_after,
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import get_settings
+from app.services.data_pipeline.models import EncodedColumn, encoded_frame_for
+from app.services.data_pipeline.parallel import map_columns
+
+PipelineContext = Dict[str, Any]
+
+OUTLIER_DETECTORS = ("iqr", "mad", "isolation")
+_IQR_FACTOR = 1.5
+# Modified z-score cut-off (Iglewicz and Hoaglin); 0.6745 makes the MAD comparable to a std
+_MAD_THRESHOLD = 3.5
+_MAD_SCALE = 0.6745
+# Used when more than half the values equal the median and the MAD is zero
+_MEAN_AD_SCALE = 1.253314
+_ISOLATION_TREES = 100
+_ISOLATION_SUBSAMPLE = 256
+_ISOLATION_THRESHOLD = 0.65
+_SAMPLE_INDEX_LIMIT = 10
+_SAMPLE_SEED = 0
+
+
+@dataclass(frozen=True)
+class OutlierOptions:
+    isolation: bool = False
+    # Thresholds are estimated on this many sampled rows for longer columns; 0 disables sampling
+    sample_rows: int = 1_000_000
+
+    @classmethod
+    def from_settings(cls) -> "OutlierOptions":
+        settings = get_settings()
+        return cls(isolation=settings.pipeline_outlier_isolation, sample_rows=settings.pipeline_outlier_sample_rows)
+
+    @property
+    def detectors(self) -> List[str]:
+        return [name for name in OUTLIER_DETECTORS if name != "isolation" or self.isolation]
+
+
+def _numeric_uniques(column: EncodedColumn) -> np.ndarray:
+    # Distinct values as floats (surrounding whitespace is accepted); values that do not parse
+    # become NaN and are left out.
+    if column.uniques.dtype.kind == "f":
+        return column.uniques
+    parsed = pd.to_numeric(column.values(), errors="coerce")
+    return parsed.to_numpy(dtype=float, na_value=np.nan)
+
+
+def _weighted_quantiles(values: np.ndarray, counts: np.ndarray, quantiles: List[float]) -> np.ndarray:
+    # Linear-interpolated quantiles of the values repeated by their counts, without repeating them.
+    order = np.argsort(values)
+    ordered = values[order]
+    cumulative = np.cumsum(counts[order])
+    positions = (cumulative[-1] - 1) * np.asarray(quantiles, dtype=float)
+    lower = np.floor(positions)
+    below = ordered[np.searchsorted(cumulative, lower, side="right")]
+    above = ordered[np.searchsorted(cumulative, np.minimum(lower + 1, cumulative[-1] - 1), side="right")]
+    return below + (above - below) * (positions - lower)
+
+
+def _iqr_bounds(q1: float, q3: float) -> Dict[str, float]:
+    spread = q3 - q1
+    return {"q1": float(q1), "q3": float(q3), "lower": float(q1 - _IQR_FACTOR * spread), "upper": float(q3 + _IQR_FACTOR * spread)}
+
+
+def _robust_scale(values: np.ndarray, counts: np.ndarray, median: float) -> Tuple[float, float]:
+    # Median absolute deviation and the scale modified z-scores divide by.
+    deviations = np.abs(values - median)
+    mad = _weighted_quantiles(deviations, counts, [0.5])[0]
+    if mad > 0:
+        return float(mad), float(mad / _MAD_SCALE)
+    return 0.0, _MEAN_AD_SCALE * float((deviations * counts).sum() / counts.sum())
+
+
+def _average_path(size: int) -> float:
+    # Expected path length of an unsuccessful binary search tree lookup among ``size`` points.
+    if size > 2:
+        return 2.0 * (np.log(size - 1) + np.euler_gamma) - 2.0 * (size - 1) / size
+    return 1.0 if size == 2 else 0.0
+
+
+def _isolation_tree(sample: np.ndarray, rng: np.random.Generator, depth_limit: int) -> Tuple[np.ndarray, np.ndarray]:
+    # A one-dimensional isolation tree is a set of split points; the leaves are the intervals
+    # between them. Returns the split points in order and each interval's path length.
+    splits: List[float] = []
+    lengths: List[float] = []
+
+    def grow(points: np.ndarray, depth: int) -> None:
+        if depth >= depth_limit or len(points) <= 1 or points.min() == points.max():
+            lengths.append(depth + _average_path(len(points)))
+            return
+        split = rng.uniform(points.min(), points.max())
+        grow(points[points < split], depth + 1)
+        splits.append(split)
+        grow(points[points >= split], depth + 1)
+
+    grow(sample, 0)
+    return np.asarray(splits), np.asarray(lengths)
+
+
+def _isolation_scores(fit_values: np.ndarray, fit_counts: np.ndarray, values: np.ndarray) -> np.ndarray:
+    # Isolation-forest anomaly scores for ``values``, with trees grown on subsamples drawn from
+    # the weighted fit values. The averaged score is constant between consecutive split points
+    # of all trees, so it is evaluated once per interval and looked up with one searchsorted.
+    rng = np.random.default_rng(_SAMPLE_SEED)
+    subsample = int(min(_ISOLATION_SUBSAMPLE, fit_counts.sum()))
+    depth_limit = int(np.ceil(np.log2(max(subsample, 2))))
+    samples = rng.choice(fit_values, size=(_ISOLATION_TREES, subsample), p=fit_counts / fit_counts.sum())
+    trees = [_isolation_tree(sample, rng, depth_limit) for sample in samples]
+    boundaries = np.unique(np.concatenate([splits for splits, _ in trees]))
+    representatives = np.concatenate([[-np.inf], boundaries])
+    path_lengths = np.mean(
+        [lengths[np.searchsorted(splits, representatives, side="right")] for splits, lengths in trees], axis=0
+    )
+    interval_scores = 2.0 ** (-path_lengths / max(_average_path(subsample), 1.0))
+    return interval_scores[np.searchsorted(boundaries, values, side="right")]
+
+
+def _threshold_counts(column: EncodedColumn, sample_rows: int) -> Tuple[np.ndarray, Optional[int]]:
+    # Row counts per distinct value used to fit the detectors: all rows, or a uniform row sample.
+    if not sample_rows or column.row_count <= sample_rows:
+        return column.counts, None
+    rng = np.random.default_rng(_SAMPLE_SEED)
+    codes = column.codes[rng.integers(0, column.row_count, sample_rows)]
+    return np.bincount(codes[codes >= 0], minlength=column.distinct_count), sample_rows
+
+
+def _flag_report(column: EncodedColumn, flagged: np.ndarray, valid_rows: int) -> Dict[str, Any]:
+    # Exact counts from the distinct values, plus the positions of the first flagged rows.
+    count = int(column.counts[flagged].sum())
+    rows = np.flatnonzero(np.append(flagged, False)[column.codes])[:_SAMPLE_INDEX_LIMIT] if count else []
+    return {
+        "count": count,
+        "rate": float(count / valid_rows) if valid_rows else 0.0,
+        "sample_indices": [int(row) for row in rows],
+    }
+
+
+def _row_labels(result: Dict[str, Any], index: pd.Index) -> Dict[str, Any]:
+    # Report sample rows by their index labels rather than positions.
+    for detector in OUTLIER_DETECTORS:
+        if detector in result:
+            labels = index[result[detector]["sample_indices"]]
+            result[detector]["sample_indices"] = [
+                int(label) if isinstance(label, (int, np.integer)) else str(label) for label in labels
+            ]
+    return result
+
+
+def _column_outliers(item: Tuple[EncodedColumn, OutlierOptions]) -> Dict[str, Any]:
+    # Fit each detector on the distinct values weighted by their row counts, then flag values.
+    column, options = item
+    values = _numeric_uniques(column)
+    fit_counts, sample_size = _threshold_counts(column, options.sample_rows)
+    usable = ~np.isnan(values)
+    fit_usable = usable & (fit_counts > 0)
+    valid_rows = int(column.counts[usable].sum())
+    result: Dict[str, Any] = {
+        "value_count": valid_rows,
+        "sampled": sample_size is not None,
+        "sample_size": sample_size,
+        "counts_estimated": False,
+    }
+    if not fit_usable.any():
+        return result
+
+    fit_values, fit_weights = values[fit_usable], fit_counts[fit_usable]
+    q1, median, q3 = _weighted_quantiles(fit_values, fit_weights, [0.25, 0.5, 0.75])
+    bounds = _iqr_bounds(q1, q3)
+    iqr_flags = usable & ((values < bounds["lower"]) | (values > bounds["upper"]))
+    result["iqr"] = {**bounds, **_flag_report(column, iqr_flags, valid_rows)}
+
+    mad, scale = _robust_scale(fit_values, fit_weights, median)
+    with np.errstate(invalid="ignore"):
+        robust_z = np.abs(values - median) / scale if scale > 0 else np.zeros_like(values)
+    result["mad"] = {
+        "median": float(median),
+        "mad": mad,
+        "threshold": _MAD_THRESHOLD,
+        **_flag_report(column, usable & (robust_z > _MAD_THRESHOLD), valid_rows),
+    }
+
+    if options.isolation:
+        scores = _isolation_scores(fit_values, fit_weights, values)
+        result["isolation"] = {
+            "threshold": _ISOLATION_THRESHOLD,
+            "trees": _ISOLATION_TREES,
+            **_flag_report(column, usable & (scores > _ISOLATION_THRESHOLD), valid_rows),
+        }
+    return result
+
+
+def _sampled_outliers(values: np.ndarray, labels: np.ndarray, value_count: int, options: OutlierOptions) -> Dict[str, Any]:
+    # Outliers of a column seen only through a uniform row sample (the streaming pipeline);
+    # counts are scaled up to the column's ``value_count`` numeric values.
+    # Factorized directly so the uniques stay a float array
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    column = EncodedColumn(codes=codes, uniques=uniques, counts=counts, dtype=float)
+    result = _row_labels(_column_outliers((column, replace(options, sample_rows=0))), pd.Index(labels))
+    sampled_values = result["value_count"]
+    if sampled_values == value_count:
+        return result
+    scale = value_count / sampled_values if sampled_values else 0.0
+    for detector in OUTLIER_DETECTORS:
+        if detector in result:
+            result[detector]["count"] = int(round(result[detector]["count"] * scale))
+    result.update(value_count=value_count, sampled=True, sample_size=len(values), counts_estimated=True)
+    return result
+
+
+def run(context: PipelineContext) -> PipelineContext:
+    # Flag outliers in the numeric columns found by type inference and attach the counts.
+    df = context.get("dataframe")
+    if df is None:
+        raise ValueError("Outlier analysis requires 'dataframe' in context.")
+
+    encoded = encoded_frame_for(context)
+    inferred = context.get("type_inference", {}).get("columns", {})
+    options = context.get("outlier_options") or OutlierOptions.from_settings()
+    positions = [
+        position
+        for position, name in enumerate(encoded.column_names)
+        if inferred.get(str(name), {}).get("inferred_type") == "numeric"
+    ]
+    results = map_columns(context, _column_outliers, [(encoded.columns[position], options) for position in positions])
+
+    context = dict(context)
+    context["outlier_analysis"] = {
+        "detectors": options.detectors,
+        "columns": {
+            str(encoded.column_names[position]): _row_labels(result, encoded.index)
+            for position, result in zip(positions, results)
+        },
+    }
+    return context
@@ -6,6 +6,7 @@ from datetime import datetime, timezone
 from typing import Any, Dict
 
 from app.core.config import get_settings
+from app.services.data_pipeline.cleaned_output import cleaned_key as _cleaned_key, typed_frame, write_parquet
 from app.services.storage import StorageService
 
 PipelineContext = Dict[str, Any]
@@ -23,6 +24,9 @@ def _build_report(context: PipelineContext) -> Dict[str, Any]:
         "missing_values": context.get("missing_values"),
         "type_inference": context.get("type_inference"),
         "inconsistencies": context.get("inconsistencies"),
+        "outlier_analysis": context.get("outlier_analysis"),
+        "type_materialization": context.get("type_materialization"),
+        "metrics": context.get("pipeline_metrics"),
     }
 
 
@@ -49,10 +53,14 @@ def run(context: PipelineContext) -> PipelineContext:
     storage = _resolve_storage(context)
     df = context.get("dataframe")
     cleaned_key = None
+    typed = None
     if df is not None:
-        cleaned_key = f"datasets/{dataset_id}/cleaned.csv"
-        cleaned_payload = df.to_csv(index=False).encode("utf-8")
-        storage.save(cleaned_key, io.BytesIO(cleaned_payload))
+        # Store the cleaned data typed as Parquet so readers skip text parsing
+        cleaned_key = _cleaned_key(dataset_id)
+        typed = context.get("typed_dataframe")
+        if typed is None:
+            typed = typed_frame(df, context.get("type_inference"), context.get("encoded_frame"))
+        write_parquet(storage, cleaned_key, typed, get_settings().cleaned_row_group_size)
 
     report_key = f"datasets/{dataset_id}/quality_report.json"
     storage.save(report_key, io.BytesIO(payload))
@@ -63,4 +71,5 @@ def run(context: PipelineContext) -> PipelineContext:
         "report": report,
         "cleaned_storage_key": cleaned_key,
     }
+    context["cleaned_dataframe"] = typed
     return context
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import Any, Dict, List
 
-import pandas as pd
+from app.services.data_pipeline.models import EncodedFrame, encoded_frame_for
 
 PipelineContext = Dict[str, Any]
 
@@ -29,13 +29,12 @@ def _find_unnamed_columns(columns: List[str]) -> List[str]:
     return [name for name in columns if str(name).strip().lower().startswith("unnamed")]
 
 
-def _find_constant_columns(df: pd.DataFrame) -> List[str]:
+def _find_constant_columns(encoded: EncodedFrame) -> List[str]:
     # Detect columns with a single unique value (including NaN).
     constant_cols = []
-    for idx, col in enumerate(df.columns):
-        series = df.iloc[:, idx]
-        if series.nunique(dropna=False) <= 1:
-            constant_cols.append(str(col))
+    for name, column in zip(encoded.column_names, encoded.columns):
+        if column.distinct_count + (1 if column.null_count else 0) <= 1:
+            constant_cols.append(str(name))
     return constant_cols
 
 
@@ -45,11 +44,12 @@ def run(context: PipelineContext) -> PipelineContext:
     if df is None:
         raise ValueError("Schema check requires 'dataframe' in context.")
 
+    encoded = encoded_frame_for(context)
     columns = [str(name) for name in df.columns]
     duplicate_columns = _find_duplicate_columns(columns)
     empty_columns = _find_empty_columns(columns)
     unnamed_columns = _find_unnamed_columns(columns)
-    constant_columns = _find_constant_columns(df)
+    constant_columns = _find_constant_columns(encoded)
 
     context = dict(context)
     context["schema_check"] = {
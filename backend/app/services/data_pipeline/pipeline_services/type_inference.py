@@ -1,9 +1,14 @@
 from __future__ import annotations
 
-from typing import Any, Dict
+import re
+from typing import Any, Dict, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
+from app.services.data_pipeline.models import EncodedColumn, encoded_frame_for
+from app.services.data_pipeline.parallel import map_columns
+
 PipelineContext = Dict[str, Any]
 
 _DATE_CANDIDATES = [
@@ -24,88 +29,146 @@ _MIN_CONFIDENCE = 0.7
 _BOOL_THRESHOLD = 0.95
 _DATETIME_THRESHOLD = 0.7
 _DATE_YYYYMMDD_THRESHOLD = 0.8
+# Sampled inference: rows taken from each end and at random, and how close a sampled rate may
+# come to a threshold before the full column is checked.
+_SAMPLE_EDGE_ROWS = 100
+_SAMPLE_RANDOM_ROWS = 800
+_ESCALATION_MARGIN = 0.05
+
 
+def _weighted_rate(mask: Any, weights: np.ndarray) -> float:
+    # Share of rows (not distinct values) for which the mask holds.
+    total = weights.sum()
+    if not total:
+        return 0.0
+    return float((np.asarray(mask, dtype=bool) * weights).sum() / total)
 
-def _try_bool(series: pd.Series) -> float:
+
+def _try_bool(values: pd.Series, weights: np.ndarray) -> float:
     # Checks if value can be changed to boolean
-    values = series.dropna().astype(str).str.strip().str.lower()
     if values.empty:
         return 0.0
-    matches = values.isin(_BOOL_TRUE | _BOOL_FALSE)
-    return float(matches.mean())
+    matches = values.str.lower().isin(_BOOL_TRUE | _BOOL_FALSE)
+    return _weighted_rate(matches, weights)
 
 
-def _try_numeric(series: pd.Series) -> float:
+def _try_numeric(values: pd.Series, weights: np.ndarray) -> float:
     # Checks if value can be changed to numeric
-    values = series.dropna().astype(str).str.strip()
     if values.empty:
         return 0.0
     parsed = pd.to_numeric(values, errors="coerce")
-    return float(parsed.notna().mean())
+    return _weighted_rate(parsed.notna(), weights)
+
+
+# Regex for the text each strptime directive can match (a superset of what pandas accepts),
+# so a value whose shape fits no candidate can never parse with it.
+_DIRECTIVE_PATTERNS = {"%Y": r"\d{4}", "%m": r"\d{1,2}", "%d": r" ?\d{1,2}", "%H": r"\d{1,2}", "%M": r"\d{1,2}", "%S": r"\d{1,2}"}
+
+
+def _format_pattern(fmt: str) -> re.Pattern[str]:
+    pattern = re.escape(fmt)
+    for directive, regex in _DIRECTIVE_PATTERNS.items():
+        pattern = pattern.replace(re.escape(directive), regex)
+    return re.compile(pattern)
+
+
+_DATE_PATTERNS = [(fmt, _format_pattern(fmt)) for fmt in _DATE_CANDIDATES]
 
 
-def _try_datetime(series: pd.Series) -> float:
-    # Checks if value can be changed to datetime
-    values = series.dropna().astype(str).str.strip()
+def _shape_formats(values: pd.Series) -> pd.DataFrame:
+    # One pass over the values: reduce each to a shape (digits -> 9) and match the few distinct
+    # shapes against every candidate format. Returns one boolean column per candidate.
+    shapes = values.str.replace(r"\d", "9", regex=True)
+    codes, distinct_shapes = pd.factorize(shapes)
+    table = np.array(
+        [[pattern.fullmatch(shape) is not None for _, pattern in _DATE_PATTERNS] for shape in distinct_shapes],
+        dtype=bool,
+    ).reshape(len(distinct_shapes), len(_DATE_PATTERNS))
+    return pd.DataFrame(table[codes], columns=_DATE_CANDIDATES, index=values.index)
+
+
+def _try_datetime(values: pd.Series, weights: np.ndarray) -> Tuple[float, Optional[str]]:
+    # Checks if value can be changed to datetime; returns the best rate and its format.
+    # Only formats whose shape fits the values are parsed, and only on the values that fit.
     if values.empty:
-        return 0.0
-    best_rate = 0.0
+        return 0.0, None
+    fits = _shape_formats(values)
+    shares = {fmt: _weighted_rate(fits[fmt], weights) for fmt in _DATE_CANDIDATES}
+    best_rate, best_format = 0.0, None
+    # A parse rate never exceeds the format's shape share, so most candidates are never parsed.
+    # Ties keep the earlier candidate, like trying them in order.
     for fmt in _DATE_CANDIDATES:
-        parsed = pd.to_datetime(values, errors="coerce", format=fmt)
-        rate = float(parsed.notna().mean())
+        if shares[fmt] < best_rate or shares[fmt] == 0.0 or (shares[fmt] == best_rate and best_format is not None):
+            continue
+        mask = fits[fmt].to_numpy()
+        parsed = np.zeros(len(values), dtype=bool)
+        parsed[mask] = pd.to_datetime(values[mask], errors="coerce", format=fmt).notna().to_numpy()
+        rate = _weighted_rate(parsed, weights)
         if rate > best_rate:
-            best_rate = rate
-    return best_rate
+            best_rate, best_format = rate, fmt
+    return best_rate, best_format
 
 
-def _try_yyyymmdd(series: pd.Series) -> float:
+def _try_yyyymmdd(values: pd.Series, weights: np.ndarray) -> float:
     # Detect numeric-like dates in YYYYMMDD format.
-    values = series.dropna().astype(str).str.strip()
     if values.empty:
         return 0.0
     pattern = values.str.fullmatch(r"\d{8}")
     if pattern is None or not pattern.any():
         return 0.0
     parsed = pd.to_datetime(values[pattern], errors="coerce", format="%Y%m%d")
-    return float(parsed.notna().mean())
+    return _weighted_rate(parsed.notna(), weights[pattern.to_numpy()])
 
 
-def _is_year_like(series: pd.Series) -> bool:
+def _is_year_like(values: pd.Series, weights: np.ndarray) -> bool:
     # Detect year-like numeric columns (integer-ish values in a year range).
-    values = series.dropna().astype(str).str.strip()
     if values.empty:
         return False
-    numeric = pd.to_numeric(values, errors="coerce").dropna()
-    if numeric.empty:
+    numeric = pd.to_numeric(values, errors="coerce")
+    parsed = numeric.notna().to_numpy()
+    if not parsed.any():
         return False
+    numeric = numeric[parsed]
+    numeric_weights = weights[parsed]
     integer_like = (numeric.round(0) - numeric).abs() <= 1e-9
-    integer_rate = float(integer_like.mean())
+    integer_rate = _weighted_rate(integer_like, numeric_weights)
     in_range = numeric.between(_YEAR_MIN, _YEAR_MAX)
-    range_rate = float(in_range.mean())
+    range_rate = _weighted_rate(in_range, numeric_weights)
     return integer_rate >= 0.95 and range_rate >= 0.95
 
 
-def _infer_type(series: pd.Series) -> Dict[str, Any]:
-    # Checks which type fits best and returns confidence scores for each type (based on cosine similarity)
-    numeric_rate = _try_numeric(series)
-    yyyymmdd_rate = _try_yyyymmdd(series)
-    datetime_rate = 0.0
+def _probe(values: pd.Series, weights: np.ndarray) -> Dict[str, Any]:
+    # Raw match rates before any threshold is applied, plus the best datetime format.
+    numeric_rate = _try_numeric(values, weights)
+    yyyymmdd_rate = _try_yyyymmdd(values, weights)
+    datetime_rate, datetime_format = 0.0, None
     if numeric_rate < 0.95:
-        datetime_rate = _try_datetime(series)
-    elif not _is_year_like(series):
+        datetime_rate, datetime_format = _try_datetime(values, weights)
+    elif not _is_year_like(values, weights):
         datetime_rate = 0.0
+    return {
+        "boolean": _try_bool(values, weights),
+        "numeric": numeric_rate,
+        "datetime": datetime_rate,
+        "yyyymmdd": yyyymmdd_rate,
+        "datetime_format": datetime_format,
+    }
+
 
-    bool_rate = _try_bool(series)
+def _decide(probe: Dict[str, Any]) -> Dict[str, Any]:
+    bool_rate = probe["boolean"]
     if bool_rate < _BOOL_THRESHOLD:
         bool_rate = 0.0
-    if yyyymmdd_rate >= _DATE_YYYYMMDD_THRESHOLD:
-        datetime_rate = max(datetime_rate, yyyymmdd_rate)
+    datetime_rate = probe["datetime"]
+    datetime_format = probe["datetime_format"]
+    if probe["yyyymmdd"] >= _DATE_YYYYMMDD_THRESHOLD and probe["yyyymmdd"] > datetime_rate:
+        datetime_rate, datetime_format = probe["yyyymmdd"], "%Y%m%d"
     if datetime_rate < _DATETIME_THRESHOLD:
         datetime_rate = 0.0
 
     rates = {
         "boolean": bool_rate,
-        "numeric": numeric_rate,
+        "numeric": probe["numeric"],
         "datetime": datetime_rate,
     }
 
@@ -119,18 +182,135 @@ def _infer_type(series: pd.Series) -> Dict[str, Any]:
         "inferred_type": inferred_type,
         "confidence": float(confidence),
         "rates": rates,
+        # Format the cleaned column can be parsed with, without detecting it again
+        "datetime_format": datetime_format if inferred_type == "datetime" else None,
     }
 
 
+def _near_boundary(probe: Dict[str, Any]) -> bool:
+    # A sample decides the type only when no rate is close to a threshold it is compared against
+    # and the two best candidates are clearly apart.
+    checks = [
+        (probe["boolean"], _BOOL_THRESHOLD),
+        (probe["numeric"], 0.95),
+        (probe["numeric"], _MIN_CONFIDENCE),
+        (probe["yyyymmdd"], _DATE_YYYYMMDD_THRESHOLD),
+        (max(probe["datetime"], probe["yyyymmdd"]), _DATETIME_THRESHOLD),
+        (probe["boolean"], _MIN_CONFIDENCE),
+    ]
+    if any(abs(rate - threshold) <= _ESCALATION_MARGIN for rate, threshold in checks):
+        return True
+    second, best = sorted(_decide(probe)["rates"].values())[-2:]
+    return second > 0 and best - second <= _ESCALATION_MARGIN
+
+
+def _sample_rows(codes: np.ndarray) -> np.ndarray:
+    # Head, tail and seeded random positions among the non-missing rows.
+    present = np.flatnonzero(codes >= 0)
+    if len(present) <= 2 * _SAMPLE_EDGE_ROWS + _SAMPLE_RANDOM_ROWS:
+        return present
+    middle = present[_SAMPLE_EDGE_ROWS:-_SAMPLE_EDGE_ROWS]
+    random_rows = np.random.default_rng(0).choice(middle, _SAMPLE_RANDOM_ROWS, replace=False)
+    return np.concatenate([present[:_SAMPLE_EDGE_ROWS], np.sort(random_rows), present[-_SAMPLE_EDGE_ROWS:]])
+
+
+def _infer_type(column: EncodedColumn, sample: bool = True) -> Dict[str, Any]:
+    # Checks which type fits best and returns confidence scores for each type (based on cosine similarity)
+    # Every check runs on the distinct values and weights them by their row counts. Columns with
+    # many distinct values are first checked on a row sample and escalate to all values when the
+    # sample lands near a decision threshold.
+    sample_size = None
+    if sample and column.distinct_count > 2 * _SAMPLE_EDGE_ROWS + _SAMPLE_RANDOM_ROWS:
+        rows = _sample_rows(column.codes)
+        sample_counts = np.bincount(column.codes[rows], minlength=column.distinct_count)
+        present = np.flatnonzero(sample_counts)
+        values = pd.Series(column.uniques[present], dtype=object).astype(str).str.strip()
+        probe = _probe(values, sample_counts[present])
+        sample_size = int(len(rows))
+        if not _near_boundary(probe):
+            return {**_decide(probe), "sample_size": sample_size, "escalated": False}
+
+    values = column.values().astype(str).str.strip()
+    result = _decide(_probe(values, column.counts))
+    return {**result, "sample_size": sample_size, "escalated": sample_size is not None}
+
+
+class TypeCounters:
+    """Row counts behind every type-inference rate, accumulated chunk by chunk.
+
+    Used by the streaming pipeline: the counts are exact and mergeable, so the decision
+    matches the one made over the whole column at once.
+    """
+
+    def __init__(self) -> None:
+        self.rows = 0
+        self.matches = {"boolean": 0, "numeric": 0, "yyyymmdd": 0}
+        self.format_matches = dict.fromkeys(_DATE_CANDIDATES, 0)
+        # Facts that decide whether a numeric column can be stored losslessly as Int64
+        self.leading_zeros = False
+        self.integral = True
+
+    def update(self, column: EncodedColumn) -> None:
+        present = np.flatnonzero(column.counts)
+        if not len(present):
+            return
+        values = pd.Series(column.uniques[present], dtype=object).astype(str).str.strip()
+        weights = column.counts[present]
+        self.rows += int(weights.sum())
+
+        self.matches["boolean"] += int(weights[values.str.lower().isin(_BOOL_TRUE | _BOOL_FALSE).to_numpy()].sum())
+        numbers = pd.to_numeric(values, errors="coerce")
+        parsed = numbers.notna().to_numpy()
+        self.matches["numeric"] += int(weights[parsed].sum())
+        if parsed.any():
+            finite = numbers[parsed].to_numpy(dtype=float)
+            self.integral = self.integral and bool(
+                np.isfinite(finite).all() and (np.round(finite) == finite).all() and np.abs(finite).max() < 2**53
+            )
+        self.leading_zeros = self.leading_zeros or bool(values.str.fullmatch(r"[+-]?0\d+").any())
+
+        compact = values.str.fullmatch(r"\d{8}").to_numpy()
+        if compact.any():
+            dates = pd.to_datetime(values[compact], errors="coerce", format="%Y%m%d").notna().to_numpy()
+            self.matches["yyyymmdd"] += int(weights[compact][dates].sum())
+
+        fits = _shape_formats(values)
+        for fmt in _DATE_CANDIDATES:
+            mask = fits[fmt].to_numpy()
+            if mask.any():
+                dates = pd.to_datetime(values[mask], errors="coerce", format=fmt).notna().to_numpy()
+                self.format_matches[fmt] += int(weights[mask][dates].sum())
+
+    def _rate(self, count: int) -> float:
+        return float(count / self.rows) if self.rows else 0.0
+
+    def result(self) -> Dict[str, Any]:
+        numeric_rate = self._rate(self.matches["numeric"])
+        datetime_rate, datetime_format = 0.0, None
+        if numeric_rate < 0.95:
+            for fmt in _DATE_CANDIDATES:
+                rate = self._rate(self.format_matches[fmt])
+                if rate > datetime_rate:
+                    datetime_rate, datetime_format = rate, fmt
+        probe = {
+            "boolean": self._rate(self.matches["boolean"]),
+            "numeric": numeric_rate,
+            "datetime": datetime_rate,
+            "yyyymmdd": self._rate(self.matches["yyyymmdd"]),
+            "datetime_format": datetime_format,
+        }
+        return {**_decide(probe), "sample_size": None, "escalated": False}
+
+
 def run(context: PipelineContext) -> PipelineContext:
     # Infer column types and attach per-column inference details.
     df = context.get("dataframe")
     if df is None:
         raise ValueError("Type inference requires 'dataframe' in context.")
 
-    column_types = {}
-    for column in df.columns:
-        column_types[str(column)] = _infer_type(df[column])
+    encoded = encoded_frame_for(context)
+    results = map_columns(context, _infer_type, encoded.columns)
+    column_types = {str(name): result for name, result in zip(encoded.column_names, results)}
 
     context = dict(context)
     context["type_inference"] = {"columns": column_types}
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import sys
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from app.services.data_pipeline.cleaned_output import typed_frame
+from app.services.data_pipeline.models import EncodedColumn, encoded_frame_for
+
+PipelineContext = Dict[str, Any]
+
+
+def _memory_by_column(df: pd.DataFrame) -> List[int]:
+    # Deep memory per column, counting the Python objects behind text cells.
+    return [int(value) for value in df.memory_usage(deep=True, index=False)]
+
+
+def text_memory_bytes(column: EncodedColumn) -> int:
+    # What deep memory_usage reports for the column materialized as text, without building it:
+    # a pointer per row plus the size of the object behind each cell.
+    sizes = np.fromiter((sys.getsizeof(value) for value in column.uniques), dtype=np.int64, count=column.distinct_count)
+    return int(8 * column.row_count + (sizes * column.counts).sum() + column.null_count * sys.getsizeof(pd.NA))
+
+
+def run(context: PipelineContext) -> PipelineContext:
+    # Convert the cleaned text frame to its inferred dtypes once, so later steps and readers
+    # get typed columns, and record what the conversion saved.
+    df = context.get("dataframe")
+    if df is None:
+        raise ValueError("Type materialization requires 'dataframe' in context.")
+
+    typed = typed_frame(df, context.get("type_inference"), encoded_frame_for(context))
+    before = _memory_by_column(df)
+    after = _memory_by_column(typed)
+
+    context = dict(context)
+    context["typed_dataframe"] = typed
+    context["type_materialization"] = {
+        "memory_bytes_before": sum(before),
+        "memory_bytes_after": sum(after),
+        "columns": {
+            str(name): {
+                "dtype": str(dtype),
+                "memory_bytes_before": before[position],
+                "memory_bytes_after": after[position],
+            }
+            for position, (name, dtype) in enumerate(zip(typed.columns, typed.dtypes))
+        },
+    }
+    return context
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+import io
+import json
+import logging
+import posixpath
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.services.storage import StorageService
+
+PipelineContext = Dict[str, Any]
+
+CACHE_PREFIX = "pipeline_cache"
+_ENTRY_FILE = "entry.json"
+_REPORT_FILE = "quality_report.json"
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineResultCache:
+    """Stores pipeline artifacts keyed by upload content hash and pipeline version.
+
+    Layout: ``pipeline_cache/<content_hash>/<pipeline_version>/`` holds copies of the
+    artifacts written by the quality report step plus an ``entry.json`` descriptor.
+    Entries of other pipeline versions can never hit again and are evicted, as are
+    entries older than ``max_age_seconds``; the rest is trimmed least-recently-used
+    first until the cache fits into ``max_bytes``.
+    """
+
+    def __init__(self, storage: StorageService, max_age_seconds: float, max_bytes: int):
+        self._storage = storage
+        self._max_age_seconds = max_age_seconds
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _entry_dir(self, content_hash: str, version: str) -> str:
+        return f"{CACHE_PREFIX}/{content_hash}/{version}"
+
+    def _read_entry(self, entry_key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with self._storage.open(entry_key) as handle:
+                return json.load(handle)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write_entry(self, entry_key: str, entry: Dict[str, Any]) -> None:
+        payload = json.dumps(entry, ensure_ascii=True, indent=2).encode("utf-8")
+        self._storage.save(entry_key, io.BytesIO(payload))
+
+    def restore(self, content_hash: str, version: str, dataset_id: str) -> Optional[PipelineContext]:
+        """Copy cached artifacts into the dataset folder. Returns the quality_report context or None."""
+        entry_dir = self._entry_dir(content_hash, version)
+        entry_key = f"{entry_dir}/{_ENTRY_FILE}"
+        with self._lock:
+            entry = self._read_entry(entry_key)
+            if entry is None:
+                return None
+            if time.time() - entry.get("created_at", 0) > self._max_age_seconds:
+                self._storage.delete_prefix(entry_dir)
+                return None
+            try:
+                restored = {
+                    name: self._storage.copy(f"{entry_dir}/{name}", f"datasets/{dataset_id}/{name}")
+                    for name in entry["artifacts"]
+                    if name != _REPORT_FILE
+                }
+                with self._storage.open(f"{entry_dir}/{_REPORT_FILE}") as handle:
+                    report = json.load(handle)
+            except FileNotFoundError:
+                self._storage.delete_prefix(entry_dir)
+                return None
+            entry["last_used_at"] = time.time()
+            entry["hits"] = int(entry.get("hits", 0)) + 1
+            self._write_entry(entry_key, entry)
+
+        report["dataset_id"] = dataset_id
+        report["generated_at"] = datetime.now(timezone.utc).isoformat()
+        report["cache"] = {
+            "hit": True,
+            "content_hash": content_hash,
+            "pipeline_version": version,
+            "source_dataset_id": entry.get("dataset_id"),
+        }
+        report_key = f"datasets/{dataset_id}/{_REPORT_FILE}"
+        self._storage.save(report_key, io.BytesIO(json.dumps(report, ensure_ascii=True, indent=2).encode("utf-8")))
+        cleaned_name = entry.get("cleaned_artifact")
+        return {
+            "storage_key": report_key,
+            "report": report,
+            "cleaned_storage_key": f"datasets/{dataset_id}/{cleaned_name}" if cleaned_name in restored else None,
+        }
+
+    def store(
+        self,
+        content_hash: str,
+        version: str,
+        dataset_id: str,
+        quality_report: Dict[str, Any],
+        extra_keys: Sequence[str] = (),
+    ) -> None:
+        """Copy the artifacts named in a finished quality_report context, plus ``extra_keys``
+        of the same dataset folder, into the cache."""
+        report_key = quality_report.get("storage_key")
+        if not report_key:
+            return
+        artifact_keys: List[str] = [report_key]
+        cleaned_key = quality_report.get("cleaned_storage_key")
+        if cleaned_key:
+            artifact_keys.append(cleaned_key)
+        artifact_keys.extend(extra_keys)
+
+        entry_dir = self._entry_dir(content_hash, version)
+        with self._lock:
+            size = 0
+            names = []
+            for key in artifact_keys:
+                name = posixpath.basename(key)
+                size += self._storage.copy(key, f"{entry_dir}/{name}")
+                names.append(name)
+            now = time.time()
+            # entry.json is written last so half-copied entries never look valid
+            self._write_entry(
+                f"{entry_dir}/{_ENTRY_FILE}",
+                {
+                    "content_hash": content_hash,
+                    "pipeline_version": version,
+                    "dataset_id": dataset_id,
+                    "artifacts": names,
+                    "cleaned_artifact": posixpath.basename(cleaned_key) if cleaned_key else None,
+                    "size_bytes": size,
+                    "created_at": now,
+                    "last_used_at": now,
+                    "hits": 0,
+                },
+            )
+            self._evict(current_version=version)
+
+    def evict(self, current_version: str) -> None:
+        with self._lock:
+            self._evict(current_version)
+
+    def _evict(self, current_version: str) -> None:
+        now = time.time()
+        live = []
+        for entry_key in self._storage.glob(f"{CACHE_PREFIX}/*/*/{_ENTRY_FILE}"):
+            entry_dir = posixpath.dirname(entry_key)
+            entry = self._read_entry(entry_key)
+            if (
+                entry is None
+                or entry.get("pipeline_version") != current_version
+                or now - entry.get("created_at", 0) > self._max_age_seconds
+            ):
+                logger.info("PIPELINE: result_cache.evict %s", entry_dir)
+                self._storage.delete_prefix(entry_dir)
+                continue
+            live.append((entry.get("last_used_at", 0), int(entry.get("size_bytes", 0)), entry_dir))
+
+        total = sum(size for _, size, _ in live)
+        for _, size, entry_dir in sorted(live):
+            if total <= self._max_bytes:
+                break
+            logger.info("PIPELINE: result_cache.evict %s (size budget)", entry_dir)
+            self._storage.delete_prefix(entry_dir)
+            total -= size
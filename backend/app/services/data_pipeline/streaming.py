@@ -0,0 +1,618 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import hashlib
+import io
+import json
+import logging
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import get_settings
+from app.services.data_pipeline.cleaned_output import (
+    CATEGORY_MAX_DISTINCT,
+    _typed_column,
+    cleaned_key as _cleaned_key,
+    is_low_cardinality,
+)
+from app.services.data_pipeline.metrics import PipelineMetricsRegistry, StepMeter, StepMetrics, get_pipeline_metrics
+from app.services.data_pipeline.models import EncodedColumn, EncodedFrame
+from app.services.data_pipeline.pipeline import PipelineContext, PipelineListener, _module_version, _notify
+from app.services.data_pipeline.pipeline_services.header_detection import (
+    _apply_no_header,
+    _looks_like_header,
+    _normalize_name,
+)
+from app.services.data_pipeline.pipeline_services.inconsistencies import (
+    _combine_variants,
+    _inconsistent_groups,
+    _normalize_values,
+    _variant_table,
+)
+from app.services.data_pipeline.pipeline_services.ingest import (
+    _BAD_ROW_SAMPLE_LIMIT,
+    _header_names,
+    _read_sample,
+    _sniff_delimiter,
+    _sniff_encoding,
+)
+from app.services.data_pipeline.pipeline_services.missing_values import _normalize_missing_tokens, missing_tokens_for
+from app.services.data_pipeline.pipeline_services.outlier_analysis import (
+    OutlierOptions,
+    _numeric_uniques,
+    _sampled_outliers,
+)
+from app.services.data_pipeline.pipeline_services.quality_report import _build_report, _resolve_storage
+from app.services.data_pipeline.pipeline_services.schema_check import (
+    _find_duplicate_columns,
+    _find_empty_columns,
+    _find_unnamed_columns,
+)
+from app.services.data_pipeline.pipeline_services.type_inference import _DATE_CANDIDATES, TypeCounters
+from app.services.data_pipeline.pipeline_services.type_materialization import text_memory_bytes
+from app.services.dataset_profiler import DatasetProfiler
+from app.services.profile_store import ProfileStore, profile_version
+from app.services.sketches import FrameSketch
+from app.services.storage import StorageService
+
+# Same step names as the default pipeline so job progress looks identical. The first pass
+# covers the scan steps, the second rewrites the data; memory is bounded by the chunk size.
+STREAMING_STEPS = (
+    "ingestion",
+    "header_detection",
+    "schema_check",
+    "missing_values",
+    "type_inference",
+    "inconsistencies",
+    "outlier_analysis",
+    "type_materialization",
+    "quality_report",
+    "dataset_profile",
+)
+_SCAN_STEPS = STREAMING_STEPS[:5]
+_WRITE_STEPS = ("inconsistencies", "outlier_analysis", "type_materialization")
+# Modules whose code decides the streamed output
+_VERSION_MODULES = (
+    __name__,
+    "app.services.data_pipeline.models",
+    "app.services.data_pipeline.cleaned_output",
+    "app.services.data_pipeline.pipeline_services.ingest",
+    "app.services.data_pipeline.pipeline_services.header_detection",
+    "app.services.data_pipeline.pipeline_services.missing_values",
+    "app.services.data_pipeline.pipeline_services.type_inference",
+    "app.services.data_pipeline.pipeline_services.inconsistencies",
+    "app.services.data_pipeline.pipeline_services.outlier_analysis",
+    "app.services.data_pipeline.pipeline_services.type_materialization",
+)
+# Bounds for the Arrow block size derived from the configured chunk rows
+_MIN_BLOCK_BYTES = 64 << 10
+_MAX_BLOCK_BYTES = 256 << 20
+# Distinct spellings tracked per text column for the inconsistency report; ID and free-text
+# columns stop here and their report is marked truncated
+_MAX_TRACKED_VARIANTS = 100_000
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _CsvSource:
+    """A CSV in storage plus the sniffed settings needed to read it chunk by chunk."""
+
+    storage: StorageService
+    storage_key: str
+    encoding: str
+    delimiter: str
+    names: List[str]
+    block_size: int
+    bad_row_count: int = 0
+    bad_row_samples: List[List[str]] = field(default_factory=list)
+
+    def _on_invalid_row(self, row: Any) -> str:
+        # Skip malformed rows like the python engine does, keeping a sample for the report.
+        self.bad_row_count += 1
+        if len(self.bad_row_samples) < _BAD_ROW_SAMPLE_LIMIT:
+            self.bad_row_samples.append((row.text or "").split(self.delimiter))
+        return "skip"
+
+    def chunks(self) -> Iterator[pd.DataFrame]:
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+
+        self.bad_row_count = 0
+        self.bad_row_samples = []
+        arrow_encoding = "utf8" if self.encoding in {"utf-8", "utf-8-sig"} else self.encoding
+        read_options = pacsv.ReadOptions(
+            encoding=arrow_encoding,
+            column_names=self.names,
+            skip_rows=1,
+            block_size=self.block_size,
+            use_threads=True,
+        )
+        parse_options = pacsv.ParseOptions(
+            delimiter=self.delimiter,
+            newlines_in_values=True,
+            invalid_row_handler=self._on_invalid_row,
+        )
+        convert_options = pacsv.ConvertOptions(
+            column_types={name: pa.string() for name in self.names},
+            null_values=[],
+            strings_can_be_null=False,
+            quoted_strings_can_be_null=False,
+        )
+        with self.storage.open(self.storage_key) as handle:
+            reader = pacsv.open_csv(
+                handle,
+                read_options=read_options,
+                parse_options=parse_options,
+                convert_options=convert_options,
+            )
+            for batch in reader:
+                yield batch.to_pandas()
+
+
+def _open_source(storage: StorageService, storage_key: str, chunk_rows: int) -> _CsvSource:
+    sample_bytes = _read_sample(storage, storage_key, size=64 * 1024)
+    encoding = _sniff_encoding(sample_bytes)
+    sample_text = sample_bytes.decode(encoding, errors="replace")
+    delimiter = _sniff_delimiter(sample_text)
+    names = _header_names(storage, storage_key, encoding, delimiter)
+    if not names:
+        raise ValueError("CSV header row is empty.")
+    # Size Arrow blocks so one block holds roughly ``chunk_rows`` rows
+    row_bytes = len(sample_bytes) / max(1, sample_bytes.count(b"\n"))
+    block_size = int(min(_MAX_BLOCK_BYTES, max(_MIN_BLOCK_BYTES, row_bytes * chunk_rows)))
+    return _CsvSource(storage, storage_key, encoding, delimiter, names, block_size)
+
+
+@dataclass
+class _ColumnScan:
+    """Per-column state of the first pass: type counters, missing cells and distinct values,
+    kept only until there are too many for a categorical column."""
+
+    counters: TypeCounters = field(default_factory=TypeCounters)
+    missing: int = 0
+    seen: Set[Any] = field(default_factory=set)
+
+    def update(self, column: EncodedColumn) -> None:
+        self.counters.update(column)
+        self.missing += column.null_count
+        limit = CATEGORY_MAX_DISTINCT + 2
+        if len(self.seen) < limit:
+            self.seen.update(column.uniques[column.counts > 0][:limit].tolist())
+            if column.null_count:
+                self.seen.add(None)
+
+    @property
+    def distinct_count(self) -> int:
+        # Exact up to the categorical limit, a lower bound beyond it
+        return len(self.seen - {None})
+
+
+class _RowReservoir:
+    """Fixed-size uniform row sample of numeric columns: the rows with the smallest random keys.
+
+    Holds at most ``size`` rows plus the candidates of one chunk, however long the file is.
+    """
+
+    def __init__(self, size: int, positions: List[int]):
+        self._size = max(1, size)
+        self._rng = np.random.default_rng(0)
+        self._keys = np.array([], dtype=float)
+        self._labels = np.array([], dtype=np.int64)
+        self._values: Dict[int, np.ndarray] = {position: np.array([], dtype=float) for position in positions}
+
+    def add(self, labels: np.ndarray, columns: List[EncodedColumn]) -> None:
+        keys = self._rng.random(len(labels))
+        picked = keys < self._keys.max() if len(self._keys) >= self._size else np.ones(len(labels), dtype=bool)
+        self._keys = np.concatenate([self._keys, keys[picked]])
+        self._labels = np.concatenate([self._labels, labels[picked]])
+        for position in self._values:
+            column = columns[position]
+            numbers = np.append(_numeric_uniques(column), np.nan)
+            self._values[position] = np.concatenate([self._values[position], numbers[column.codes[picked]]])
+        if len(self._keys) > self._size:
+            keep = np.argpartition(self._keys, self._size - 1)[: self._size]
+            self._keep(keep)
+
+    def finish(self) -> Tuple[np.ndarray, Dict[int, np.ndarray]]:
+        # Sampled rows in file order
+        self._keep(np.argsort(self._labels, kind="stable"))
+        return self._labels, self._values
+
+    def _keep(self, rows: np.ndarray) -> None:
+        self._keys = self._keys[rows]
+        self._labels = self._labels[rows]
+        self._values = {position: values[rows] for position, values in self._values.items()}
+
+
+@dataclass
+class _Scan:
+    header: Dict[str, Any]
+    columns: List[_ColumnScan]
+    tokens: List[str]
+    rows_read: int = 0
+    rows_kept: int = 0
+    chunks: int = 0
+
+
+def _typed_plan(result: Dict[str, Any], state: _ColumnScan) -> Dict[str, Any]:
+    # Decide the stored type for the whole column up front, so every chunk gets the same
+    # Parquet type; like typed_frame, only conversions that keep every value are used.
+    inferred_type = result["inferred_type"]
+    counters = state.counters
+    rows = counters.rows
+    if rows and inferred_type == "numeric":
+        if counters.matches["numeric"] == rows and not counters.leading_zeros:
+            return {"inferred_type": "numeric", "dtype": "Int64" if counters.integral else "Float64"}
+    elif rows and inferred_type == "boolean":
+        if counters.matches["boolean"] == rows:
+            return {"inferred_type": "boolean", "dtype": "boolean"}
+    elif rows and inferred_type == "datetime":
+        full = {fmt: count == rows for fmt, count in counters.format_matches.items()}
+        full["%Y%m%d"] = counters.matches["yyyymmdd"] == rows
+        candidates = [result.get("datetime_format"), *_DATE_CANDIDATES, "%Y%m%d"]
+        fmt = next((candidate for candidate in candidates if candidate and full.get(candidate)), None)
+        if fmt is not None:
+            return {"inferred_type": "datetime", "datetime_format": fmt, "dtype": "datetime64[ns]"}
+    # Decided on the values before text normalization, which can only merge some of them
+    if is_low_cardinality(state.distinct_count, rows):
+        return {"inferred_type": "string", "dtype": "category"}
+    return {"inferred_type": "string", "dtype": "string"}
+
+
+class StreamingQualityPipeline:
+    """Data-quality pipeline for CSV files larger than memory.
+
+    The file is read twice in chunks of about ``chunk_rows`` rows. The first pass detects the
+    header, normalizes missing tokens and accumulates missing counts, schema facts and exact
+    type-inference counters. The second pass applies the same cleaning, normalizes text in
+    string columns, converts every chunk to the planned types and appends it to the cleaned
+    Parquet file, while mergeable sketches build the dataset profile. Only per-column summaries
+    (up to ``_MAX_TRACKED_VARIANTS`` distinct values of string columns for the inconsistency
+    report, and a fixed-size row sample of numeric columns for outlier analysis) outlive a chunk.
+    """
+
+    def __init__(
+        self,
+        chunk_rows: int,
+        row_group_size: int,
+        metrics_registry: Optional[PipelineMetricsRegistry] = None,
+        outlier_options: Optional[OutlierOptions] = None,
+    ):
+        self._chunk_rows = max(1, chunk_rows)
+        self._row_group_size = max(1, row_group_size)
+        self._metrics_registry = metrics_registry
+        self._outlier_options = outlier_options or OutlierOptions()
+        self._version: Optional[str] = None
+
+    @property
+    def step_names(self) -> List[str]:
+        return list(STREAMING_STEPS)
+
+    @property
+    def version(self) -> str:
+        if self._version is None:
+            digest = hashlib.sha256()
+            for module_path in _VERSION_MODULES:
+                digest.update(f"{module_path}={_module_version(module_path)};".encode("utf-8"))
+            self._version = digest.hexdigest()[:16]
+        return self._version
+
+    def run(self, context: PipelineContext, listener: Optional[PipelineListener] = None) -> PipelineContext:
+        storage_key = context.get("storage_key")
+        dataset_id = context.get("dataset_id")
+        if not storage_key or not dataset_id:
+            raise ValueError("Streaming pipeline requires 'storage_key' and 'dataset_id' in context.")
+        storage = _resolve_storage(context)
+        current = dict(context)
+        metrics: Dict[str, StepMetrics] = {}
+        cleaned_key: Optional[str] = _cleaned_key(dataset_id)
+        profile_sketch = None
+        running: Tuple[str, ...] = _SCAN_STEPS
+        try:
+            _notify_all(listener, "start", running)
+            meter = StepMeter({})
+            source = _open_source(storage, storage_key, self._chunk_rows)
+            scan = self._scan(source, missing_tokens_for(context))
+            current.update(self._scan_sections(source, scan))
+            metrics["stream_scan"] = meter.finish(None)
+            _notify_all(listener, "end", running)
+
+            # The second pass cleans text and writes the typed Parquet output chunk by chunk
+            running = _WRITE_STEPS
+            _notify_all(listener, "start", running)
+            meter = StepMeter({})
+            sections, profile_sketch = self._write(
+                source, scan, current["type_inference"], storage, cleaned_key
+            )
+            current.update(sections)
+            metrics["stream_write"] = meter.finish(None)
+            _notify_all(listener, "end", running)
+        except Exception as exc:
+            logger.exception("ERROR: data_pipeline.streaming_failed %s", storage_key)
+            current["pipeline_error"] = {"step": running[0], "type": exc.__class__.__name__, "message": str(exc)}
+            if running is _SCAN_STEPS:
+                current["ingestion"] = {"status": "failed", "storage_key": storage_key}
+            _notify_all(listener, "error", running)
+            _notify_all(listener, "skip", STREAMING_STEPS[STREAMING_STEPS.index(running[-1]) + 1 : -2])
+            storage.delete(cleaned_key)
+            cleaned_key, profile_sketch = None, None
+
+        # The report is written even after a failure, like the barrier step of the default pipeline
+        _notify(listener, "start", "quality_report")
+        current["pipeline_metrics"] = metrics
+        report = _build_report(current)
+        report_key = f"datasets/{dataset_id}/quality_report.json"
+        storage.save(report_key, io.BytesIO(json.dumps(report, ensure_ascii=True, indent=2).encode("utf-8")))
+        current["quality_report"] = {"storage_key": report_key, "report": report, "cleaned_storage_key": cleaned_key}
+        _notify(listener, "end", "quality_report")
+
+        if profile_sketch is None or cleaned_key is None:
+            _notify(listener, "skip", "dataset_profile")
+        else:
+            _notify(listener, "start", "dataset_profile")
+            profile, schema = DatasetProfiler(mode="approximate").profile_from_sketch(dataset_id, profile_sketch)
+            version = profile_version(storage, cleaned_key)
+            profile_key = ProfileStore(storage).save(dataset_id, version, profile, schema)
+            current["dataset_profile"] = {"storage_key": profile_key, "version": version}
+            _notify(listener, "end", "dataset_profile")
+
+        if self._metrics_registry is not None:
+            self._metrics_registry.record(metrics)
+        return current
+
+    def _frames(
+        self, source: _CsvSource, header: Optional[Dict[str, Any]], tokens: List[str]
+    ) -> Iterator[Tuple[Dict[str, Any], EncodedFrame, int]]:
+        # Yield every chunk with the header decision applied, missing tokens normalized and
+        # all-missing rows dropped, plus the number of rows read before dropping.
+        names: Optional[List[str]] = None if header is None else header["normalized_column_names"]
+        first = True
+        for chunk in source.chunks():
+            if header is None:
+                original_names = [str(name) for name in chunk.columns]
+                if _looks_like_header(original_names, chunk):
+                    names = [_normalize_name(name) for name in original_names]
+                    used_header = True
+                else:
+                    chunk, names = _apply_no_header(chunk)
+                    used_header = False
+                header = {
+                    "used_first_row_as_header": used_header,
+                    "original_column_names": original_names,
+                    "normalized_column_names": names,
+                }
+            elif first and not header["used_first_row_as_header"]:
+                chunk, _ = _apply_no_header(chunk)
+            first = False
+            chunk.columns = names
+            encoded = _normalize_missing_tokens(EncodedFrame.from_frame(chunk), tokens)
+            rows_read = encoded.row_count
+            all_missing = encoded.all_missing_rows()
+            if all_missing.any():
+                encoded = encoded.take_rows(~all_missing)
+            yield header, encoded, rows_read
+
+    def _scan(self, source: _CsvSource, tokens: List[str]) -> _Scan:
+        scan: Optional[_Scan] = None
+        for header, encoded, rows_read in self._frames(source, None, tokens):
+            if scan is None:
+                scan = _Scan(header=header, columns=[_ColumnScan() for _ in encoded.columns], tokens=tokens)
+            for state, column in zip(scan.columns, encoded.columns):
+                state.update(column)
+            scan.rows_read += rows_read
+            scan.rows_kept += encoded.row_count
+            scan.chunks += 1
+        if scan is None:
+            # Header-only file: decide on the names alone
+            header = {
+                "used_first_row_as_header": True,
+                "original_column_names": source.names,
+                "normalized_column_names": [_normalize_name(name) for name in source.names],
+            }
+            scan = _Scan(header=header, columns=[_ColumnScan() for _ in source.names], tokens=tokens)
+        return scan
+
+    def _scan_sections(self, source: _CsvSource, scan: _Scan) -> PipelineContext:
+        # Report sections in the same shape the in-memory steps produce.
+        names = [str(name) for name in scan.header["normalized_column_names"]]
+        row_count = scan.rows_kept
+        total_cells = row_count * len(names) if row_count and names else 0
+        total_missing = sum(state.missing for state in scan.columns)
+        return {
+            "ingestion": {
+                "status": "ok",
+                "encoding": source.encoding,
+                "delimiter": source.delimiter,
+                "engine": "pyarrow-stream",
+                "bad_row_count": source.bad_row_count,
+                "bad_row_samples": source.bad_row_samples,
+                "row_count": scan.rows_read - (0 if scan.header["used_first_row_as_header"] else 1),
+                "column_count": len(names),
+                "chunk_count": scan.chunks,
+                "chunk_rows": self._chunk_rows,
+            },
+            "header_detection": scan.header,
+            "schema_check": {
+                "duplicate_columns": _find_duplicate_columns(names),
+                "empty_column_names": _find_empty_columns(names),
+                "unnamed_columns": _find_unnamed_columns(names),
+                "constant_columns": [name for name, state in zip(names, scan.columns) if len(state.seen) <= 1],
+            },
+            "missing_values": {
+                "tokens": scan.tokens,
+                "rows_all_missing_removed": scan.rows_read - scan.rows_kept,
+                "row_count_before": scan.rows_read,
+                "row_count_after": row_count,
+                "stats": {
+                    "total_missing": total_missing,
+                    "total_cells": total_cells,
+                    "missing_rate": float(total_missing / total_cells) if total_cells else 0.0,
+                    "per_column": {
+                        name: {
+                            "missing_count": int(state.missing),
+                            "missing_rate": float(state.missing / row_count) if row_count else 0.0,
+                        }
+                        for name, state in zip(names, scan.columns)
+                    },
+                },
+            },
+            "type_inference": {
+                "columns": {name: state.counters.result() for name, state in zip(names, scan.columns)},
+            },
+        }
+
+    def _write(
+        self,
+        source: _CsvSource,
+        scan: _Scan,
+        type_inference: Dict[str, Any],
+        storage: StorageService,
+        cleaned_key: str,
+    ) -> Tuple[PipelineContext, FrameSketch]:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        names = [str(name) for name in scan.header["normalized_column_names"]]
+        plans = [
+            _typed_plan(type_inference["columns"][name], state)
+            for name, state in zip(names, scan.columns)
+        ]
+        string_positions = [
+            position for position, name in enumerate(names) if type_inference["columns"][name]["inferred_type"] == "string"
+        ]
+        variants: Dict[int, pd.DataFrame] = {}
+        truncated: Set[int] = set()
+        # Numeric columns keep a fixed-size row sample of their parsed values for outlier analysis;
+        # without a configured sample size it holds one chunk of rows
+        numeric_positions = [
+            position for position, name in enumerate(names) if type_inference["columns"][name]["inferred_type"] == "numeric"
+        ]
+        options = self._outlier_options
+        reservoir = _RowReservoir(options.sample_rows or self._chunk_rows, numeric_positions)
+        rows_before = 0
+        profiler = DatasetProfiler(mode="approximate")
+        sketch = None
+        writer = None
+        schema = None
+        memory_before = np.zeros(len(names), dtype=np.int64)
+        memory_after = np.zeros(len(names), dtype=np.int64)
+
+        with storage.open_write(cleaned_key) as handle:
+            try:
+                for _, encoded, rows_read in self._frames(source, scan.header, scan.tokens):
+                    columns = list(encoded.columns)
+                    if numeric_positions:
+                        reservoir.add(rows_before + encoded.index.to_numpy(), columns)
+                    rows_before += rows_read
+                    for position in string_positions:
+                        column = columns[position]
+                        normalized = _normalize_values(column.values())
+                        seen = _variant_table(column, normalized)
+                        if position in truncated:
+                            # Only the counts of spellings already tracked are still updated
+                            seen = seen[seen["variant"].isin(variants[position]["variant"])]
+                        if position in variants:
+                            seen = _combine_variants(variants[position], seen)
+                        if len(seen) > _MAX_TRACKED_VARIANTS:
+                            seen = seen.iloc[:_MAX_TRACKED_VARIANTS]
+                            truncated.add(position)
+                        variants[position] = seen
+                        columns[position] = column.remap(normalized)
+                    typed = self._typed_chunk(columns, plans, names, encoded.index)
+                    memory_before += [text_memory_bytes(column) for column in columns]
+                    memory_after += typed.memory_usage(deep=True, index=False).to_numpy()
+                    table = pa.Table.from_pandas(typed, preserve_index=False)
+                    if writer is None:
+                        schema = _arrow_schema(table.schema, plans)
+                        writer = pq.ParquetWriter(handle, schema, compression="snappy")
+                        sketch = profiler.sketch(typed)
+                    writer.write_table(table.cast(schema), row_group_size=self._row_group_size)
+                    sketch.update(typed)
+                if writer is None:
+                    # No data rows: still write a valid, empty file with the planned column types
+                    no_values = EncodedColumn.from_series(pd.Series([], dtype=object))
+                    empty = self._typed_chunk([no_values] * len(names), plans, names, pd.RangeIndex(0))
+                    schema = _arrow_schema(pa.Table.from_pandas(empty, preserve_index=False).schema, plans)
+                    writer = pq.ParquetWriter(handle, schema, compression="snappy")
+                    memory_after += empty.memory_usage(deep=True, index=False).to_numpy()
+                    sketch = profiler.sketch(empty)
+            finally:
+                if writer is not None:
+                    writer.close()
+
+        labels, samples = reservoir.finish()
+        text_inconsistencies = {
+            names[position]: _inconsistent_groups(variants[position]) if position in variants else {"inconsistent_values": {}}
+            for position in string_positions
+        }
+        for position in truncated:
+            text_inconsistencies[names[position]]["truncated"] = True
+        sections = {
+            "inconsistencies": {"text_inconsistencies": text_inconsistencies},
+            "outlier_analysis": {
+                "detectors": options.detectors,
+                "columns": {
+                    names[position]: _sampled_outliers(
+                        samples[position],
+                        labels,
+                        scan.columns[position].counters.matches["numeric"],
+                        options,
+                    )
+                    for position in numeric_positions
+                },
+            },
+            "type_materialization": {
+                "memory_bytes_before": int(memory_before.sum()),
+                "memory_bytes_after": int(memory_after.sum()),
+                "columns": {
+                    name: {
+                        "dtype": plan["dtype"],
+                        "memory_bytes_before": int(before),
+                        "memory_bytes_after": int(after),
+                    }
+                    for name, plan, before, after in zip(names, plans, memory_before, memory_after)
+                },
+            },
+        }
+        return sections, sketch
+
+    def _typed_chunk(self, columns: List[EncodedColumn], plans: List[Dict[str, Any]], names: List[str], index: pd.Index) -> pd.DataFrame:
+        # Convert with the column's plan and cast, so chunks without values keep the planned type.
+        data = {}
+        for position, (column, plan) in enumerate(zip(columns, plans)):
+            series = _typed_column(column, plan, index, names[position], categorize=plan["dtype"] == "category")
+            if str(series.dtype) != plan["dtype"]:
+                series = series.astype(plan["dtype"])
+            data[position] = series
+        frame = pd.DataFrame(data, index=index)
+        frame.columns = pd.Index(names)
+        return frame
+
+
+def _arrow_schema(schema: Any, plans: List[Dict[str, Any]]) -> Any:
+    # Chunks build their own dictionaries, so categorical columns get one index width for all
+    import pyarrow as pa
+
+    fields = [
+        field.with_type(pa.dictionary(pa.int32(), pa.string())) if plan["dtype"] == "category" else field
+        for field, plan in zip(schema, plans)
+    ]
+    return pa.schema(fields, metadata=schema.metadata)
+
+
+def _notify_all(listener: Optional[PipelineListener], event: str, step_names) -> None:
+    for step_name in step_names:
+        _notify(listener, event, step_name)
+
+
+def build_streaming_pipeline() -> StreamingQualityPipeline:
+    settings = get_settings()
+    return StreamingQualityPipeline(
+        chunk_rows=settings.pipeline_streaming_chunk_rows,
+        row_group_size=settings.cleaned_row_group_size,
+        metrics_registry=get_pipeline_metrics(),
+        outlier_options=OutlierOptions.from_settings(),
+    )
@@ -2,15 +2,84 @@ from __future__ import annotations
 
 from typing import Any
 
+import numpy as np
 import pandas as pd
 
-from app.schemas.agent import CategoryValue, ColumnProfile, DatasetProfile, DatasetSchemaField, NumericSummary
+from app.core.config import get_settings
+from app.schemas.agent import (
+    CategoryValue,
+    ColumnProfile,
+    DatasetProfile,
+    DatasetSchemaField,
+    NumericSummary,
+    SketchErrorBounds,
+)
+from app.services.sketches import ColumnSketch, FrameSketch
+
+# "vectorized" computes null/distinct counts and numeric summaries with frame-level reductions;
+# "per_column" is the original column-by-column path, kept as the reference implementation;
+# "approximate" builds mergeable sketches (HyperLogLog, KLL quantiles, Misra-Gries top values).
+PROFILER_MODES = ("vectorized", "per_column", "approximate")
+
+# Rows fed to the sketches at a time when an in-memory frame is profiled approximately
+_SKETCH_CHUNK_ROWS = 100_000
 
 
 class DatasetProfiler:
+    def __init__(self, mode: str = "vectorized", approx_row_threshold: int | None = None):
+        if mode not in PROFILER_MODES:
+            raise ValueError(f"Unknown profiler mode '{mode}'. Expected one of {PROFILER_MODES}.")
+        self.mode = mode
+        # Exact modes switch to sketches for frames with at least this many rows; 0 disables
+        if approx_row_threshold is None:
+            approx_row_threshold = get_settings().profiler_approx_row_threshold
+        self.approx_row_threshold = approx_row_threshold
+
     def profile(self, dataset_id: str, df: pd.DataFrame) -> tuple[DatasetProfile, list[DatasetSchemaField]]:
         row_count = int(len(df))
-        columns: list[ColumnProfile] = []
+        if self.mode == "approximate" or (self.approx_row_threshold and row_count >= self.approx_row_threshold):
+            sketch = self.sketch(df.head(_SKETCH_CHUNK_ROWS))
+            for start in range(0, row_count, _SKETCH_CHUNK_ROWS):
+                sketch.update(df.iloc[start : start + _SKETCH_CHUNK_ROWS])
+            return self.profile_from_sketch(dataset_id, sketch)
+
+        semantic_types = [self._semantic_type(df.iloc[:, position]) for position in range(df.shape[1])]
+        stats = self._frame_stats(df, semantic_types) if self.mode == "vectorized" else None
+        columns = [
+            self._profile_column(
+                str(column_name),
+                df.iloc[:, position],
+                row_count,
+                semantic_types[position],
+                stats[position] if stats is not None else None,
+            )
+            for position, column_name in enumerate(df.columns)
+        ]
+        return self._assemble(dataset_id, row_count, columns)
+
+    def sketch(self, first_chunk: pd.DataFrame) -> FrameSketch:
+        """Empty sketch for a frame; semantic types and dtypes are fixed from its first chunk."""
+        return FrameSketch(
+            [
+                ColumnSketch(
+                    name=str(column_name),
+                    dtype=str(first_chunk.iloc[:, position].dtype),
+                    semantic_type=self._semantic_type(first_chunk.iloc[:, position]),
+                )
+                for position, column_name in enumerate(first_chunk.columns)
+            ]
+        )
+
+    def profile_from_sketch(
+        self, dataset_id: str, sketch: FrameSketch
+    ) -> tuple[DatasetProfile, list[DatasetSchemaField]]:
+        row_count = sketch.rows
+        columns = [self._profile_sketched_column(column, row_count) for column in sketch.columns]
+        return self._assemble(dataset_id, row_count, columns)
+
+    def _assemble(
+        self, dataset_id: str, row_count: int, columns: list[ColumnProfile]
+    ) -> tuple[DatasetProfile, list[DatasetSchemaField]]:
         schema: list[DatasetSchemaField] = []
         time_columns: list[str] = []
         numeric_columns: list[str] = []
@@ -18,23 +87,18 @@ class DatasetProfiler:
         visualization_hints: list[str] = []
         potential_issues: list[str] = []
 
-        for column_name in df.columns:
-            series = df[column_name]
-            semantic_type = self._semantic_type(series)
-            if semantic_type == "datetime":
-                time_columns.append(str(column_name))
-            elif semantic_type == "numeric":
-                numeric_columns.append(str(column_name))
-            elif semantic_type in {"categorical", "text", "boolean"}:
-                categorical_columns.append(str(column_name))
-
-            column_profile = self._profile_column(str(column_name), series, row_count, semantic_type)
-            columns.append(column_profile)
+        for column_profile in columns:
+            if column_profile.semantic_type == "datetime":
+                time_columns.append(column_profile.name)
+            elif column_profile.semantic_type == "numeric":
+                numeric_columns.append(column_profile.name)
+            elif column_profile.semantic_type in {"categorical", "text", "boolean"}:
+                categorical_columns.append(column_profile.name)
             schema.append(
                 DatasetSchemaField(
-                    name=str(column_name),
-                    dtype=str(series.dtype),
-                    nullable=bool(series.isna().any()),
+                    name=column_profile.name,
+                    dtype=column_profile.dtype,
+                    nullable=column_profile.null_count > 0,
                 )
             )
             potential_issues.extend(column_profile.issues)
@@ -49,7 +113,7 @@ class DatasetProfiler:
         profile = DatasetProfile(
             dataset_id=dataset_id,
             row_count=row_count,
-            column_count=int(len(df.columns)),
+            column_count=len(columns),
             columns=columns,
             time_columns=time_columns,
             numeric_columns=numeric_columns,
@@ -65,13 +129,77 @@ class DatasetProfiler:
         series: pd.Series[Any],
         row_count: int,
         semantic_type: str,
+        stats: dict[str, Any] | None = None,
+    ) -> ColumnProfile:
+        if stats is not None:
+            null_count = stats["null_count"]
+            unique_count = stats["unique_count"]
+        else:
+            null_count = int(series.isna().sum())
+            unique_count = int(series.nunique(dropna=True))
+        numeric_summary: NumericSummary | None = None
+        top_categories: list[tuple[Any, int]] = []
+
+        if semantic_type == "numeric":
+            if stats is not None:
+                numeric_summary = stats["numeric_summary"]
+            else:
+                numeric_summary = self._numeric_summary(pd.to_numeric(series, errors="coerce").dropna())
+        elif semantic_type in {"categorical", "text", "boolean"}:
+            top_categories = list(series.astype(str).fillna("<NA>").value_counts(dropna=False).head(5).items())
+
+        return self._column_profile(
+            column_name, str(series.dtype), semantic_type, row_count, null_count, unique_count, numeric_summary, top_categories
+        )
+
+    def _profile_sketched_column(self, column: ColumnSketch, row_count: int) -> ColumnProfile:
+        # Counts, min/max, mean and std are exact; unique counts, medians and top values are estimates
+        unique_count = min(column.distinct.estimate(), row_count - column.null_count)
+        numeric_summary: NumericSummary | None = None
+        top_categories: list[tuple[Any, int]] = []
+        error_bounds = SketchErrorBounds(unique_count_relative_error=column.distinct.relative_error)
+
+        if column.quantiles is not None and column.moments is not None:
+            error_bounds.median_rank_error = column.quantiles.rank_error
+            if column.moments.count:
+                numeric_summary = NumericSummary(
+                    min=column.moments.minimum,
+                    max=column.moments.maximum,
+                    mean=column.moments.mean,
+                    median=column.quantiles.quantile(0.5),
+                    std=column.moments.std,
+                )
+        if column.heavy_hitters is not None:
+            error_bounds.top_category_count_error = column.heavy_hitters.error
+            top_categories = column.heavy_hitters.top(5)
+
+        return self._column_profile(
+            column.name,
+            column.dtype,
+            column.semantic_type,
+            row_count,
+            column.null_count,
+            unique_count,
+            numeric_summary,
+            top_categories,
+            approximate=True,
+            error_bounds=error_bounds,
+        )
+
+    def _column_profile(
+        self,
+        column_name: str,
+        dtype: str,
+        semantic_type: str,
+        row_count: int,
+        null_count: int,
+        unique_count: int,
+        numeric_summary: NumericSummary | None,
+        top_categories: list[tuple[Any, int]],
+        **extra: Any,
     ) -> ColumnProfile:
-        null_count = int(series.isna().sum())
-        unique_count = int(series.nunique(dropna=True))
         issues: list[str] = []
         hints: list[str] = []
-        numeric_summary: NumericSummary | None = None
-        top_categories: list[CategoryValue] = []
 
         if row_count and unique_count > 50 and unique_count / max(row_count, 1) > 0.5:
             issues.append(f"high_cardinality:{column_name}")
@@ -79,40 +207,90 @@ class DatasetProfiler:
             issues.append(f"many_nulls:{column_name}")
 
         if semantic_type == "numeric":
-            numeric_values = pd.to_numeric(series, errors="coerce").dropna()
-            if not numeric_values.empty:
-                numeric_summary = NumericSummary(
-                    min=float(numeric_values.min()),
-                    max=float(numeric_values.max()),
-                    mean=float(numeric_values.mean()),
-                    median=float(numeric_values.median()),
-                    std=float(numeric_values.std()) if len(numeric_values) > 1 else 0.0,
-                )
             hints.append("use for aggregation, distribution, or correlation analysis")
         elif semantic_type in {"categorical", "text", "boolean"}:
-            value_counts = series.astype(str).fillna("<NA>").value_counts(dropna=False).head(5)
-            top_categories = [
-                CategoryValue(value=str(index), count=int(count), ratio=float(count / max(row_count, 1)))
-                for index, count in value_counts.items()
-            ]
             hints.append("use for grouped comparisons or counts")
         elif semantic_type == "datetime":
             hints.append("use for trend and time series analysis")
 
         return ColumnProfile(
             name=column_name,
-            dtype=str(series.dtype),
+            dtype=dtype,
             semantic_type=semantic_type,  # type: ignore[arg-type]
             null_count=null_count,
             null_ratio=float(null_count / max(row_count, 1)),
             unique_count=unique_count,
             unique_ratio=float(unique_count / max(row_count, 1)),
             numeric_summary=numeric_summary,
-            top_categories=top_categories,
+            top_categories=[
+                CategoryValue(value=str(value), count=int(count), ratio=float(count / max(row_count, 1)))
+                for value, count in top_categories
+            ],
             visualization_hints=hints,
             issues=issues,
+            **extra,
+        )
+
+    def _numeric_summary(self, numeric_values: pd.Series[Any]) -> NumericSummary | None:
+        if numeric_values.empty:
+            return None
+        return NumericSummary(
+            min=float(numeric_values.min()),
+            max=float(numeric_values.max()),
+            mean=float(numeric_values.mean()),
+            median=float(numeric_values.median()),
+            std=float(numeric_values.std()) if len(numeric_values) > 1 else 0.0,
         )
 
+    def _frame_stats(self, df: pd.DataFrame, semantic_types: list[str]) -> list[dict[str, Any]]:
+        # Numeric columns are copied into one float matrix and sorted once per row: the sorted
+        # rows give null counts, min/max, median and distinct counts without hashing.
+        # Other columns get one frame-level isna and nunique pass.
+        stats: list[dict[str, Any]] = [{} for _ in range(df.shape[1])]
+        numeric_positions = [position for position, kind in enumerate(semantic_types) if kind == "numeric"]
+        other_positions = [position for position, kind in enumerate(semantic_types) if kind != "numeric"]
+
+        if other_positions:
+            others = df.iloc[:, other_positions].set_axis(range(len(other_positions)), axis=1)
+            null_counts = others.isna().sum().to_numpy()
+            unique_counts = others.nunique(dropna=True).to_numpy()
+            for index, position in enumerate(other_positions):
+                stats[position] = {"null_count": int(null_counts[index]), "unique_count": int(unique_counts[index])}
+
+        if not numeric_positions:
+            return stats
+
+        row_count = len(df)
+        matrix = np.empty((len(numeric_positions), row_count), dtype=float)
+        for index, position in enumerate(numeric_positions):
+            matrix[index] = df.iloc[:, position].to_numpy(dtype=float, na_value=np.nan)
+        counts = row_count - np.isnan(matrix).sum(axis=1)
+        # NaN sorts to the end, so each row's first ``count`` values are the present ones
+        matrix.sort(axis=1)
+
+        for index, position in enumerate(numeric_positions):
+            count = int(counts[index])
+            values = matrix[index, :count]
+            summary = None
+            unique_count = 0
+            if count:
+                middle = count // 2
+                median = values[middle] if count % 2 else (values[middle - 1] + values[middle]) / 2
+                summary = NumericSummary(
+                    min=float(values[0]),
+                    max=float(values[-1]),
+                    mean=float(values.mean()),
+                    median=float(median),
+                    std=float(values.std(ddof=1)) if count > 1 else 0.0,
+                )
+                unique_count = int(np.count_nonzero(values[1:] != values[:-1])) + 1
+            stats[position] = {
+                "null_count": row_count - count,
+                "unique_count": unique_count,
+                "numeric_summary": summary,
+            }
+        return stats
+
     def _semantic_type(self, series: pd.Series[Any]) -> str:
         if pd.api.types.is_bool_dtype(series):
             return "boolean"
@@ -120,6 +298,8 @@ class DatasetProfiler:
             return "numeric"
         if pd.api.types.is_datetime64_any_dtype(series):
             return "datetime"
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return "categorical"
 
         sample = series.dropna().head(50)
         if sample.empty:
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence
+from uuid import uuid4
+
+import pandas as pd
+
+from app.services.storage import StorageService
+
+SNAPSHOT_SUFFIX = ".arrow"
+# Part of the key; bumped when the written columns change so older snapshots are rewritten
+_SNAPSHOT_FORMAT = 2
+
+
+def snapshot_prefix(dataset_id: str) -> str:
+    return f"datasets/{dataset_id}/sandbox"
+
+
+def snapshot_key(dataset_id: str, version: str) -> str:
+    digest = hashlib.sha256(f"{_SNAPSHOT_FORMAT}:{version}".encode("utf-8")).hexdigest()[:16]
+    return f"{snapshot_prefix(dataset_id)}/{digest}{SNAPSHOT_SUFFIX}"
+
+
+def read_snapshot(path: str | Path, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Load a snapshot, or only ``columns`` of it; the file is memory-mapped, so columns
+    that are not read cost nothing."""
+    import pyarrow.feather as feather
+
+    return feather.read_table(str(path), columns=None if columns is None else list(columns), memory_map=True).to_pandas()
+
+
+def snapshot_columns(path: str | Path) -> List[str]:
+    # From the file's schema; no column data is read
+    import pyarrow as pa
+
+    with pa.memory_map(str(path)) as source:
+        return pa.ipc.open_file(source).schema.names
+
+
+class SnapshotStore:
+    """Read-only Arrow IPC snapshots of datasets for sandboxed code.
+
+    A snapshot is written once per version of the dataset file (see
+    ``DatasetService.frame_version``) and replaces the previous one, so every sandbox run
+    on an unchanged dataset opens the same file instead of serializing the frame again.
+    """
+
+    def __init__(self, storage: StorageService):
+        self._storage = storage
+        self._lock = threading.Lock()
+
+    def path(self, dataset_id: str, version: str, load: Callable[[], pd.DataFrame]) -> Path:
+        key = snapshot_key(dataset_id, version)
+        path = self._storage.local_path(key)
+        if path.is_file():
+            return path
+        with self._lock:
+            if not path.is_file():
+                self._write(path, load())
+                for stale in self._storage.glob(f"{snapshot_prefix(dataset_id)}/*{SNAPSHOT_SUFFIX}"):
+                    if stale != key:
+                        self._storage.delete(stale)
+        return path
+
+    def invalidate(self, dataset_id: str) -> None:
+        self._storage.delete_prefix(snapshot_prefix(dataset_id))
+
+    def _write(self, path: Path, df: pd.DataFrame) -> None:
+        import pyarrow as pa
+        import pyarrow.feather as feather
+
+        # Written under a temporary name and renamed, so readers never see a partial file;
+        # uncompressed so it can be memory-mapped
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Low-cardinality text is stored as category for the cleaned output; generated code gets
+        # plain text, since fillna with a new label and groupby without observed=True break on it
+        categorical = [name for name, dtype in df.dtypes.items() if isinstance(dtype, pd.CategoricalDtype)]
+        if categorical:
+            df = df.astype({name: object for name in categorical})
+        partial = path.with_name(f".{uuid4().hex}{SNAPSHOT_SUFFIX}")
+        try:
+            feather.write_feather(pa.Table.from_pandas(df, preserve_index=False), str(partial), compression="uncompressed")
+            os.chmod(partial, 0o444)
+            os.replace(partial, path)
+        finally:
+            if partial.exists():
+                partial.unlink()
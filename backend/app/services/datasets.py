@@ -1,16 +1,35 @@
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Sequence
+import io
+import itertools
 import json
+import os
 from uuid import uuid4
 import pandas as pd
 
 from fastapi import HTTPException, UploadFile
 
 from ..core.config import get_settings
-from ..models.datasets import DatasetOut, DatasetStatus, DatasetSchema, ColumnSchema  
+from ..models.datasets import DatasetOut, DatasetStatus, DatasetSchema, ColumnSchema, PipelineJobOut
+from .dataset_profiler import DatasetProfiler
+from .dataset_snapshots import SnapshotStore
+from .frame_cache import DataFrameCache
+from .profile_store import ProfileStore, StoredProfile, profile_version
+from .row_index import RowIndexCache, RowOffsetIndex, build_row_index, read_indexed_rows
 from .storage import StorageService
+from .data_pipeline.cleaned_output import (
+    cleaned_key,
+    iter_csv_chunks,
+    legacy_cleaned_key,
+    parquet_row_count,
+    read_parquet,
+    write_parquet,
+)
 from .data_pipeline.pipeline import build_default_pipeline
+from .data_pipeline.streaming import build_streaming_pipeline
+from .data_pipeline.result_cache import PipelineResultCache
+from .pipeline_jobs import PipelineJobManager, PipelineQueueFull
 
 
 
@@ -22,10 +41,26 @@ class DatasetService:
     replaceable with a DB-backed implementation later.
     """
 
-    def __init__(self, storage: StorageService):
+    def __init__(self, storage: StorageService, jobs: PipelineJobManager | None = None):
         self._storage = storage
         self._store: Dict[str, DatasetOut] = {}
         self._settings = get_settings()
+        self._jobs = jobs or PipelineJobManager(
+            max_workers=self._settings.pipeline_job_workers,
+            max_queued=self._settings.pipeline_job_queue_size,
+            max_finished=self._settings.pipeline_job_history,
+        )
+        self._frames = DataFrameCache(self._settings.dataframe_cache_max_bytes)
+        self._profiles = ProfileStore(storage)
+        self._row_indexes = RowIndexCache()
+        self._snapshots = SnapshotStore(storage)
+        self._result_cache = None
+        if self._settings.pipeline_cache_enabled:
+            self._result_cache = PipelineResultCache(
+                storage,
+                max_age_seconds=self._settings.pipeline_cache_max_age_seconds,
+                max_bytes=self._settings.pipeline_cache_max_bytes,
+            )
 
     def _validate_extension(self, filename: str) -> str:
         ext = Path(filename).suffix.lower()
@@ -33,15 +68,31 @@ class DatasetService:
             raise HTTPException(status_code=400, detail=f"Extension '{ext}' not allowed")
         return ext
 
-    def create_from_upload(self, file: UploadFile) -> DatasetOut:
-        """Validate and store uploaded file, returning created metadata."""
+    def _validate_size(self, file: UploadFile) -> None:
+        # Uploads are spooled to a temporary file before the request is handled, so their
+        # size is known without reading them
+        stream = file.file
+        start = stream.tell()
+        size = stream.seek(0, os.SEEK_END) - start
+        stream.seek(start)
+        if size > self._settings.max_upload_size:
+            raise HTTPException(
+                status_code=413, detail=f"File exceeds the upload limit of {self._settings.max_upload_size} bytes"
+            )
+
+    def create_from_upload(self, file: UploadFile, missing_tokens: Optional[List[str]] = None) -> DatasetOut:
+        """Validate and store uploaded file, returning created metadata.
+
+        The data pipeline runs in the background; poll `get_pipeline_status` for progress.
+        """
         ext = self._validate_extension(file.filename or "")
+        self._validate_size(file)
 
         dataset_id = str(uuid4())
         storage_key = f"datasets/{dataset_id}/raw{ext}"
 
-        # stream-save file to storage
-        size = self._storage.save(storage_key, file.file)
+        # stream-save file to storage, hashing the content for the pipeline result cache
+        size, content_hash = self._storage.save_with_digest(storage_key, file.file)
 
         meta = DatasetOut(
             dataset_id=dataset_id,
@@ -50,29 +101,69 @@ class DatasetService:
             status=DatasetStatus.uploaded,
             created_at=datetime.utcnow(),
             storage_key=storage_key,
+            content_hash=content_hash,
         )
 
-        # Runs data pipeline
-        self._store[dataset_id] = meta
-        pipeline = build_default_pipeline()
-        pipeline.run(
-            {
-                "dataset_id": dataset_id,
-                "storage_key": storage_key,
-                "original_name": meta.original_name,
-                "size_bytes": meta.size_bytes,
-                "storage": self._storage,
-            }
-        )
+        context = {
+            "dataset_id": dataset_id,
+            "storage_key": storage_key,
+            "content_hash": content_hash,
+            "original_name": meta.original_name,
+            "size_bytes": meta.size_bytes,
+            "storage": self._storage,
+        }
+        if missing_tokens is not None:
+            context["missing_tokens"] = missing_tokens
 
+        # Queues the data pipeline, rejecting the upload when the queue is full
+        try:
+            job = self._jobs.submit(dataset_id, self._build_pipeline(ext, size), context)
+        except PipelineQueueFull as exc:
+            self._storage.delete(storage_key)
+            raise HTTPException(status_code=503, detail=str(exc))
+
+        meta.pipeline_job_id = job.job_id
+        self._store[dataset_id] = meta
         return meta
 
+    def _build_pipeline(self, ext: str, size: int):
+        # Large CSVs are processed in chunks instead of being loaded whole; their artifacts
+        # are too big to copy into the result cache
+        if ext == ".csv" and size >= self._settings.pipeline_streaming_min_bytes:
+            return build_streaming_pipeline()
+        return build_default_pipeline(result_cache=self._result_cache)
+
+    def get_pipeline_status(self, dataset_id: str) -> PipelineJobOut:
+        meta = self.get(dataset_id)
+        if not meta.pipeline_job_id:
+            raise HTTPException(status_code=404, detail="Pipeline job not found")
+        try:
+            return self._jobs.get(meta.pipeline_job_id)
+        except KeyError:
+            raise HTTPException(status_code=404, detail="Pipeline job not found")
+
+    def wait_for_pipeline(self, dataset_id: str, timeout: float | None = None) -> PipelineJobOut:
+        """Block until the dataset's pipeline job finished (used by tests and scripts)."""
+        meta = self.get(dataset_id)
+        if not meta.pipeline_job_id:
+            raise HTTPException(status_code=404, detail="Pipeline job not found")
+        try:
+            return self._jobs.wait(meta.pipeline_job_id, timeout)
+        except KeyError:
+            raise HTTPException(status_code=404, detail="Pipeline job not found")
+
     def delete(self, dataset_id: str) -> None:
         """Delete dataset file and remove metadata. Raises HTTPException if missing."""
         meta = self._store.get(dataset_id)
         if not meta:
             raise HTTPException(status_code=404, detail="Dataset not found")
         self._storage.delete(meta.storage_key)
+        self._frames.invalidate(dataset_id)
+        self._profiles.invalidate(dataset_id)
+        self._row_indexes.invalidate(dataset_id)
+        self._snapshots.invalidate(dataset_id)
+        if meta.pipeline_job_id:
+            self._jobs.forget(meta.pipeline_job_id)
         # mark as deleted
         meta.status = DatasetStatus.deleted
         # remove from store for now (keeps API simple)
@@ -94,69 +185,229 @@ class DatasetService:
         if not meta:
             raise HTTPException(status_code=404, detail="Dataset not found")
         
-        target_key = meta.storage_key
-        if use_cleaned:
-            target_key = f"datasets/{dataset_id}/cleaned.csv"
-
         # Update file if provided
         if file:
-            self._validate_extension(file.filename or "")
-            # Delete old file
-            try:
-                self._storage.delete(target_key)
-            except FileNotFoundError:
-                pass
-            # Save new file with same path
-            size = self._storage.save(target_key, file.file)
-            
-            # Only update meta size if we are editing the raw file
-            if not use_cleaned:
-                meta.size_bytes = size
-        
+            ext = self._validate_extension(file.filename or "")
+            self._validate_size(file)
+            if use_cleaned:
+                # Edited cleaned data is stored as Parquet like the pipeline output
+                df = self._read_frame(file.file, ext)
+                write_parquet(self._storage, cleaned_key(dataset_id), df, self._settings.cleaned_row_group_size)
+                try:
+                    self._storage.delete(legacy_cleaned_key(dataset_id))
+                except FileNotFoundError:
+                    pass
+            else:
+                # Delete old file
+                try:
+                    self._storage.delete(meta.storage_key)
+                except FileNotFoundError:
+                    pass
+                # Save new file with same path; the new digest keeps the pipeline result cache
+                # from serving results of the old content
+                meta.size_bytes, meta.content_hash = self._storage.save_with_digest(meta.storage_key, file.file)
+
+            self._frames.invalidate(dataset_id)
+            self._profiles.invalidate(dataset_id)
+            self._row_indexes.invalidate(dataset_id)
+            self._snapshots.invalidate(dataset_id)
+
         # Update name if provided
         if original_name is not None and not use_cleaned:
             meta.original_name = original_name
         
         return meta
     
-    def _load_dataframe(
+    def _cleaned_storage_key(self, dataset_id: str) -> str | None:
+        # Prefer the typed Parquet output, then a cleaned.csv from older pipeline runs
+        for key in (cleaned_key(dataset_id), legacy_cleaned_key(dataset_id)):
+            if self._storage.exists(key):
+                return key
+        return None
+
+    def _read_frame(
         self,
-        meta: DatasetOut,
-        use_cleaned: bool = False,
+        handle: BinaryIO,
+        ext: str,
         max_rows: int | None = None,
+        columns: Sequence[str] | None = None,
+        start_row: int = 0,
     ) -> pd.DataFrame:
-        storage_key = meta.storage_key
-        
-        if use_cleaned:
-            cleaned_key = f"datasets/{meta.dataset_id}/cleaned.csv"
-            # Fallback to raw data if cleaned doesn't exist yet
-            try:
-                with self._storage.open(cleaned_key):
-                    pass
-                storage_key = cleaned_key
-            except FileNotFoundError:
-                pass
-                
-        ext = Path(storage_key).suffix.lower()
-        f = self._storage.open(storage_key)
-
+        # Push the column list and row range down to the reader where the format allows it;
+        # unknown column names are ignored.
+        wanted = None if columns is None else set(columns)
+        usecols = None if wanted is None else (lambda name: name in wanted)
+        skiprows = range(1, start_row + 1) if start_row > 0 else None
         if ext == ".csv":
-            df = pd.read_csv(f, nrows=max_rows)
+            df = pd.read_csv(handle, usecols=usecols, skiprows=skiprows, nrows=max_rows)
         elif ext in [".xlsx", ".xls"]:
-            df = pd.read_excel(f, nrows=max_rows)
+            df = pd.read_excel(handle, usecols=usecols, skiprows=skiprows, nrows=max_rows)
         elif ext == ".parquet":
-            df = pd.read_parquet(f)
-            if max_rows is not None:
-                df = df.head(max_rows)
+            return read_parquet(handle, max_rows, columns, start_row)
         elif ext == ".json":
-            df = pd.read_json(f)
-            if max_rows is not None:
-                df = df.head(max_rows)
+            df = self._read_json(handle, max_rows, start_row)
         else:
             raise HTTPException(status_code=400, detail=f"Schema-Erkennung für '{ext}' nicht unterstützt")
-        
+        if columns is not None:
+            df = df[[name for name in dict.fromkeys(columns) if name in df.columns]]
         return df
-    
+
+    def _read_json(self, handle: BinaryIO, max_rows: int | None, start_row: int) -> pd.DataFrame:
+        # JSON Lines are read lazily, parsing only the lines in the row range; a JSON
+        # document has to be parsed whole.
+        if not self._is_json_lines(handle):
+            df = pd.read_json(handle)
+            if not start_row and max_rows is None:
+                return df
+            stop = None if max_rows is None else start_row + max_rows
+            return df.iloc[start_row:stop].reset_index(drop=True)
+        lines = (line for line in handle if line.strip())
+        stop = None if max_rows is None else start_row + max_rows
+        selected = b"".join(itertools.islice(lines, start_row, stop))
+        if not selected:
+            return pd.DataFrame()
+        return pd.read_json(io.BytesIO(selected), lines=True)
+
+    def _is_json_lines(self, handle: BinaryIO) -> bool:
+        # JSON Lines start with an object, a JSON document of records with an array
+        first = handle.read(1)
+        while first and first.isspace():
+            first = handle.read(1)
+        handle.seek(0)
+        return first == b"{"
+
+    def _resolve_storage_key(self, meta: DatasetOut, use_cleaned: bool) -> tuple[str, str]:
+        # The file to read and its frame cache variant; cleaned falls back to raw data until
+        # the pipeline wrote it
+        storage_key = meta.storage_key
+        if use_cleaned:
+            storage_key = self._cleaned_storage_key(meta.dataset_id) or storage_key
+        return storage_key, "raw" if storage_key == meta.storage_key else "cleaned"
+
+    def _row_index(self, dataset_id: str, variant: str, version: Any, handle: BinaryIO, ext: str) -> RowOffsetIndex | None:
+        # Built on the first read of a row range and kept until the file changes; None for
+        # files without line-based rows
+        found, index = self._row_indexes.get(dataset_id, variant, version)
+        if found:
+            return index
+        if ext == ".csv" or (ext == ".json" and self._is_json_lines(handle)):
+            try:
+                index = build_row_index(handle, self._settings.row_index_stride, csv=ext == ".csv")
+            except ValueError:
+                index = None
+        self._row_indexes.put(dataset_id, variant, version, index)
+        return index
+
+    def _load_dataframe(
+        self,
+        meta: DatasetOut,
+        use_cleaned: bool = False,
+        max_rows: int | None = None,
+        columns: Sequence[str] | None = None,
+        start_row: int = 0,
+    ) -> pd.DataFrame:
+        """Load the dataset, optionally only ``columns`` and ``max_rows`` rows from ``start_row``."""
+        storage_key, variant = self._resolve_storage_key(meta, use_cleaned)
+
+        # Serve repeated reads of an unchanged file from the in-memory frame cache
+        version = self._storage.version(storage_key)
+        cached = self._frames.get(meta.dataset_id, variant, version, max_rows, columns, start_row)
+        if cached is not None:
+            return cached
+
+        ext = Path(storage_key).suffix.lower()
+        with self._storage.open(storage_key) as f:
+            # Row ranges of line-based files seek straight to their first row
+            index = self._row_index(meta.dataset_id, variant, version, f, ext) if start_row else None
+            if index is not None:
+                df = read_indexed_rows(f, index, start_row, max_rows, columns)
+            else:
+                df = self._read_frame(f, ext, max_rows, columns, start_row)
+        if start_row == 0:
+            self._frames.put(meta.dataset_id, variant, version, df, max_rows, columns)
+        return df
+
+    def frame_version(self, dataset_id: str, use_cleaned: bool = False) -> str:
+        """Identify the file ``_load_dataframe`` reads; changes whenever that file is rewritten."""
+        storage_key, _ = self._resolve_storage_key(self.get(dataset_id), use_cleaned)
+        mtime_ns, size = self._storage.version(storage_key)
+        return f"{dataset_id}:{storage_key}:{mtime_ns}:{size}"
+
+    def sandbox_snapshot(self, dataset_id: str) -> tuple[Path, str]:
+        """Return the read-only Arrow snapshot of the (cleaned) dataset and its version.
+
+        The snapshot is written on first use of each file version and shared by later runs.
+        """
+        meta = self.get(dataset_id)
+        version = self.frame_version(dataset_id, use_cleaned=True)
+        path = self._snapshots.path(dataset_id, version, lambda: self._load_dataframe(meta, use_cleaned=True))
+        return path, version
+
+    def _row_count(self, meta: DatasetOut, use_cleaned: bool = False, scan: bool = True) -> int | None:
+        # Parquet keeps it in the footer and line-based files in their row index; other
+        # formats are loaded (and then served from the frame cache). Without ``scan`` only
+        # counts known without reading the whole file are returned, else None.
+        storage_key, variant = self._resolve_storage_key(meta, use_cleaned)
+        version = self._storage.version(storage_key)
+        ext = Path(storage_key).suffix.lower()
+        if ext == ".parquet":
+            with self._storage.open(storage_key) as f:
+                return parquet_row_count(f)
+        found, index = self._row_indexes.get(meta.dataset_id, variant, version)
+        if found and index is not None:
+            return index.row_count
+        if not scan:
+            return None
+        with self._storage.open(storage_key) as f:
+            index = self._row_index(meta.dataset_id, variant, version, f, ext)
+        if index is not None:
+            return index.row_count
+        return len(self._load_dataframe(meta, use_cleaned=use_cleaned))
+
+    def get_profile(self, dataset_id: str, profiler: DatasetProfiler | None = None) -> StoredProfile:
+        """Return the profile of the data chat turns analyse (cleaned, else raw).
+
+        Profiles are written by the pipeline and reused while the source file and the
+        profiler code are unchanged; otherwise they are recomputed and stored again.
+        """
+        meta = self.get(dataset_id)
+        profiler = profiler or DatasetProfiler()
+        storage_key = self._cleaned_storage_key(dataset_id) or meta.storage_key
+        version = profile_version(self._storage, storage_key, profiler.approx_row_threshold)
+        stored = self._profiles.load(dataset_id, version)
+        if stored is not None:
+            return stored
+
+        df = self._load_dataframe(meta, use_cleaned=True)
+        profile, schema = profiler.profile(dataset_id, df)
+        self._profiles.save(dataset_id, version, profile, schema)
+        return profile, schema
+
+    def frame_cache_stats(self) -> Dict[str, Any]:
+        return self._frames.stats()
+
+    def export_csv(self, dataset_id: str, use_cleaned: bool = True) -> tuple[str, Iterator[bytes]]:
+        """Return a download filename and a CSV byte stream of the (cleaned) dataset."""
+        meta = self.get(dataset_id)
+        stem = Path(meta.original_name).stem or "dataset"
+        storage_key = self._cleaned_storage_key(dataset_id) if use_cleaned else None
+        filename = f"{stem}_cleaned.csv" if storage_key else f"{stem}.csv"
+        storage_key = storage_key or meta.storage_key
+        ext = Path(storage_key).suffix.lower()
+
+        def _chunks() -> Iterator[bytes]:
+            with self._storage.open(storage_key) as handle:
+                if ext == ".parquet":
+                    yield from iter_csv_chunks(handle)
+                elif ext == ".csv":
+                    yield from iter(lambda: handle.read(1024 * 1024), b"")
+                else:
+                    buffer = io.StringIO()
+                    self._read_frame(handle, ext).to_csv(buffer, index=False)
+                    yield buffer.getvalue().encode("utf-8")
+
+        return filename, _chunks()
+
     def _map_dtype(self, dtype) -> str:
         if pd.api.types.is_integer_dtype(dtype):
             return "integer"
@@ -194,21 +445,35 @@ class DatasetService:
         )
         return schema
 
-    def get_preview_data(self, dataset_id: str, limit: int = 100, use_cleaned: bool = False) -> list[list]:
-        import json
+    def get_preview_data(
+        self,
+        dataset_id: str,
+        limit: int = 100,
+        use_cleaned: bool = False,
+        columns: Sequence[str] | None = None,
+        offset: int = 0,
+    ) -> tuple[str, int | None]:
+        """Return one page of the dataset as a JSON array (column names, then rows) and the total row count.
+
+        The page is serialized straight from the frame, without building Python row lists.
+        The first page never scans the whole file for the count: it is None there unless
+        the file's footer or an existing row index has it, or the page holds every row.
+        """
         meta = self._store.get(dataset_id)
         if not meta:
             raise HTTPException(status_code=404, detail="Dataset not found")
 
-        df = self._load_dataframe(meta, use_cleaned=use_cleaned, max_rows=limit)
-            
-        df = df.fillna('?')
-        
-        columns = df.columns.tolist()
-        json_str = df.to_json(orient='values', date_format='iso')
-        records = json.loads(json_str)
-        
-        return [columns] + records
+        df = self._load_dataframe(meta, use_cleaned=use_cleaned, max_rows=limit, columns=columns, start_row=offset)
+
+        # Typed (nullable) columns can't hold the '?' placeholder, so fill on object values
+        df = df.astype(object).where(df.notna(), '?')
+
+        header = json.dumps(df.columns.tolist(), default=str)
+        rows = df.to_json(orient='values', date_format='iso')
+        body = f"[{header},{rows[1:]}" if len(df) else f"[{header}]"
+        if offset == 0 and len(df) < limit:
+            return body, len(df)
+        return body, self._row_count(meta, use_cleaned=use_cleaned, scan=offset > 0)
 
     def get_quality_report(self, dataset_id: str) -> Dict[str, Any]:
         meta = self._store.get(dataset_id)
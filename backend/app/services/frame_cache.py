@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+import threading
+from typing import Any, Dict, Hashable, Optional, Sequence, Tuple
+
+import pandas as pd
+
+# (dataset_id, variant, file version, row limit, columns); None means all rows / all columns
+FrameKey = Tuple[str, str, Hashable, Optional[int], Optional[Tuple[str, ...]]]
+
+
+class DataFrameCache:
+    """LRU cache of loaded DataFrames bounded by their deep memory usage.
+
+    Frames are keyed by dataset, variant ("raw" / "cleaned"), the file version they were
+    read from, the row limit and the column projection, so a rewritten file never serves a
+    stale frame. Frames are copied on the way in and out, so in-place edits by a caller
+    (``df.loc[...] = ...``, ``fillna(inplace=True)``) never reach the cached frame.
+    """
+
+    def __init__(self, max_bytes: int):
+        self._max_bytes = max(0, max_bytes)
+        self._lock = threading.Lock()
+        self._frames: "OrderedDict[FrameKey, Tuple[pd.DataFrame, int]]" = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(
+        self,
+        dataset_id: str,
+        variant: str,
+        version: Hashable,
+        max_rows: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None,
+        start_row: int = 0,
+    ) -> Optional[pd.DataFrame]:
+        # Frames with all rows also answer row ranges, frames with all columns also answer
+        # projections; a row range past the start is only answered from all rows.
+        projection = None if columns is None else tuple(columns)
+        row_limits = (None,) if start_row else (max_rows, None)
+        with self._lock:
+            for limit in row_limits:
+                for cached_columns in dict.fromkeys((projection, None)):
+                    key = (dataset_id, variant, version, limit, cached_columns)
+                    entry = self._frames.get(key)
+                    if entry is None:
+                        continue
+                    self._frames.move_to_end(key)
+                    self._hits += 1
+                    df = entry[0]
+                    if limit is None and (start_row or max_rows is not None):
+                        df = df.iloc[start_row : None if max_rows is None else start_row + max_rows]
+                        # Numbered from zero like a row range read from the file
+                        df = df.reset_index(drop=True) if start_row else df
+                    if cached_columns is None and projection is not None:
+                        df = df[[name for name in dict.fromkeys(projection) if name in df.columns]]
+                    return df.copy(deep=True)
+            self._misses += 1
+            return None
+
+    def put(
+        self,
+        dataset_id: str,
+        variant: str,
+        version: Hashable,
+        df: pd.DataFrame,
+        max_rows: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None,
+    ) -> None:
+        size = int(df.memory_usage(index=True, deep=True).sum())
+        if size > self._max_bytes:
+            return
+        key = (dataset_id, variant, version, max_rows, None if columns is None else tuple(columns))
+        with self._lock:
+            # Frames of older file versions can never be hit again
+            for stale in [k for k in self._frames if k[:2] == key[:2] and k[2] != version]:
+                self._remove(stale)
+            if key in self._frames:
+                self._remove(key)
+            self._frames[key] = (df.copy(deep=True), size)
+            self._bytes += size
+            while self._bytes > self._max_bytes and self._frames:
+                self._remove(next(iter(self._frames)))
+                self._evictions += 1
+
+    def invalidate(self, dataset_id: str) -> None:
+        with self._lock:
+            for key in [k for k in self._frames if k[0] == dataset_id]:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._frames.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "entries": len(self._frames),
+                "bytes": self._bytes,
+                "max_bytes": self._max_bytes,
+            }
+
+    def _remove(self, key: FrameKey) -> None:
+        _, size = self._frames.pop(key)
+        self._bytes -= size
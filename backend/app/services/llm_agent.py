@@ -1,12 +1,13 @@
 from __future__ import annotations
 
-import ast
 import json
 import re
 from typing import Any
 
 import pandas as pd
 
+from app.services.code_columns import analyze_columns
+
 
 class LLMAgent:
     """Compatibility helper around legacy validation utilities.
@@ -87,21 +88,7 @@ class LLMAgent:
         return True, None
 
     def _extract_referenced_columns(self, code: str) -> set[str]:
-        columns: set[str] = set()
-        try:
-            tree = ast.parse(code)
-        except SyntaxError:
-            return columns
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Subscript) and isinstance(node.value, ast.Name) and node.value.id == "df":
-                slice_node = node.slice
-                if isinstance(slice_node, ast.Constant) and isinstance(slice_node.value, str):
-                    columns.add(slice_node.value)
-                elif isinstance(slice_node, ast.Tuple):
-                    for element in slice_node.elts:
-                        if isinstance(element, ast.Constant) and isinstance(element.value, str):
-                            columns.add(element.value)
-        return columns
+        return analyze_columns(code).columns
 
     def _validate_code_against_metadata(self, code: str, dataset_df: pd.DataFrame) -> tuple[bool, list[str]]:
         issues: list[str] = []
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from functools import lru_cache
+import hashlib
+import json
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from pydantic import BaseModel
+
+from app.core.config import get_settings
+
+SQLITE_FILENAME = "llm_cache.sqlite3"
+
+
+def structured_cache_key(
+    model_name: str,
+    temperature: float,
+    response_model: type[BaseModel],
+    system_prompt: str,
+    user_prompt: str,
+) -> str:
+    """Fingerprint of a structured call: anything that changes the answer changes the key."""
+    payload = json.dumps(
+        {
+            "model": model_name,
+            "temperature": temperature,
+            "schema": response_model.model_json_schema(),
+            "system": system_prompt,
+            "user": user_prompt,
+        },
+        sort_keys=True,
+        ensure_ascii=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """Structured LLM responses (as JSON) keyed by ``structured_cache_key``.
+
+    Recent responses are kept in an in-memory LRU of ``max_entries``; with ``sqlite_path``
+    every response is also written to a SQLite table, so they survive restarts and are
+    shared by processes using the same file. The table keeps the ``max_entries`` newest
+    responses (only the TTL bounds it when ``max_entries`` is 0). Entries older than
+    ``ttl_seconds`` are not served. Calls with a temperature above ``max_temperature`` are
+    meant to be sampled fresh and get no key.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        max_temperature: float,
+        sqlite_path: Optional[Path] = None,
+    ):
+        self._max_entries = max(0, max_entries)
+        self._ttl_seconds = ttl_seconds
+        self._max_temperature = max_temperature
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._bypassed = 0
+        self._db: Optional[sqlite3.Connection] = None
+        if sqlite_path is not None:
+            sqlite_path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(sqlite_path), check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_responses "
+                "(key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+
+    def key(
+        self,
+        model_name: str,
+        temperature: float,
+        response_model: type[BaseModel],
+        system_prompt: str,
+        user_prompt: str,
+        count: bool = True,
+    ) -> Optional[str]:
+        """The call's cache key, or None when its temperature is above the threshold.
+
+        Pass ``count=False`` when no call is made, so the key is not counted as a bypass."""
+        if temperature > self._max_temperature:
+            if count:
+                with self._lock:
+                    self._bypassed += 1
+            return None
+        return structured_cache_key(model_name, temperature, response_model, system_prompt, user_prompt)
+
+    def get(self, key: str) -> Optional[str]:
+        oldest = time.time() - self._ttl_seconds
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] >= oldest:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+            row = None
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT response, created_at FROM llm_responses WHERE key = ? AND created_at >= ?", (key, oldest)
+                ).fetchone()
+            if row is None:
+                self._misses += 1
+                return None
+            self._hits += 1
+            self._disk_hits += 1
+            self._remember(key, row[0], row[1])
+            return row[0]
+
+    def put(self, key: str, response: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(key, response, now)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO llm_responses (key, response, created_at) VALUES (?, ?, ?)",
+                    (key, response, now),
+                )
+                self._db.execute("DELETE FROM llm_responses WHERE created_at < ?", (now - self._ttl_seconds,))
+                if self._max_entries:
+                    self._db.execute(
+                        "DELETE FROM llm_responses WHERE key NOT IN "
+                        "(SELECT key FROM llm_responses ORDER BY created_at DESC, rowid DESC LIMIT ?)",
+                        (self._max_entries,),
+                    )
+
+    def delete(self, key: str) -> None:
+        # For answers found wrong after the fact, so they are not served again
+        with self._lock:
+            self._entries.pop(key, None)
+            if self._db is not None:
+                self._db.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM llm_responses")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "bypassed": self._bypassed,
+                "entries": len(self._entries),
+                "max_entries": self._max_entries,
+                "persistent": self._db is not None,
+            }
+
+    def _remember(self, key: str, response: str, created_at: float) -> None:
+        if not self._max_entries:
+            return
+        self._entries[key] = (response, created_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+
+@lru_cache()
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    settings = get_settings()
+    if not settings.llm_cache_enabled:
+        return None
+    return LLMResponseCache(
+        settings.llm_cache_max_entries,
+        ttl_seconds=settings.llm_cache_ttl_seconds,
+        max_temperature=settings.llm_cache_max_temperature,
+        sqlite_path=settings.storage_dir / SQLITE_FILENAME if settings.llm_cache_sqlite else None,
+    )
@@ -5,7 +5,7 @@ from typing import TypeVar
 
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_openai import ChatOpenAI
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 
 from app.schemas.agent import (
     AggregationOp,
@@ -24,15 +24,22 @@ from app.schemas.agent import (
     SortDirection,
     TextAnswerSpec,
 )
+from app.services.llm_cache import LLMResponseCache
 
 
 StructuredModel = TypeVar("StructuredModel", bound=BaseModel)
 
 
 class LLMService:
-    def __init__(self, model_name: str = "gpt-4o-mini", temperature: float = 0.1):
+    def __init__(
+        self,
+        model_name: str = "gpt-4o-mini",
+        temperature: float = 0.1,
+        cache: LLMResponseCache | None = None,
+    ):
         self.model_name = model_name
         self.temperature = temperature
+        self.cache = cache
 
     def interpret_request(self, question: str, history_text: str, profile: DatasetProfile) -> IntentResult:
         fallback = self._heuristic_intent(question, profile)
@@ -177,26 +184,56 @@ class LLMService:
         revision_context: list[str] | None = None,
     ) -> FreeCodeSpec:
         fallback = self._heuristic_free_code(question, plan, profile)
+        system_prompt, user_prompt = self._free_code_prompts(question, plan, profile, revision_context)
         return self._invoke_structured(
             response_model=FreeCodeSpec,
-            system_prompt=(
-                "Du bist ein Analytics-Assistent. Generiere fokussierten, sicheren Python-Code "
-                "für eine isolierte Sandbox-Ausführung. "
-                "Der Code hat Zugriff auf: 'df' (pandas DataFrame) und 'OUTPUT_PATH' (str, Ausgabepfad). "
-                "Erlaubte Imports: pandas, numpy, matplotlib, seaborn. "
-                "Speichere Diagramme mit plt.savefig(OUTPUT_PATH, bbox_inches='tight') und plt.close(). "
-                "Für reine Textausgaben nutze print(). "
-                "Greife niemals auf das Netzwerk oder Dateisystempfade außerhalb von OUTPUT_PATH zu."
-            ),
-            user_prompt=(
-                f"Frage: {question}\n"
-                f"Analyseplan: {plan.model_dump_json()}\n"
-                f"Dataset-Profil: {self._profile_summary(profile)}\n"
-                f"Überarbeitungshinweise: {revision_context or []}\n"
-            ),
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
             fallback=fallback,
         )
 
+    def free_code_cache_key(
+        self,
+        question: str,
+        plan: AnalysisPlan,
+        profile: DatasetProfile,
+        revision_context: list[str] | None = None,
+    ) -> str | None:
+        """Cache key of ``generate_free_code`` with these arguments; None without a cache."""
+        if self.cache is None:
+            return None
+        system_prompt, user_prompt = self._free_code_prompts(question, plan, profile, revision_context)
+        # Built like the key of the call itself, so both follow the same temperature rule
+        return self.cache.key(self.model_name, self.temperature, FreeCodeSpec, system_prompt, user_prompt, count=False)
+
+    def discard_cached(self, cache_key: str) -> None:
+        if self.cache is not None:
+            self.cache.delete(cache_key)
+
+    def _free_code_prompts(
+        self,
+        question: str,
+        plan: AnalysisPlan,
+        profile: DatasetProfile,
+        revision_context: list[str] | None,
+    ) -> tuple[str, str]:
+        system_prompt = (
+            "Du bist ein Analytics-Assistent. Generiere fokussierten, sicheren Python-Code "
+            "für eine isolierte Sandbox-Ausführung. "
+            "Der Code hat Zugriff auf: 'df' (pandas DataFrame) und 'OUTPUT_PATH' (str, Ausgabepfad). "
+            "Erlaubte Imports: pandas, numpy, matplotlib, seaborn. "
+            "Speichere Diagramme mit plt.savefig(OUTPUT_PATH, bbox_inches='tight') und plt.close(). "
+            "Für reine Textausgaben nutze print(). "
+            "Greife niemals auf das Netzwerk oder Dateisystempfade außerhalb von OUTPUT_PATH zu."
+        )
+        user_prompt = (
+            f"Frage: {question}\n"
+            f"Analyseplan: {plan.model_dump_json()}\n"
+            f"Dataset-Profil: {self._profile_summary(profile)}\n"
+            f"Überarbeitungshinweise: {revision_context or []}\n"
+        )
+        return system_prompt, user_prompt
+
     def review_sandbox_output(
         self,
         question: str,
@@ -244,6 +281,17 @@ class LLMService:
         model = self._build_model()
         if model is None:
             return fallback
+        # Only answers from the model are cached, never the heuristic fallbacks
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.key(self.model_name, self.temperature, response_model, system_prompt, user_prompt)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                try:
+                    return response_model.model_validate_json(cached)
+                except ValidationError:
+                    pass
         try:
             structured_model = model.with_structured_output(response_model)
             result = structured_model.invoke(
@@ -252,11 +300,13 @@ class LLMService:
                     HumanMessage(content=user_prompt),
                 ]
             )
-            if isinstance(result, response_model):
-                return result
-            return response_model.model_validate(result)
+            if not isinstance(result, response_model):
+                result = response_model.model_validate(result)
         except Exception:
             return fallback
+        if cache_key is not None:
+            self.cache.put(cache_key, result.model_dump_json())
+        return result
 
     def _build_model(self) -> ChatOpenAI | None:
         api_key = (os.getenv("OPENAI_API_KEY") or "").strip().strip('"').strip("'")
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import logging
+import threading
+import time
+from typing import Any, Dict, Union
+from uuid import uuid4
+
+from ..models.datasets import (
+    PipelineJobOut,
+    PipelineJobStatus,
+    PipelineStepProgress,
+    PipelineStepStatus,
+)
+from .data_pipeline.pipeline import DataQualityPipeline, PipelineContext
+from .data_pipeline.streaming import StreamingQualityPipeline
+
+logger = logging.getLogger(__name__)
+
+AnyPipeline = Union[DataQualityPipeline, StreamingQualityPipeline]
+
+
+class PipelineQueueFull(RuntimeError):
+    """Raised when all workers are busy and the job queue is at capacity."""
+
+
+class PipelineJobManager:
+    """Runs data-quality pipelines on a bounded worker pool and tracks per-step progress.
+
+    At most ``max_workers`` pipelines run at the same time and at most ``max_queued``
+    wait for a worker; further submissions raise ``PipelineQueueFull``. The status of the
+    last ``max_finished`` finished jobs is kept; older finished jobs are forgotten.
+    """
+
+    def __init__(self, max_workers: int = 2, max_queued: int = 16, max_finished: int = 1000):
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="pipeline-job")
+        self._slots = threading.BoundedSemaphore(max(1, max_workers) + max(0, max_queued))
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, PipelineJobOut] = {}
+        self._step_started: Dict[str, Dict[str, float]] = {}
+        self._done: Dict[str, threading.Event] = {}
+        self._max_finished = max(1, max_finished)
+        # Finished job ids, oldest first
+        self._finished: "OrderedDict[str, None]" = OrderedDict()
+
+    def submit(
+        self,
+        dataset_id: str,
+        pipeline: AnyPipeline,
+        context: PipelineContext,
+    ) -> PipelineJobOut:
+        if not self._slots.acquire(blocking=False):
+            raise PipelineQueueFull("Pipeline queue is full, try again later.")
+
+        job_id = str(uuid4())
+        steps = [PipelineStepProgress(name=name) for name in pipeline.step_names]
+        job = PipelineJobOut(
+            job_id=job_id,
+            dataset_id=dataset_id,
+            status=PipelineJobStatus.queued,
+            created_at=_now(),
+            steps=steps,
+            total_steps=len(steps),
+        )
+        with self._lock:
+            self._jobs[job_id] = job
+            self._step_started[job_id] = {}
+            self._done[job_id] = threading.Event()
+
+        try:
+            self._executor.submit(self._run, job_id, pipeline, context)
+        except Exception:
+            self._slots.release()
+            with self._lock:
+                self._forget(job_id)
+            raise
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> PipelineJobOut:
+        with self._lock:
+            return self._jobs[job_id].model_copy(deep=True)
+
+    def wait(self, job_id: str, timeout: float | None = None) -> PipelineJobOut:
+        """Block until the job finished (or the timeout passed) and return its status."""
+        with self._lock:
+            done = self._done[job_id]
+        done.wait(timeout)
+        return self.get(job_id)
+
+    def forget(self, job_id: str) -> None:
+        with self._lock:
+            self._forget(job_id)
+
+    def _forget(self, job_id: str) -> None:
+        self._jobs.pop(job_id, None)
+        self._step_started.pop(job_id, None)
+        self._done.pop(job_id, None)
+        self._finished.pop(job_id, None)
+
+    def _run(
+        self,
+        job_id: str,
+        pipeline: AnyPipeline,
+        context: PipelineContext,
+    ) -> None:
+        self._update_job(job_id, status=PipelineJobStatus.running, started_at=_now())
+        try:
+            result = pipeline.run(context, listener=lambda event, step: self._on_step_event(job_id, event, step))
+            pipeline_error = result.get("pipeline_error")
+            if pipeline_error:
+                self._update_job(
+                    job_id,
+                    status=PipelineJobStatus.failed,
+                    error=f"{pipeline_error.get('step')}: {pipeline_error.get('message')}",
+                )
+            else:
+                self._update_job(job_id, status=PipelineJobStatus.completed)
+        except Exception as exc:
+            logger.exception("ERROR: pipeline_job.failed %s", job_id)
+            self._update_job(job_id, status=PipelineJobStatus.failed, error=f"{type(exc).__name__}: {exc}")
+        finally:
+            self._update_job(job_id, finished_at=_now())
+            self._slots.release()
+            with self._lock:
+                done = self._done.get(job_id)
+                if job_id in self._jobs:
+                    self._step_started.pop(job_id, None)
+                    self._finished[job_id] = None
+                while len(self._finished) > self._max_finished:
+                    self._forget(next(iter(self._finished)))
+            if done is not None:
+                done.set()
+
+    def _on_step_event(self, job_id: str, event: str, step_name: str) -> None:
+        now = time.perf_counter()
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            step = next((item for item in job.steps if item.name == step_name), None)
+            if step is None:
+                return
+            started = self._step_started[job_id]
+            if event == "start":
+                started[step_name] = now
+                step.status = PipelineStepStatus.running
+                step.started_at = _now()
+            elif event in {"end", "error"}:
+                step.status = PipelineStepStatus.completed if event == "end" else PipelineStepStatus.failed
+                step.finished_at = _now()
+                if step_name in started:
+                    step.duration_ms = round((now - started[step_name]) * 1000, 3)
+            elif event == "skip":
+                step.status = PipelineStepStatus.skipped
+            elif event == "cached":
+                step.status = PipelineStepStatus.cached
+                step.finished_at = _now()
+            job.completed_steps = sum(
+                1
+                for item in job.steps
+                if item.status
+                in {
+                    PipelineStepStatus.completed,
+                    PipelineStepStatus.skipped,
+                    PipelineStepStatus.failed,
+                    PipelineStepStatus.cached,
+                }
+            )
+
+    def _update_job(self, job_id: str, **changes: Any) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            for key, value in changes.items():
+                setattr(job, key, value)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
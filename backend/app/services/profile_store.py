@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from functools import lru_cache
+import hashlib
+import inspect
+import io
+import json
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import get_settings
+from app.schemas.agent import DatasetProfile, DatasetSchemaField
+from app.services import dataset_profiler, sketches
+from app.services.storage import StorageService
+
+StoredProfile = Tuple[DatasetProfile, List[DatasetSchemaField]]
+
+
+def profile_key(dataset_id: str) -> str:
+    return f"datasets/{dataset_id}/profile.json"
+
+
+@lru_cache()
+def profiler_version(approx_row_threshold: int) -> str:
+    # Editing the profiler or the sketches behind approximate profiles changes their output,
+    # as does the row count from which profiles are approximate
+    digest = hashlib.sha256(f"approx_row_threshold={approx_row_threshold};".encode("utf-8"))
+    for module in (dataset_profiler, sketches):
+        try:
+            source = inspect.getsource(module)
+        except (OSError, TypeError):
+            source = module.__name__
+        digest.update(source.encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def profile_version(storage: StorageService, source_key: str, approx_row_threshold: Optional[int] = None) -> str:
+    """Version of a profile computed from ``source_key``: profiler code and settings plus the
+    file's mtime and size. ``approx_row_threshold`` defaults to the configured one."""
+    if approx_row_threshold is None:
+        approx_row_threshold = get_settings().profiler_approx_row_threshold
+    mtime_ns, size = storage.version(source_key)
+    return f"{profiler_version(approx_row_threshold)}:{source_key}:{mtime_ns}:{size}"
+
+
+class ProfileStore:
+    """Dataset profiles persisted as ``profile.json`` next to the quality report, with an in-memory layer."""
+
+    def __init__(self, storage: StorageService):
+        self._storage = storage
+        self._lock = threading.Lock()
+        self._memory: Dict[str, Tuple[str, StoredProfile]] = {}
+
+    def load(self, dataset_id: str, version: str) -> Optional[StoredProfile]:
+        with self._lock:
+            cached = self._memory.get(dataset_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        try:
+            with self._storage.open(profile_key(dataset_id)) as handle:
+                payload = json.load(handle)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if payload.get("version") != version:
+            return None
+        stored = (
+            DatasetProfile.model_validate(payload["profile"]),
+            [DatasetSchemaField.model_validate(field) for field in payload["schema"]],
+        )
+        with self._lock:
+            self._memory[dataset_id] = (version, stored)
+        return stored
+
+    def save(
+        self,
+        dataset_id: str,
+        version: str,
+        profile: DatasetProfile,
+        schema: List[DatasetSchemaField],
+    ) -> str:
+        payload = {
+            "version": version,
+            "profile": profile.model_dump(mode="json"),
+            "schema": [field.model_dump(mode="json") for field in schema],
+        }
+        key = profile_key(dataset_id)
+        self._storage.save(key, io.BytesIO(json.dumps(payload, ensure_ascii=True, indent=2).encode("utf-8")))
+        with self._lock:
+            self._memory[dataset_id] = (version, (profile, schema))
+        return key
+
+    def adopt(self, dataset_id: str, version: str) -> Optional[str]:
+        """Re-key a ``profile.json`` copied from another dataset with the same content to
+        ``dataset_id`` and ``version``. Returns its key, or None when there is none or it was
+        computed by other profiler code or settings."""
+        key = profile_key(dataset_id)
+        try:
+            with self._storage.open(key) as handle:
+                payload = json.load(handle)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        # Versions start with the profiler version; the rest names the source file
+        if str(payload.get("version", "")).split(":", 1)[0] != version.split(":", 1)[0]:
+            self._storage.delete(key)
+            return None
+        profile = DatasetProfile.model_validate(payload["profile"]).model_copy(update={"dataset_id": dataset_id})
+        schema = [DatasetSchemaField.model_validate(field) for field in payload["schema"]]
+        return self.save(dataset_id, version, profile, schema)
+
+    def invalidate(self, dataset_id: str) -> None:
+        with self._lock:
+            self._memory.pop(dataset_id, None)
+        self._storage.delete(profile_key(dataset_id))
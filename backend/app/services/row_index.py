@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+import io
+import itertools
+import threading
+from typing import BinaryIO, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+_BLOCK_BYTES = 8 * 1024 * 1024
+_NEWLINE = ord("\n")
+_CARRIAGE_RETURN = ord("\r")
+_QUOTE = ord('"')
+
+
+@dataclass(frozen=True)
+class RowOffsetIndex:
+    """Byte offsets of every ``stride``-th data row of a line-based file (CSV or JSON Lines).
+
+    A row range is read by seeking to the nearest indexed row before it and parsing at most
+    ``stride - 1`` rows more than requested, so any page costs the same as the first one.
+    Blank lines are not rows, matching how pandas reads both formats.
+    """
+
+    stride: int
+    offsets: np.ndarray
+    row_count: int
+    # Column names from the CSV header; None for JSON Lines
+    header: Optional[List[str]] = None
+
+    def locate(self, row: int) -> Tuple[int, int]:
+        # Byte offset to seek to and the number of rows to skip after it
+        block = min(row // self.stride, len(self.offsets) - 1)
+        return int(self.offsets[block]), row - block * self.stride
+
+
+def build_row_index(handle: BinaryIO, stride: int, csv: bool) -> RowOffsetIndex:
+    """Scan ``handle`` once and record where every ``stride``-th row starts.
+
+    For CSV the first non-blank line is the header and newlines inside quoted fields do not
+    end a row; JSON Lines cannot contain raw newlines inside a value.
+    """
+    stride = max(1, stride)
+    starts: List[np.ndarray] = []
+    row_count = 0
+    header_end: Optional[int] = None if csv else 0
+    quoted = False
+    position = 0
+    line_start = 0
+    previous_byte = _NEWLINE
+    handle.seek(0)
+    for block in iter(lambda: handle.read(_BLOCK_BYTES), b""):
+        data = np.frombuffer(block, dtype=np.uint8)
+        newlines = np.flatnonzero(data == _NEWLINE)
+        if csv:
+            # A newline ends a row only outside quotes: after an even number of quote characters
+            quotes = np.cumsum(data == _QUOTE)
+            newlines = newlines[(quotes[newlines] + quoted) % 2 == 0]
+            quoted = bool((int(quotes[-1]) + quoted) % 2)
+        ends = newlines + position
+        line_starts = np.concatenate([[line_start], ends[:-1] + 1])
+        lengths = ends - line_starts
+        # A blank line is empty or a lone carriage return (which may end the previous block)
+        before = np.where(newlines > 0, data[np.maximum(newlines - 1, 0)], previous_byte)
+        blank = (lengths == 0) | ((lengths == 1) & (before == _CARRIAGE_RETURN))
+        rows = line_starts[~blank]
+        if header_end is None and len(rows):
+            header_end = int(ends[~blank][0]) + 1
+            rows = rows[1:]
+        starts.append(rows[(np.arange(row_count, row_count + len(rows)) % stride) == 0])
+        row_count += len(rows)
+        if len(ends):
+            line_start = int(ends[-1]) + 1
+        position += len(block)
+        previous_byte = int(data[-1])
+
+    # The last line may not end with a newline
+    if position > line_start:
+        handle.seek(line_start)
+        if handle.read(position - line_start).strip(b"\r"):
+            if header_end is None:
+                header_end = position
+            else:
+                if row_count % stride == 0:
+                    starts.append(np.array([line_start]))
+                row_count += 1
+
+    header = None
+    if csv:
+        handle.seek(0)
+        header = [str(name) for name in pd.read_csv(handle, nrows=0).columns]
+    offsets = np.concatenate(starts).astype(np.int64) if starts else np.empty(0, dtype=np.int64)
+    if not len(offsets):
+        offsets = np.array([header_end or 0], dtype=np.int64)
+    return RowOffsetIndex(stride=stride, offsets=offsets, row_count=row_count, header=header)
+
+
+def read_indexed_rows(
+    handle: BinaryIO,
+    index: RowOffsetIndex,
+    start_row: int = 0,
+    max_rows: Optional[int] = None,
+    columns: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+    """Read rows ``start_row`` to ``start_row + max_rows`` via the index, numbered from zero."""
+    start_row = min(max(0, start_row), index.row_count)
+    stop = index.row_count if max_rows is None else min(index.row_count, start_row + max(0, max_rows))
+    offset, skip = index.locate(start_row)
+    handle.seek(offset)
+    if index.header is None:
+        lines = (line for line in handle if line.strip())
+        selected = b"".join(itertools.islice(lines, skip + stop - start_row))
+        df = pd.read_json(io.BytesIO(selected), lines=True) if stop > start_row else pd.DataFrame()
+        df = df.iloc[skip:].reset_index(drop=True)
+    elif stop <= start_row:
+        df = pd.DataFrame(columns=index.header)
+    else:
+        wanted = None if columns is None else set(columns)
+        usecols = None if wanted is None else [name for name in index.header if name in wanted]
+        df = pd.read_csv(handle, header=None, names=index.header, usecols=usecols, nrows=skip + stop - start_row)
+        df = df.iloc[skip:].reset_index(drop=True)
+    if columns is not None:
+        df = df[[name for name in dict.fromkeys(columns) if name in df.columns]]
+    return df
+
+
+class RowIndexCache:
+    """Row indexes per dataset and variant, rebuilt when the file version changes."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._indexes: Dict[Tuple[str, str], Tuple[Hashable, Optional[RowOffsetIndex]]] = {}
+
+    def get(self, dataset_id: str, variant: str, version: Hashable) -> Tuple[bool, Optional[RowOffsetIndex]]:
+        # (found, index); a found None means the file cannot be indexed
+        with self._lock:
+            entry = self._indexes.get((dataset_id, variant))
+        if entry is None or entry[0] != version:
+            return False, None
+        return True, entry[1]
+
+    def put(self, dataset_id: str, variant: str, version: Hashable, index: Optional[RowOffsetIndex]) -> None:
+        with self._lock:
+            self._indexes[(dataset_id, variant)] = (version, index)
+
+    def invalidate(self, dataset_id: str) -> None:
+        with self._lock:
+            for key in [key for key in self._indexes if key[0] == dataset_id]:
+                del self._indexes[key]
@@ -0,0 +1,330 @@
+from __future__ import annotations
+
+from collections import Counter, deque
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+import json
+import logging
+import os
+from pathlib import Path
+import queue
+import select
+import signal
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Deque, Dict, List, Optional, Sequence
+from uuid import uuid4
+
+from app.core.config import get_settings
+from app.services.data_pipeline.metrics import percentiles
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+# What the sandbox preamble provides; warm workers have these loaded already
+PREAMBLE = (
+    "import pandas as pd\n"
+    "import numpy as np\n"
+    "import matplotlib\n"
+    "matplotlib.use('Agg')\n"
+    "import matplotlib.pyplot as plt\n"
+)
+# Time a worker may take beyond the job timeout to load the dataset and answer
+_WORKER_GRACE_SECONDS = 60.0
+# Signals the kernel sends when a resource limit is hit
+_LIMIT_SIGNALS = {"SIGXCPU": "cpu_limit", "SIGXFSZ": "file_size_limit"}
+
+
+@dataclass(frozen=True)
+class SandboxLimits:
+    """Resource limits of one run, applied with ``setrlimit`` in the process running the code;
+    0 leaves a limit unset. ``memory_bytes`` is address space on top of what the process has
+    once the dataset is loaded, ``max_processes`` counts the processes the code starts."""
+
+    cpu_seconds: int = 0
+    memory_bytes: int = 0
+    file_size_bytes: int = 0
+    max_processes: int = 0
+
+
+@dataclass
+class SandboxRun:
+    exit_code: int
+    stdout: str
+    stderr: str
+    timed_out: bool = False
+    # ok | error | timeout | cpu_limit | memory_limit | file_size_limit | killed | load_error | worker_failed
+    exit_reason: str = "ok"
+    wall_seconds: Optional[float] = None
+    # CPU time and peak RSS of the process that ran the code; not measured without warm workers
+    cpu_seconds: Optional[float] = None
+    peak_rss_bytes: Optional[int] = None
+
+
+class SandboxMetrics:
+    """Resource use of recent sandbox runs and how long they waited for a worker, for sizing
+    the pool and its limits."""
+
+    def __init__(self, max_runs: int = 500):
+        self._lock = threading.Lock()
+        self._runs = 0
+        self._reasons: Counter = Counter()
+        self._samples: Deque[Dict[str, Optional[float]]] = deque(maxlen=max_runs)
+
+    def record(self, run: SandboxRun, wait_seconds: float) -> None:
+        with self._lock:
+            self._runs += 1
+            self._reasons[run.exit_reason] += 1
+            self._samples.append(
+                {
+                    "wait_seconds": wait_seconds,
+                    "wall_seconds": run.wall_seconds,
+                    "cpu_seconds": run.cpu_seconds,
+                    "peak_rss_bytes": run.peak_rss_bytes,
+                }
+            )
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = list(self._samples)
+            summary: Dict[str, Any] = {"runs": self._runs, "exit_reasons": dict(self._reasons)}
+        for field in ("wait_seconds", "wall_seconds", "cpu_seconds", "peak_rss_bytes"):
+            summary[field] = percentiles([sample[field] for sample in samples if sample[field] is not None])
+        return summary
+
+    def reset(self) -> None:
+        with self._lock:
+            self._runs = 0
+            self._reasons.clear()
+            self._samples.clear()
+
+
+class SandboxPool:
+    """Warm worker processes that run generated analysis code.
+
+    Each worker has imported pandas, numpy and matplotlib and keeps the dataset of its last
+    job loaded; a job runs in a child forked from the worker with the job timeout and
+    stdout/stderr limits. At most ``size`` jobs run at once, further callers wait for a
+    worker. With ``size`` 0 or without ``os.fork`` every job starts a fresh interpreter.
+    Runs are held to ``limits`` where the platform has ``setrlimit``, and their resource use
+    is recorded in ``metrics``.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        timeout_seconds: float = 30,
+        stdout_limit: int = 4096,
+        stderr_limit: int = 2048,
+        limits: Optional[SandboxLimits] = None,
+    ):
+        self.size = max(0, size) if hasattr(os, "fork") else 0
+        self.timeout_seconds = timeout_seconds
+        self.stdout_limit = stdout_limit
+        self.stderr_limit = stderr_limit
+        self.limits = limits or SandboxLimits()
+        self.metrics = SandboxMetrics()
+        self._lock = threading.Lock()
+        self._idle: "queue.Queue[subprocess.Popen]" = queue.Queue()
+        self._workers: List[subprocess.Popen] = []
+
+    def start(self) -> None:
+        """Start the missing workers; they import the scientific stack in the background."""
+        with self._lock:
+            self._workers = [worker for worker in self._workers if worker.poll() is None]
+            while len(self._workers) < self.size:
+                worker = self._spawn()
+                self._workers.append(worker)
+                self._idle.put(worker)
+
+    def close(self) -> None:
+        with self._lock:
+            workers, self._workers = self._workers, []
+            self._idle = queue.Queue()
+        for worker in workers:
+            _stop(worker)
+
+    def run(
+        self,
+        code: str,
+        workdir: Path,
+        dataset_path: Path,
+        dataset_key: str,
+        output_path: Path,
+        columns: Optional[Sequence[str]] = None,
+    ) -> SandboxRun:
+        """Run ``code`` with ``df`` (the dataset snapshot, only ``columns`` if given) and
+        ``OUTPUT_PATH`` defined, in ``workdir``."""
+        columns = None if columns is None else list(columns)
+        if not self.size:
+            run = self._run_subprocess(code, workdir, dataset_path, output_path, columns)
+            self.metrics.record(run, 0.0)
+            return run
+
+        code_path = workdir / "sandbox_code.py"
+        code_path.write_text(code, encoding="utf-8")
+        job = {
+            "id": uuid4().hex,
+            "code_path": str(code_path),
+            "workdir": str(workdir),
+            "dataset_path": str(dataset_path),
+            "dataset_key": dataset_key,
+            "columns": columns,
+            "output_path": str(output_path),
+            "stdout_path": str(workdir / ".sandbox_stdout"),
+            "stderr_path": str(workdir / ".sandbox_stderr"),
+            "reason_path": str(workdir / ".sandbox_reason"),
+            "timeout": self.timeout_seconds,
+            "stdout_limit": self.stdout_limit,
+            "stderr_limit": self.stderr_limit,
+            "limits": asdict(self.limits),
+        }
+        requested = time.perf_counter()
+        worker = self._acquire()
+        wait_seconds = time.perf_counter() - requested
+        try:
+            run = SandboxRun(**self._exchange(worker, job))
+        except (OSError, ValueError, TimeoutError) as exc:
+            # A worker that died or stopped answering is replaced
+            logger.warning("Sandbox worker %s failed: %s", worker.pid, exc)
+            self._replace(worker)
+            run = SandboxRun(exit_code=-1, stdout="", stderr="Sandbox worker failed.", exit_reason="worker_failed")
+        else:
+            self._idle.put(worker)
+        self.metrics.record(run, wait_seconds)
+        return run
+
+    def _spawn(self) -> subprocess.Popen:
+        return subprocess.Popen(
+            [sys.executable, "-m", "app.services.sandbox_worker"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=str(BACKEND_DIR),
+            text=True,
+            encoding="utf-8",
+        )
+
+    def _acquire(self) -> subprocess.Popen:
+        if len(self._workers) < self.size:
+            self.start()
+        while True:
+            worker = self._idle.get()
+            if worker.poll() is None:
+                return worker
+            self._replace(worker)
+
+    def _replace(self, worker: subprocess.Popen) -> None:
+        _stop(worker)
+        with self._lock:
+            if worker not in self._workers:
+                return
+            self._workers.remove(worker)
+            replacement = self._spawn()
+            self._workers.append(replacement)
+        self._idle.put(replacement)
+
+    def _exchange(self, worker: subprocess.Popen, job: dict) -> dict:
+        worker.stdin.write(json.dumps(job) + "\n")
+        worker.stdin.flush()
+        deadline = time.monotonic() + self.timeout_seconds + _WORKER_GRACE_SECONDS
+        ready, _, _ = select.select([worker.stdout], [], [], max(0.0, deadline - time.monotonic()))
+        if not ready:
+            raise TimeoutError("no answer from sandbox worker")
+        line = worker.stdout.readline()
+        if not line:
+            raise OSError("sandbox worker exited")
+        result = json.loads(line)
+        if not isinstance(result, dict) or result.pop("id", None) != job["id"]:
+            raise ValueError("sandbox worker answered another job")
+        return result
+
+    def _run_subprocess(
+        self, code: str, workdir: Path, dataset_path: Path, output_path: Path, columns: Optional[List[str]]
+    ) -> SandboxRun:
+        # A fresh interpreter per job, importing and loading everything itself; limits are
+        # applied once the dataset is loaded, as in a warm worker's child
+        limits = ""
+        if os.name == "posix":
+            limits = (
+                f"import sys\nsys.path.insert(0, {str(BACKEND_DIR)!r})\n"
+                "from app.services.sandbox_worker import apply_limits\n"
+                f"apply_limits({asdict(self.limits)!r})\n"
+            )
+        code_path = workdir / "sandbox_code.py"
+        code_path.write_text(
+            PREAMBLE
+            + "import pyarrow.feather\n"
+            + f"df = pyarrow.feather.read_table({str(dataset_path)!r}, columns={columns!r}, memory_map=True).to_pandas()\n"
+            + f"OUTPUT_PATH = {str(output_path)!r}\n"
+            + limits
+            + "\n"
+            + code,
+            encoding="utf-8",
+        )
+        started = time.perf_counter()
+        try:
+            proc = subprocess.run(
+                [sys.executable, str(code_path)],
+                capture_output=True,
+                text=True,
+                timeout=self.timeout_seconds,
+                cwd=str(workdir),
+            )
+        except subprocess.TimeoutExpired:
+            return SandboxRun(
+                exit_code=-1,
+                stdout="",
+                stderr="",
+                timed_out=True,
+                exit_reason="timeout",
+                wall_seconds=time.perf_counter() - started,
+            )
+        return SandboxRun(
+            exit_code=proc.returncode,
+            stdout=proc.stdout[: self.stdout_limit],
+            stderr=proc.stderr[: self.stderr_limit],
+            exit_reason=_exit_reason(proc.returncode, proc.stderr),
+            wall_seconds=time.perf_counter() - started,
+        )
+
+
+def _exit_reason(returncode: int, stderr: str) -> str:
+    if returncode < 0:
+        try:
+            return _LIMIT_SIGNALS.get(signal.Signals(-returncode).name, "killed")
+        except ValueError:
+            return "killed"
+    if returncode and stderr.rstrip().endswith("MemoryError"):
+        return "memory_limit"
+    return "ok" if returncode == 0 else "error"
+
+
+def _stop(worker: subprocess.Popen) -> None:
+    # Workers hold no state worth a graceful shutdown, and may still be importing
+    worker.kill()
+    worker.wait()
+    for stream in (worker.stdin, worker.stdout):
+        try:
+            stream.close()
+        except OSError:
+            pass
+
+
+@lru_cache()
+def get_sandbox_pool() -> SandboxPool:
+    settings = get_settings()
+    return SandboxPool(
+        settings.sandbox_pool_size,
+        timeout_seconds=settings.sandbox_timeout_seconds,
+        stdout_limit=settings.sandbox_stdout_limit,
+        stderr_limit=settings.sandbox_stderr_limit,
+        limits=SandboxLimits(
+            cpu_seconds=settings.sandbox_cpu_seconds,
+            memory_bytes=settings.sandbox_memory_limit_bytes,
+            file_size_bytes=settings.sandbox_max_file_bytes,
+            max_processes=settings.sandbox_max_processes,
+        ),
+    )
@@ -0,0 +1,260 @@
+"""Warm sandbox worker, started by ``SandboxPool`` as ``python -m app.services.sandbox_worker``.
+
+The worker imports the scientific stack once and keeps the last dataset it loaded, then
+reads jobs as JSON lines on stdin and answers each with one JSON line. Every job runs in a
+child forked from the worker, so generated code starts with everything already imported
+and loaded but cannot change the worker's state.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import resource
+import select
+import signal
+import sys
+import time
+import traceback
+from typing import Any, Dict, Optional, Tuple
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from app.services.dataset_snapshots import read_snapshot  # noqa: E402
+
+_POLL_SECONDS = 0.005
+_MEMORY_ERROR_MARKER = "memory_limit"
+# Signals the kernel sends when a resource limit is hit
+_LIMIT_SIGNALS = {signal.SIGXCPU: "cpu_limit", signal.SIGXFSZ: "file_size_limit"}
+
+
+def _load_dataset(job: Dict[str, Any], cache: Dict[str, Any]) -> pd.DataFrame:
+    # One frame is kept, keyed by the dataset version the caller passes and the columns read
+    key = (job["dataset_key"], job.get("columns"))
+    if cache.get("key") != key:
+        cache.clear()
+        cache["df"] = read_snapshot(job["dataset_path"], job.get("columns"))
+        cache["key"] = key
+    return cache["df"]
+
+
+def _redirect(fd: int, path: str, flags: int) -> None:
+    target = os.open(path, flags, 0o600)
+    os.dup2(target, fd)
+    os.close(target)
+
+
+def _virtual_memory_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/statm") as handle:
+            return int(handle.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def _user_process_count() -> Optional[int]:
+    uid = os.getuid()
+    try:
+        entries = [entry for entry in os.listdir("/proc") if entry.isdigit()]
+    except OSError:
+        return None
+    count = 0
+    for entry in entries:
+        try:
+            count += os.stat(f"/proc/{entry}").st_uid == uid
+        except OSError:
+            pass
+    return count
+
+
+def _set_limit(kind: int, soft: int, hard: Optional[int] = None) -> None:
+    # Never above the current hard limit, which an unprivileged process cannot raise
+    _, current_hard = resource.getrlimit(kind)
+    hard = soft if hard is None else hard
+    if current_hard != resource.RLIM_INFINITY:
+        soft, hard = min(soft, current_hard), min(hard, current_hard)
+    try:
+        resource.setrlimit(kind, (soft, hard))
+    except (ValueError, OSError):
+        pass
+
+
+def apply_limits(limits: Dict[str, int]) -> None:
+    """Apply the job's resource limits to the current process; 0 leaves a limit unset.
+
+    The kernel counts CPU time and address space for the whole process, which has already
+    imported the libraries and loaded the dataset, so both limits are set on top of what it
+    uses now. The process limit counts all processes of the user, so it is set above the
+    current count.
+    """
+    if limits.get("cpu_seconds"):
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        soft = math.ceil(usage.ru_utime + usage.ru_stime) + limits["cpu_seconds"]
+        # SIGXCPU at the soft limit, SIGKILL a second later
+        _set_limit(resource.RLIMIT_CPU, soft, soft + 1)
+    if limits.get("memory_bytes"):
+        baseline = _virtual_memory_bytes() or 0
+        _set_limit(resource.RLIMIT_AS, baseline + limits["memory_bytes"])
+    if limits.get("file_size_bytes"):
+        # Python ignores SIGXFSZ; restore it so an oversized write ends the process
+        signal.signal(signal.SIGXFSZ, signal.SIG_DFL)
+        _set_limit(resource.RLIMIT_FSIZE, limits["file_size_bytes"])
+    if limits.get("max_processes") and hasattr(resource, "RLIMIT_NPROC"):
+        running = _user_process_count()
+        if running is not None:
+            _set_limit(resource.RLIMIT_NPROC, running + limits["max_processes"])
+
+
+def _run_child(job: Dict[str, Any], df: pd.DataFrame) -> None:
+    # Runs in the forked child and never returns
+    exit_code = 1
+    try:
+        # Own process group, so a timeout also kills anything the code started
+        os.setsid()
+        _redirect(0, os.devnull, os.O_RDONLY)
+        _redirect(1, job["stdout_path"], os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+        _redirect(2, job["stderr_path"], os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+        # Everything else is the worker's, including its result channel; code must not reach it
+        os.closerange(3, os.sysconf("SC_OPEN_MAX"))
+        os.chdir(job["workdir"])
+        apply_limits(job.get("limits") or {})
+        namespace = {
+            "__name__": "__main__",
+            "pd": pd,
+            "np": np,
+            "matplotlib": matplotlib,
+            "plt": plt,
+            "df": df,
+            "OUTPUT_PATH": job["output_path"],
+        }
+        with open(job["code_path"], encoding="utf-8") as handle:
+            code = compile(handle.read(), job["code_path"], "exec")
+        try:
+            exec(code, namespace)
+            exit_code = 0
+        except SystemExit as exc:
+            # Same exit codes as running the script with the interpreter
+            if exc.code is None or isinstance(exc.code, int):
+                exit_code = exc.code or 0
+            else:
+                print(exc.code, file=sys.stderr)
+        except MemoryError:
+            traceback.print_exc()
+            # Tell the worker the memory limit was hit, the exit code alone cannot
+            with open(job["reason_path"], "w", encoding="utf-8") as handle:
+                handle.write(_MEMORY_ERROR_MARKER)
+        except BaseException:
+            traceback.print_exc()
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(exit_code)
+
+
+def _wait(pid: int, timeout: float) -> Tuple[int, Any, bool]:
+    # (wait status, resource usage, timed out); the child's process group is killed on timeout
+    deadline = time.monotonic() + timeout
+    pidfd = os.pidfd_open(pid) if hasattr(os, "pidfd_open") else None
+    try:
+        while True:
+            waited, status, usage = os.wait4(pid, os.WNOHANG)
+            if waited:
+                return status, usage, False
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if pidfd is not None:
+                select.select([pidfd], [], [], remaining)
+            else:
+                time.sleep(min(_POLL_SECONDS, remaining))
+    finally:
+        if pidfd is not None:
+            os.close(pidfd)
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    _, status, usage = os.wait4(pid, 0)
+    return status, usage, True
+
+
+def _exit_reason(status: int, timed_out: bool, reason_path: str) -> str:
+    if timed_out:
+        return "timeout"
+    if os.WIFSIGNALED(status):
+        return _LIMIT_SIGNALS.get(os.WTERMSIG(status), "killed")
+    if os.path.exists(reason_path):
+        return _MEMORY_ERROR_MARKER
+    return "ok" if os.WEXITSTATUS(status) == 0 else "error"
+
+
+def _read_limited(path: str, limit: int) -> str:
+    try:
+        with open(path, "rb") as handle:
+            return handle.read(limit).decode("utf-8", errors="replace")
+    except FileNotFoundError:
+        return ""
+
+
+def run_job(job: Dict[str, Any], cache: Dict[str, Any]) -> Dict[str, Any]:
+    # Answers carry the job id, so the pool can tell them from anything else on the channel
+    return {"id": job.get("id"), **_run(job, cache)}
+
+
+def _run(job: Dict[str, Any], cache: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        df = _load_dataset(job, cache)
+    except Exception:
+        return {
+            "exit_code": 1,
+            "stdout": "",
+            "stderr": traceback.format_exc()[-job["stderr_limit"]:],
+            "timed_out": False,
+            "exit_reason": "load_error",
+        }
+
+    # A marker left by an earlier job in the same directory would misreport this one
+    if os.path.exists(job["reason_path"]):
+        os.remove(job["reason_path"])
+    sys.stdout.flush()
+    sys.stderr.flush()
+    started = time.perf_counter()
+    pid = os.fork()
+    if pid == 0:
+        _run_child(job, df)
+    status, usage, timed_out = _wait(pid, job["timeout"])
+    return {
+        "exit_code": -1 if timed_out else os.waitstatus_to_exitcode(status),
+        "stdout": _read_limited(job["stdout_path"], job["stdout_limit"]),
+        "stderr": _read_limited(job["stderr_path"], job["stderr_limit"]),
+        "timed_out": timed_out,
+        "exit_reason": _exit_reason(status, timed_out, job["reason_path"]),
+        "wall_seconds": time.perf_counter() - started,
+        "cpu_seconds": usage.ru_utime + usage.ru_stime,
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_bytes": usage.ru_maxrss * 1024,
+    }
+
+
+def main() -> None:
+    # Results go to a private copy of stdout; anything else printed to fd 1 is discarded
+    channel = os.fdopen(os.dup(1), "w", encoding="utf-8")
+    _redirect(1, os.devnull, os.O_WRONLY)
+    cache: Dict[str, Any] = {}
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        channel.write(json.dumps(run_job(json.loads(line), cache)) + "\n")
+        channel.flush()
+
+
+if __name__ == "__main__":
+    main()
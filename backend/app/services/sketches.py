@@ -0,0 +1,287 @@
+"""Mergeable streaming sketches for approximate dataset profiling.
+
+Every sketch can be updated chunk by chunk and merged with another sketch of the
+same configuration, so profiles can be built while a large file is streamed in.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import math
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    # Exact bit length of uint64 values: frexp is exact on each 32-bit half.
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    _, high_exp = np.frexp(high)
+    _, low_exp = np.frexp(low)
+    return np.where(high > 0, 32 + high_exp, low_exp)
+
+
+def hash_values(series: pd.Series) -> np.ndarray:
+    # 64-bit hashes of the non-missing values of a column.
+    return pd.util.hash_pandas_object(series.dropna(), index=False).to_numpy(dtype=np.uint64)
+
+
+class HyperLogLog:
+    """Distinct-count sketch with 2**precision registers (relative std error 1.04 / sqrt(2**precision))."""
+
+    def __init__(self, precision: int = 14):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def update_hashes(self, hashes: np.ndarray) -> None:
+        if not len(hashes):
+            return
+        tail_bits = 64 - self.precision
+        index = (hashes >> np.uint64(tail_bits)).astype(np.int64)
+        tail = hashes & np.uint64((1 << tail_bits) - 1)
+        rank = (tail_bits - _bit_length(tail) + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, rank)
+
+    def update(self, series: pd.Series) -> None:
+        self.update_hashes(hash_values(series))
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision.")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / float(np.sum(np.ldexp(1.0, -self.registers.astype(np.int64))))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            return int(round(m * math.log(m / zeros)))
+        return int(round(raw))
+
+
+class QuantileSketch:
+    """KLL-style quantile sketch: levels of sorted samples, each item at level ``h`` weighs ``2**h``.
+
+    Level capacities shrink geometrically below the top level; an over-full level keeps every
+    other item (random offset) and promotes it. The normalized rank error is about 1.7 / k.
+    """
+
+    def __init__(self, k: int = 256, seed: int = 0):
+        self.k = k
+        self.count = 0
+        self.levels: List[np.ndarray] = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def rank_error(self) -> float:
+        return 1.7 / self.k
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2.0 / 3.0) ** depth)))
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other: "QuantileSketch") -> None:
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype=np.float64))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self._compress()
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) <= self._capacity(level):
+                level += 1
+                continue
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0, dtype=np.float64))
+            items = np.sort(items)
+            # An odd item stays behind so the promoted half carries exactly double weight
+            leftover = items[:1] if len(items) % 2 else items[:0]
+            paired = items[len(leftover):]
+            promoted = paired[int(self._rng.integers(2))::2]
+            self.levels[level] = leftover
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            # Growing the top level shrinks lower capacities, so re-check from the bottom
+            level = 0
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(values), 1 << level, dtype=np.int64) for level, values in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        cumulative = np.cumsum(weights[order])
+        target = q * cumulative[-1]
+        position = int(np.searchsorted(cumulative, target, side="left"))
+        return float(items[order][min(position, len(items) - 1)])
+
+
+class HeavyHitters:
+    """Misra-Gries frequent-items summary with at most ``capacity`` counters.
+
+    Reported counts are lower bounds; each is at most ``error`` below the true count.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self.capacity = capacity
+        self.counters = pd.Series(dtype="int64")
+        self.total = 0
+        self.error = 0
+
+    def update_counts(self, counts: pd.Series) -> None:
+        self.total += int(counts.sum())
+        self._combine(counts.astype("int64"))
+
+    def update(self, series: pd.Series) -> None:
+        counts = series.value_counts(dropna=False, sort=False)
+        # Categorical series also count their unused categories, with zero
+        self.update_counts(counts[counts > 0])
+
+    def merge(self, other: "HeavyHitters") -> None:
+        self.total += other.total
+        self.error += other.error
+        self._combine(other.counters)
+
+    def _combine(self, counts: pd.Series) -> None:
+        if self.counters.empty:
+            combined = counts
+        else:
+            combined = pd.concat([self.counters, counts]).groupby(level=0, sort=False, observed=True).sum()
+        if len(combined) > self.capacity:
+            # Subtract the (capacity + 1)-th largest count from every counter (mergeable Misra-Gries)
+            threshold = int(combined.nlargest(self.capacity + 1).iloc[-1])
+            self.error += threshold
+            combined = combined[combined > threshold] - threshold
+        self.counters = combined
+
+    def top(self, limit: int) -> List[Tuple[Any, int]]:
+        ordered = sorted(self.counters.items(), key=lambda item: (-item[1], str(item[0])))
+        return [(value, int(count)) for value, count in ordered[:limit]]
+
+
+@dataclass
+class Moments:
+    """Exact count, min, max, mean and variance, merged with Chan's parallel update."""
+
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    minimum: float = math.inf
+    maximum: float = -math.inf
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        chunk = Moments(
+            count=len(values),
+            mean=float(values.mean()),
+            m2=float(((values - values.mean()) ** 2).sum()),
+            minimum=float(values.min()),
+            maximum=float(values.max()),
+        )
+        self.merge(chunk)
+
+    def merge(self, other: "Moments") -> None:
+        if not other.count:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.mean += delta * other.count / total
+        self.count = total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+
+@dataclass
+class ColumnSketch:
+    """All sketches kept for one column while it is streamed."""
+
+    name: str
+    dtype: str
+    semantic_type: str
+    rows: int = 0
+    null_count: int = 0
+    distinct: HyperLogLog = field(default_factory=HyperLogLog)
+    quantiles: Optional[QuantileSketch] = None
+    moments: Optional[Moments] = None
+    heavy_hitters: Optional[HeavyHitters] = None
+
+    def __post_init__(self) -> None:
+        if self.semantic_type == "numeric":
+            self.quantiles = self.quantiles or QuantileSketch()
+            self.moments = self.moments or Moments()
+        elif self.semantic_type in {"categorical", "text", "boolean"}:
+            self.heavy_hitters = self.heavy_hitters or HeavyHitters()
+
+    def update(self, series: pd.Series) -> None:
+        self.rows += len(series)
+        self.null_count += int(series.isna().sum())
+        self.distinct.update(series)
+        if self.quantiles is not None and self.moments is not None:
+            values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+            self.quantiles.update(values)
+            self.moments.update(values)
+        if self.heavy_hitters is not None:
+            # Same labels as the exact top categories
+            self.heavy_hitters.update(series.astype(str).fillna("<NA>"))
+
+    def merge(self, other: "ColumnSketch") -> None:
+        self.rows += other.rows
+        self.null_count += other.null_count
+        self.distinct.merge(other.distinct)
+        if self.quantiles is not None and other.quantiles is not None:
+            self.quantiles.merge(other.quantiles)
+        if self.moments is not None and other.moments is not None:
+            self.moments.merge(other.moments)
+        if self.heavy_hitters is not None and other.heavy_hitters is not None:
+            self.heavy_hitters.merge(other.heavy_hitters)
+
+
+class FrameSketch:
+    """Column sketches for a whole frame; fed chunk by chunk and mergeable across chunks or workers."""
+
+    def __init__(self, columns: List[ColumnSketch]):
+        self.columns = columns
+
+    @property
+    def rows(self) -> int:
+        return self.columns[0].rows if self.columns else 0
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        if chunk.shape[1] != len(self.columns):
+            raise ValueError("Chunk columns do not match the sketch.")
+        for position, column in enumerate(self.columns):
+            column.update(chunk.iloc[:, position])
+
+    def merge(self, other: "FrameSketch") -> None:
+        if [column.name for column in other.columns] != [column.name for column in self.columns]:
+            raise ValueError("Cannot merge sketches of frames with different columns.")
+        for column, other_column in zip(self.columns, other.columns):
+            column.merge(other_column)
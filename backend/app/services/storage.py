@@ -1,5 +1,7 @@
+import hashlib
 from pathlib import Path
-from typing import BinaryIO
+import shutil
+from typing import BinaryIO, List, Tuple
 
 
 class StorageService:
@@ -14,6 +16,15 @@ class StorageService:
 
     def save(self, key: str, stream: BinaryIO) -> int:
         """Save incoming file stream to `base_dir/key`. Returns number of bytes written."""
+        total, _ = self._write(key, stream, None)
+        return total
+
+    def save_with_digest(self, key: str, stream: BinaryIO) -> Tuple[int, str]:
+        """Save like `save`, hashing the bytes while writing. Returns (bytes written, sha256 hex)."""
+        total, digest = self._write(key, stream, hashlib.sha256())
+        return total, digest
+
+    def _write(self, key: str, stream: BinaryIO, hasher) -> Tuple[int, str]:
         path = self._path_for_key(key)
         path.parent.mkdir(parents=True, exist_ok=True)
         total = 0
@@ -24,8 +35,10 @@ class StorageService:
                 if not chunk:
                     break
                 dest.write(chunk)
+                if hasher is not None:
+                    hasher.update(chunk)
                 total += len(chunk)
-        return total
+        return total, hasher.hexdigest() if hasher is not None else ""
 
     def delete(self, key: str) -> None:
         """Delete the stored file if it exists."""
@@ -37,7 +50,48 @@ class StorageService:
             # keep simple for MVP; callers can handle logging
             pass
 
+    def local_path(self, key: str) -> Path:
+        """Filesystem path of a stored key, for readers that memory-map files."""
+        return self._path_for_key(key)
+
     def open(self, key: str):
         """Open the stored file for reading (binary)."""
         path = self._path_for_key(key)
         return open(path, "rb")
+
+    def open_write(self, key: str):
+        """Open the stored file for writing (binary), creating parent directories."""
+        path = self._path_for_key(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return open(path, "wb")
+
+    def exists(self, key: str) -> bool:
+        return self._path_for_key(key).is_file()
+
+    def size(self, key: str) -> int:
+        return self._path_for_key(key).stat().st_size
+
+    def version(self, key: str) -> Tuple[int, int]:
+        """Return (mtime_ns, size) of the stored file; changes whenever the file is rewritten."""
+        stat = self._path_for_key(key).stat()
+        return stat.st_mtime_ns, stat.st_size
+
+    def copy(self, src_key: str, dst_key: str) -> int:
+        """Copy a stored file to another key. Returns the number of bytes copied."""
+        dst = self._path_for_key(dst_key)
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(self._path_for_key(src_key), dst)
+        return dst.stat().st_size
+
+    def glob(self, pattern: str) -> List[str]:
+        """Return stored keys matching a glob pattern relative to `base_dir`."""
+        return sorted(
+            path.relative_to(self.base_dir).as_posix()
+            for path in self.base_dir.glob(pattern)
+            if path.is_file()
+        )
+
+    def delete_prefix(self, prefix: str) -> None:
+        """Delete a whole directory of stored files."""
+        path = self._path_for_key(prefix)
+        shutil.rmtree(path, ignore_errors=True)
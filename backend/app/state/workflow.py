@@ -57,6 +57,8 @@ class WorkflowState(BaseModel):
     spec_revision_context: list[str] = Field(default_factory=list)
     artifacts_metadata: dict[str, Any] = Field(default_factory=dict)
     free_code_spec: FreeCodeSpec | None = None
+    # Cache key the spec was answered under, so a rejected spec can be evicted
+    free_code_cache_key: str | None = None
     sandbox_result: SandboxResult | None = None
     code_review_result: CodeReviewResult | None = None
     sandbox_attempts: int = 0
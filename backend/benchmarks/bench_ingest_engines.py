@@ -0,0 +1,73 @@
+"""Compare the CSV ingestion engines on generated files.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_ingest_engines --rows 500000 --repeat 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from app.services.data_pipeline.pipeline_services import ingest
+from app.services.storage import StorageService
+
+
+def _generate_csv(path: Path, rows: int, bad_rows: int, seed: int = 7) -> None:
+    # Write a mixed-type CSV; optionally append rows with an extra field.
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "id": np.arange(rows),
+            "amount": rng.normal(100, 25, rows).round(2),
+            "city": rng.choice(["Berlin", "Munich", "Hamburg", "Köln", "n/a"], rows),
+            "created": pd.date_range("2020-01-01", periods=rows, freq="min").strftime("%Y-%m-%d %H:%M:%S"),
+            "comment": rng.choice(["ok", "late delivery", "", "refund, partial"], rows),
+        }
+    )
+    df.to_csv(path, index=False)
+    if bad_rows:
+        with open(path, "a", encoding="utf-8") as handle:
+            for index in range(bad_rows):
+                handle.write(f"{rows + index},1.0,Berlin,2020-01-01 00:00:00,ok,extra\n")
+
+
+def _time_engine(storage: StorageService, key: str, engine: str, repeat: int) -> tuple[float, str]:
+    timings = []
+    used = engine
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = ingest.run({"storage_key": key, "storage": storage, "ingest_engine": engine})
+        timings.append(time.perf_counter() - start)
+        used = result["ingestion"]["engine"]
+    return min(timings), used
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        storage = StorageService(Path(tmpdir))
+        for label, bad_rows in (("clean", 0), ("malformed", 10)):
+            key = f"bench/{label}.csv"
+            path = Path(tmpdir) / key
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _generate_csv(path, args.rows, bad_rows)
+            size_mb = path.stat().st_size / (1024 * 1024)
+            print(f"{label}: {args.rows} rows, {size_mb:.1f} MB")
+            for engine in ingest.INGEST_ENGINES:
+                best, used = _time_engine(storage, key, engine, args.repeat)
+                print(f"  {engine:<8} best={best:.3f}s (parsed with {used})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Preview page latency by offset, re-parsing from the file start versus seeking via the row index.
+
+    python -m benchmarks.bench_preview_pages --rows 1000000 --limit 100
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.core.config import get_settings
+from app.services.row_index import build_row_index, read_indexed_rows
+
+
+def _write_csv(path: Path, rows: int, seed: int = 3) -> None:
+    rng = np.random.default_rng(seed)
+    pd.DataFrame(
+        {
+            "id": np.arange(rows),
+            "amount": np.round(rng.normal(100, 25, rows), 2),
+            "city": rng.choice(["Berlin", "Munich", "Hamburg", "Cologne"], rows),
+            "note": rng.choice(["ok", "late", "", "damaged, \"returned\""], rows),
+        }
+    ).to_csv(path, index=False)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "data.csv"
+        _write_csv(path, args.rows)
+        with open(path, "rb") as handle:
+            start = time.perf_counter()
+            index = build_row_index(handle, get_settings().row_index_stride, csv=True)
+            print(f"{args.rows} rows, {path.stat().st_size / 1e6:.0f} MB; index built in "
+                  f"{time.perf_counter() - start:.2f}s ({len(index.offsets)} offsets)")
+
+            for offset in (0, args.rows // 2, int(args.rows * 0.9)):
+                start = time.perf_counter()
+                handle.seek(0)
+                reparsed = pd.read_csv(handle, skiprows=range(1, offset + 1), nrows=args.limit)
+                reparse_time = time.perf_counter() - start
+                start = time.perf_counter()
+                seeked = read_indexed_rows(handle, index, offset, args.limit)
+                seek_time = time.perf_counter() - start
+                same = reparsed.equals(seeked)
+                print(f"offset {offset:>9}: re-parse {reparse_time * 1000:8.1f}ms  "
+                      f"row index {seek_time * 1000:6.1f}ms  same rows: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Sandbox latency p50/p95, a fresh interpreter per run versus the warm worker pool.
+
+    python -m benchmarks.bench_sandbox --runs 30 --rows 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import tempfile
+import time
+from typing import Callable, List
+
+import numpy as np
+import pandas as pd
+
+from app.services.dataset_snapshots import SnapshotStore
+from app.services.sandbox_pool import SandboxPool
+from app.services.storage import StorageService
+
+_CODE = (
+    "summary = df.groupby('city')['amount'].agg(['mean', 'count'])\n"
+    "summary['mean'].plot.bar()\n"
+    "plt.savefig(OUTPUT_PATH)\n"
+    "print(summary.round(2).to_string())\n"
+)
+
+
+def _latencies(run: Callable[[], None], runs: int) -> List[float]:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _report(name: str, timings: List[float]) -> None:
+    p50, p95 = np.percentile(np.asarray(timings) * 1000, [50, 95])
+    print(f"{name:>16}: p50 {p50:8.1f}ms  p95 {p95:8.1f}ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        frame = pd.DataFrame(
+            {"amount": rng.normal(100, 25, args.rows), "city": rng.choice(["Berlin", "Munich", "Hamburg"], args.rows)}
+        )
+        dataset = SnapshotStore(StorageService(workdir)).path("bench", "v1", lambda: frame)
+        output = workdir / "chart.png"
+
+        def runner(pool: SandboxPool) -> Callable[[], None]:
+            def run() -> None:
+                result = pool.run(_CODE, workdir, dataset, "bench", output)
+                assert result.exit_code == 0, result.stderr
+
+            return run
+
+        _report("cold interpreter", _latencies(runner(SandboxPool(0)), args.runs))
+
+        pool = SandboxPool(args.workers)
+        pool.start()
+        # Wait until every worker has imported the stack and loaded the dataset
+        for _ in range(args.workers):
+            runner(pool)()
+        try:
+            _report("warm pool", _latencies(runner(pool), args.runs))
+        finally:
+            pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Sandbox dataset load on a wide table, every column versus the columns the code reads.
+
+    python -m benchmarks.bench_sandbox_columns --rows 200000 --columns 200
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.services.code_columns import required_columns
+from app.services.dataset_snapshots import SnapshotStore, read_snapshot, snapshot_columns
+from app.services.storage import StorageService
+
+_CODE = (
+    "summary = df[df['num_1'] > 0].groupby('text_0')['num_0'].mean()\n"
+    "summary.plot.bar()\n"
+    "plt.savefig(OUTPUT_PATH)\n"
+)
+
+
+def _wide_frame(rows: int, columns: int, seed: int = 1) -> pd.DataFrame:
+    # Half numeric, half short text columns
+    rng = np.random.default_rng(seed)
+    labels = np.array([f"label-{i}" for i in range(50)], dtype=object)
+    data = {}
+    for idx in range(columns // 2):
+        data[f"num_{idx}"] = rng.normal(size=rows)
+        data[f"text_{idx}"] = labels[rng.integers(0, len(labels), rows)]
+    return pd.DataFrame(data)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--columns", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = SnapshotStore(StorageService(Path(tmp))).path(
+            "bench", "v1", lambda: _wide_frame(args.rows, args.columns)
+        )
+
+        start = time.perf_counter()
+        columns = required_columns(_CODE, snapshot_columns(path))
+        analysis_time = time.perf_counter() - start
+        print(f"{args.rows} rows x {args.columns} columns; code reads {columns} "
+              f"(analysis {analysis_time * 1000:.1f}ms)")
+
+        for name, selected in (("all columns", None), ("pruned", columns)):
+            start = time.perf_counter()
+            df = read_snapshot(path, selected)
+            elapsed = time.perf_counter() - start
+            memory = df.memory_usage(deep=True).sum() / 1e6
+            print(f"{name:>12}: load {elapsed * 1000:8.1f}ms  frame {memory:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
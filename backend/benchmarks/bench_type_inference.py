@@ -0,0 +1,71 @@
+"""Per-column cost of type inference on a wide file, full versus sampled.
+
+    python -m benchmarks.bench_type_inference --rows 200000 --columns 40
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.services.data_pipeline.models import EncodedFrame
+from app.services.data_pipeline.pipeline_services.type_inference import _infer_type
+
+
+def _generate_frame(rows: int, columns: int, seed: int = 11) -> pd.DataFrame:
+    # Text columns as read from CSV: numbers, dates, ids, categories and mostly-numeric columns.
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("1990-01-01", periods=20_000).strftime("%d.%m.%Y").to_numpy()
+    categories = np.array(["red", "green", "blue", "yellow"], dtype=object)
+    data = {}
+    for idx in range(columns):
+        kind = idx % 5
+        if kind == 0:
+            data[f"amount{idx}"] = np.round(rng.normal(100, 30, rows), 2).astype(str)
+        elif kind == 1:
+            data[f"date{idx}"] = dates[rng.integers(0, len(dates), rows)]
+        elif kind == 2:
+            data[f"id{idx}"] = np.char.add("ID-", rng.integers(0, rows, rows).astype(str))
+        elif kind == 3:
+            data[f"category{idx}"] = categories[rng.integers(0, len(categories), rows)]
+        else:
+            values = rng.integers(0, 10**6, rows).astype(str).astype(object)
+            values[rng.random(rows) < 0.28] = "n/a"
+            data[f"mixed{idx}"] = values
+    return pd.DataFrame(data)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--columns", type=int, default=40)
+    args = parser.parse_args()
+
+    encoded = EncodedFrame.from_frame(_generate_frame(args.rows, args.columns))
+    print(f"{args.rows} rows x {args.columns} columns")
+    print(f"{'column':<14}{'distinct':>10}{'full ms':>10}{'sampled ms':>12}{'escalated':>11}{'same type':>11}")
+
+    totals = {"full": 0.0, "sampled": 0.0}
+    for name, column in zip(encoded.column_names, encoded.columns):
+        start = time.perf_counter()
+        full = _infer_type(column, sample=False)
+        full_time = time.perf_counter() - start
+        start = time.perf_counter()
+        sampled = _infer_type(column)
+        sampled_time = time.perf_counter() - start
+        totals["full"] += full_time
+        totals["sampled"] += sampled_time
+        print(
+            f"{str(name):<14}{column.distinct_count:>10}{full_time * 1000:>10.1f}{sampled_time * 1000:>12.1f}"
+            f"{str(sampled['escalated']):>11}{str(full['inferred_type'] == sampled['inferred_type']):>11}"
+        )
+
+    print(f"total full: {totals['full']:.2f}s  sampled: {totals['sampled']:.2f}s  "
+          f"speedup: {totals['full'] / max(totals['sampled'], 1e-9):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
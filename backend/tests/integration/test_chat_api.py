@@ -1,7 +1,6 @@
 import pytest
 from fastapi.testclient import TestClient
 
-from app.core.config import get_settings
 from app.main import app
 from app.schemas.agent import ClarificationRequest, DatasetProfile, IntentResult, OutputMode
 from app.services.analysis_agent import AnalysisAgentService
@@ -29,7 +28,7 @@ def test_db():
 
 
 @pytest.fixture
-def chat_service(test_db):
+def chat_service(test_db, tmp_path):
     """Create a ChatService with test database."""
     class FakeDatasetService:
         def get(self, dataset_id: str):
@@ -39,7 +38,10 @@ def chat_service(test_db):
             import pandas as pd
             return pd.DataFrame({"col1": [1, 2, 3], "col2": [4, 5, 6]})
 
-    service = ChatService(dataset_service=FakeDatasetService())
+        def get_profile(self, dataset_id: str, profiler):
+            return profiler.profile(dataset_id, self._load_dataframe(self.get(dataset_id)))
+
+    service = ChatService(dataset_service=FakeDatasetService(), storage_dir=tmp_path)
     service.engine = test_db
     # Tables are already created in test_db fixture
     return service
@@ -57,7 +59,7 @@ def client(chat_service):
 
 
 @pytest.fixture
-def client_forced_clarification(test_db):
+def client_forced_clarification(test_db, tmp_path):
     """TestClient that always drives the graph into clarification interrupt."""
 
     class FakeDatasetService:
@@ -69,6 +71,9 @@ def client_forced_clarification(test_db):
 
             return pd.DataFrame({"col1": [1, 2, 3], "col2": [4, 5, 6]})
 
+        def get_profile(self, dataset_id: str, profiler):
+            return profiler.profile(dataset_id, self._load_dataframe(self.get(dataset_id)))
+
     class ForcedClarificationLLM:
         def interpret_request(self, question: str, history_text: str, profile: DatasetProfile) -> IntentResult:
             return IntentResult(
@@ -101,11 +106,11 @@ def client_forced_clarification(test_db):
         def review_chart(self, *args, **kwargs):
             raise AssertionError("review_chart should not run before clarification")
 
-    service = ChatService(dataset_service=FakeDatasetService())
+    service = ChatService(dataset_service=FakeDatasetService(), storage_dir=tmp_path)
     service.engine = test_db
     service.analysis_agent = AnalysisAgentService(
         dataset_service=service.dataset_service,
-        storage_dir=get_settings().storage_dir,
+        storage_dir=tmp_path,
         llm_service=ForcedClarificationLLM(),
     )
 
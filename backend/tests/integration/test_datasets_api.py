@@ -1,3 +1,5 @@
+import time
+
 import pytest
 from fastapi.testclient import TestClient
 
@@ -23,6 +25,15 @@ def client(tmp_path):
     app.dependency_overrides.clear()
 
 
+def _wait_for_pipeline(client, dataset_id, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        status = client.get(f"/api/v1/datasets/{dataset_id}/pipeline-status").json()
+        if status["status"] in {"completed", "failed"} or time.monotonic() > deadline:
+            return status
+        time.sleep(0.05)
+
+
 def test_upload_csv_and_delete(client, tmp_path):
     data = "a,b\n1,2\n"
     files = {"file": ("data.csv", data, "text/csv")}
@@ -98,6 +109,8 @@ def test_quality_report_endpoint(client):
     assert resp.status_code == 201
     d = resp.json()
 
+    _wait_for_pipeline(client, d["dataset_id"])
+
     report_resp = client.get(f"/api/v1/datasets/{d['dataset_id']}/quality-report")
     assert report_resp.status_code == 200
     body = report_resp.json()
@@ -105,6 +118,54 @@ def test_quality_report_endpoint(client):
     assert "ingestion" in body
     assert "header_detection" in body
 
+
+def test_cleaned_data_is_typed_parquet_with_csv_export(client, tmp_path):
+    content = "id,when,note\n1,2020-01-01,x\n2,2020-01-02,\n"
+    resp = client.post("/api/v1/datasets", files={"file": ("typed.csv", content, "text/csv")})
+    d = resp.json()
+    _wait_for_pipeline(client, d["dataset_id"])
+
+    assert (tmp_path / "datasets" / d["dataset_id"] / "cleaned.parquet").exists()
+    assert not (tmp_path / "datasets" / d["dataset_id"] / "cleaned.csv").exists()
+
+    preview = client.get(f"/api/v1/datasets/{d['dataset_id']}/preview", params={"use_cleaned": True}).json()
+    assert preview[0] == ["id", "when", "note"]
+    assert preview[1][0] == 1 and preview[1][1].startswith("2020-01-01")
+    assert preview[2][2] == "?"
+
+    export = client.get(f"/api/v1/datasets/{d['dataset_id']}/export")
+    assert export.status_code == 200
+    assert export.headers["content-type"].startswith("text/csv")
+    assert 'filename="typed_cleaned.csv"' in export.headers["content-disposition"]
+    assert export.text.splitlines() == ["id,when,note", "1,2020-01-01,x", "2,2020-01-02,"]
+
+
+def test_pipeline_status_endpoint_reports_steps(client):
+    resp = client.post("/api/v1/datasets", files={"file": ("p.csv", "a,b\n1,2\n", "text/csv")})
+    assert resp.status_code == 201
+    d = resp.json()
+    assert d["pipeline_job_id"]
+
+    status = _wait_for_pipeline(client, d["dataset_id"])
+
+    assert status["job_id"] == d["pipeline_job_id"]
+    assert status["status"] == "completed"
+    assert status["completed_steps"] == status["total_steps"]
+    assert [step["name"] for step in status["steps"]][0] == "ingestion"
+    assert all(step["status"] == "completed" for step in status["steps"])
+    assert all(step["duration_ms"] is not None for step in status["steps"])
+
+    missing = client.get("/api/v1/datasets/unknown/pipeline-status")
+    assert missing.status_code == 404
+
+    report = client.get(f"/api/v1/datasets/{d['dataset_id']}/quality-report").json()
+    assert report["metrics"]["ingestion"]["rows_out"] == 1
+
+    metrics = client.get("/api/v1/pipeline/metrics").json()
+    assert metrics["runs"] >= 1
+    assert metrics["steps"]["ingestion"]["wall_ms"]["p95"] >= metrics["steps"]["ingestion"]["wall_ms"]["p50"]
+
+
 def test_update_dataset_name(client):
     # upload
     resp = client.post("/api/v1/datasets", files={"file": ("old_name.csv", "a,b\n1,2\n", "text/csv")})
@@ -169,3 +230,33 @@ def test_update_nonexistent_dataset(client):
     resp = client.put("/api/v1/datasets/nonexistent-id", data={"original_name": "new.csv"})
     assert resp.status_code == 404
 
+
+
+def test_preview_pages_by_offset_with_total_count(client, tmp_path):
+    rows = "".join(f'{i},"note {i}\nline two",{i * 2}\n' for i in range(2500))
+    resp = client.post("/api/v1/datasets", files={"file": ("paged.csv", "id,note,double\n" + rows, "text/csv")})
+    d = resp.json()
+    _wait_for_pipeline(client, d["dataset_id"])
+
+    # The first raw page is served without scanning the file for the count; the cleaned
+    # Parquet file has it in its footer
+    first = client.get(f"/api/v1/datasets/{d['dataset_id']}/preview", params={"limit": 5})
+    assert first.status_code == 200 and len(first.json()) == 6
+    assert "x-total-count" not in first.headers
+    cleaned = client.get(f"/api/v1/datasets/{d['dataset_id']}/preview", params={"limit": 5, "use_cleaned": True})
+    assert cleaned.headers["x-total-count"] == "2500"
+
+    for use_cleaned in (False, True):
+        page = client.get(
+            f"/api/v1/datasets/{d['dataset_id']}/preview",
+            params={"offset": 2_498, "limit": 5, "use_cleaned": use_cleaned, "columns": ["double", "id"]},
+        )
+        assert page.status_code == 200
+        assert page.headers["x-total-count"] == "2500"
+        assert page.json() == [["double", "id"], [4996, 2498], [4998, 2499]]
+
+    past_end = client.get(f"/api/v1/datasets/{d['dataset_id']}/preview", params={"offset": 3_000})
+    assert past_end.json() == [["id", "note", "double"]]
+    # Once a later page has built the row index, the first page has the count too
+    again = client.get(f"/api/v1/datasets/{d['dataset_id']}/preview", params={"limit": 5})
+    assert again.headers["x-total-count"] == "2500"
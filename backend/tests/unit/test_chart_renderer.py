@@ -0,0 +1,32 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from app.renderers.chart_renderer import ChartRenderer
+from app.schemas.agent import AggregationOp, ChartSpec, ChartType
+
+
+def _spec(**overrides) -> ChartSpec:
+    return ChartSpec(chart_type=ChartType.BAR, x_column="city", title="Test", rationale="Test", **overrides)
+
+
+def test_categorical_x_column_only_groups_observed_categories(tmp_path) -> None:
+    # Cleaned text columns with few distinct values load as category
+    df = pd.DataFrame(
+        {
+            "city": pd.Categorical(["a", "b", "b", "c"], categories=["a", "b", "c", "d"]),
+            "amount": [1.0, 1.0, 1.0, np.nan],
+        }
+    )
+    renderer = ChartRenderer()
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", FutureWarning)
+        summed = renderer._prepare_categorical_frame(_spec(y_column="amount", aggregation=AggregationOp.SUM), df)
+        counted = renderer._prepare_categorical_frame(_spec(), df)
+
+    assert dict(zip(summed["city"].astype(str), summed["_value"])) == {"a": 1.0, "b": 2.0}
+    assert dict(zip(counted["city"].astype(str), counted["_value"])) == {"a": 1, "b": 2, "c": 1}
+    renderer.render(_spec(y_column="amount", aggregation=AggregationOp.SUM), df, str(tmp_path / "chart.png"))
+    assert (tmp_path / "chart.png").exists()
@@ -27,6 +27,9 @@ def chat_service(test_db):
         def _load_dataframe(self, meta, use_cleaned: bool = False, max_rows: int | None = None):
             return pd.DataFrame({"col1": [1, 2, 3], "col2": [4, 5, 6]})
 
+        def get_profile(self, dataset_id: str, profiler):
+            return profiler.profile(dataset_id, self._load_dataframe(self.get(dataset_id)))
+
     service = ChatService(dataset_service=FakeDatasetService())
     service.engine = test_db  # Override the engine for testing
     service.create_tables()
@@ -0,0 +1,52 @@
+import pytest
+
+from app.services.code_columns import analyze_columns, required_columns
+
+COLUMNS = ["date", "city", "amount", "qty", "note"]
+
+
+@pytest.mark.parametrize(
+    "code, expected",
+    [
+        ("s = df.groupby('city')['amount'].sum()\ns.plot.bar()", ["city", "amount"]),
+        ("print(df.amount.mean())", ["amount"]),
+        ("sub = df[(df['qty'] > 2) & df.city.isin(['Berlin'])]\nprint(sub['amount'].sum())", ["city", "amount", "qty"]),
+        ("print(df.loc[df['qty'] > 1, ['amount', 'note']])", ["amount", "qty", "note"]),
+        ("cols = ['amount', 'qty']\nprint(df[cols].corr())", ["amount", "qty"]),
+        ("for c in ['amount', 'qty']:\n    print(df[c].max())", ["amount", "qty"]),
+        ("print(df.groupby(['city']).agg({'amount': 'sum'}))", ["city", "amount"]),
+        ("top = df.sort_values('amount').head(5)\nprint(top[['city', 'amount']])", ["city", "amount"]),
+        ("print(df.query('amount > 5')['qty'].sum())", ["amount", "qty"]),
+        ("print(df.dropna(subset=['note'])['qty'].sum())", ["qty", "note"]),
+        ("df.plot(x='date', y='amount')", ["date", "amount"]),
+        ("print(len(df))", ["date"]),
+        ("print(df[df['note'].str.contains('late')]['qty'].sum())", ["qty", "note"]),
+    ],
+)
+def test_required_columns_follows_column_accesses(code, expected):
+    assert required_columns(code, COLUMNS) == expected
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "print(df.describe())",
+        "print(df.columns)",
+        "print(df.groupby('city').sum())",
+        "print(df[df.qty > 1].describe())",
+        "print(df.dropna()['amount'])",
+        "print(df.iloc[:, 2])",
+        "col = 'am' + 'ount'\nprint(df[col])",
+        "import seaborn as sns\nsns.pairplot(df)",
+        "print(df",
+        "other = pd.read_csv('other.csv')\nprint(df[other.columns.tolist()]['qty'].sum())",
+        "print(df[df['note'].str.upper()]['qty'].sum())",
+    ],
+)
+def test_required_columns_falls_back_to_all_columns_when_inconclusive(code):
+    assert required_columns(code, COLUMNS) is None
+
+
+def test_analyze_columns_reports_explicit_references():
+    use = analyze_columns("df['a'].sum()\ndf.loc[:, ['b', 'c']]\ndf.groupby('x')['d'].mean()")
+    assert use.columns == {"a", "b", "c", "d"} and use.complete
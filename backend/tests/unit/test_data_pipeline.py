@@ -0,0 +1,221 @@
+import io
+import threading
+
+from app.services.data_pipeline.pipeline import DataQualityPipeline, PipelineStep
+from app.services.data_pipeline.pipeline_services import inconsistencies, type_inference
+from app.services.storage import StorageService
+
+
+def _step(name, reads, writes, func):
+    return PipelineStep(name, func, reads=reads, writes=writes)
+
+
+def test_pipeline_runs_independent_steps_concurrently():
+    barrier = threading.Barrier(2, timeout=5)
+
+    def _source(context):
+        return {**context, "data": [3, 1, 2]}
+
+    def _left(context):
+        barrier.wait()
+        return {**context, "left": sorted(context["data"])}
+
+    def _right(context):
+        barrier.wait()
+        return {**context, "right": max(context["data"])}
+
+    def _join(context):
+        return {**context, "joined": (context["left"], context["right"])}
+
+    pipeline = DataQualityPipeline(
+        [
+            _step("source", (), ("data",), _source),
+            _step("left", ("data",), ("left",), _left),
+            _step("right", ("data",), ("right",), _right),
+            PipelineStep("join", _join),
+        ],
+        max_workers=2,
+    )
+
+    result = pipeline.run({})
+
+    assert result["joined"] == ([1, 2, 3], 3)
+
+
+def test_pipeline_skips_steps_after_pipeline_error_except_report():
+    calls = []
+
+    def _fail(context):
+        calls.append("ingestion")
+        return {**context, "pipeline_error": {"step": "ingestion"}}
+
+    def _never(context):
+        calls.append("schema_check")
+        return context
+
+    def _report(context):
+        calls.append("quality_report")
+        return {**context, "quality_report": {"error": context["pipeline_error"]["step"]}}
+
+    pipeline = DataQualityPipeline(
+        [
+            _step("ingestion", (), ("dataframe", "pipeline_error"), _fail),
+            _step("schema_check", ("dataframe",), ("schema_check",), _never),
+            PipelineStep("quality_report", _report),
+        ],
+        max_workers=4,
+    )
+
+    result = pipeline.run({})
+
+    assert calls == ["ingestion", "quality_report"]
+    assert result["quality_report"] == {"error": "ingestion"}
+    assert "schema_check" not in result
+
+
+def test_default_pipeline_report_is_deterministic_with_workers(tmp_path, monkeypatch):
+    from app.services.data_pipeline import pipeline as pipeline_module
+
+    storage = StorageService(tmp_path)
+    content = "City,Amount,When\nBerlin,1,2020-01-01\nberlin ,2,2020-01-02\nMunich,n/a,2020-01-03\n,,\n"
+    storage.save("datasets/raw.csv", io.BytesIO(content.encode("utf-8")))
+
+    def _report(workers, column_executor):
+        pipeline = pipeline_module.build_default_pipeline()
+        pipeline = DataQualityPipeline(
+            pipeline._steps, max_workers=workers, column_executor=column_executor, column_workers=2
+        )
+        result = pipeline.run({"dataset_id": "d1", "storage_key": "datasets/raw.csv", "storage": storage})
+        report = dict(result["quality_report"]["report"])
+        report.pop("generated_at")
+        assert set(report.pop("metrics")) == set(pipeline.step_names) - {"quality_report", "dataset_profile"}
+        return report
+
+    sequential = _report(1, "none")
+    assert _report(4, "thread") == sequential
+    assert _report(2, "process") == sequential
+    assert sequential["missing_values"]["rows_all_missing_removed"] == 1
+    assert sequential["inconsistencies"]["text_inconsistencies"]["city"]["inconsistent_values"]["berlin"]["count"] == 2
+
+
+def test_column_fan_out_uses_context_executor():
+    from concurrent.futures import ThreadPoolExecutor
+
+    import pandas as pd
+
+    df = pd.DataFrame({"a": ["1", "2"], "b": ["x", "X"], "c": ["2020-01-01", "2020-01-02"]})
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        inferred = type_inference.run({"dataframe": df, "column_executor": executor})["type_inference"]
+        result = inconsistencies.run({"dataframe": df, "type_inference": inferred, "column_executor": executor})
+
+    assert [inferred["columns"][name]["inferred_type"] for name in "abc"] == ["numeric", "string", "datetime"]
+    assert result["dataframe"]["b"].tolist() == ["x", "x"]
+
+
+def test_pipeline_records_step_metrics():
+    import pandas as pd
+
+    from app.services.data_pipeline.metrics import PipelineMetricsRegistry
+
+    def _load(context):
+        return {**context, "dataframe": pd.DataFrame({"a": ["x", "y", "z"]})}
+
+    def _filter(context):
+        return {**context, "dataframe": context["dataframe"].head(1)}
+
+    registry = PipelineMetricsRegistry()
+    pipeline = DataQualityPipeline(
+        [
+            _step("load", (), ("dataframe",), _load),
+            _step("filter", ("dataframe",), ("dataframe",), _filter),
+            PipelineStep("report", lambda context: {**context, "seen": sorted(context["pipeline_metrics"])}),
+        ],
+        metrics_registry=registry,
+        trace_memory=True,
+    )
+
+    for _ in range(3):
+        result = pipeline.run({})
+
+    metrics = result["pipeline_metrics"]
+    assert result["seen"] == ["filter", "load"]
+    assert list(metrics) == ["load", "filter", "report"]
+    assert metrics["load"]["rows_in"] is None and metrics["load"]["rows_out"] == 3
+    assert metrics["filter"]["rows_in"] == 3 and metrics["filter"]["rows_out"] == 1
+    assert metrics["filter"]["dataframe_bytes"] > 0
+    assert metrics["filter"]["wall_ms"] >= 0 and metrics["filter"]["cpu_ms"] >= 0
+    assert metrics["load"]["traced_delta_bytes"] is not None
+
+    summary = registry.summary()
+    assert summary["runs"] == 3
+    assert summary["steps"]["filter"]["count"] == 3
+    assert set(summary["steps"]["filter"]["wall_ms"]) == {"p50", "p95", "max"}
+
+
+def test_result_cache_reuses_artifacts_for_identical_content(tmp_path):
+    from app.services.data_pipeline import pipeline as pipeline_module
+    from app.services.data_pipeline.result_cache import PipelineResultCache
+
+    storage = StorageService(tmp_path)
+    cache = PipelineResultCache(storage, max_age_seconds=3600, max_bytes=10 * 1024 * 1024)
+    content = b"City,Amount\nBerlin,1\nberlin ,2\n"
+    events = []
+
+    def _run(dataset_id, pipeline):
+        key = f"datasets/{dataset_id}/raw.csv"
+        _, digest = storage.save_with_digest(key, io.BytesIO(content))
+        context = {"dataset_id": dataset_id, "storage_key": key, "storage": storage, "content_hash": digest}
+        return pipeline.run(context, listener=lambda event, step: events.append((dataset_id, event)))
+
+    pipeline = pipeline_module.build_default_pipeline(result_cache=cache)
+    first = _run("d1", pipeline)
+    assert "cache" not in first["quality_report"]["report"]
+
+    second = _run("d2", pipeline)
+    report = second["quality_report"]["report"]
+    assert report["dataset_id"] == "d2"
+    assert report["cache"]["hit"] is True and report["cache"]["source_dataset_id"] == "d1"
+    assert {event for dataset_id, event in events if dataset_id == "d2"} == {"cached"}
+    assert (tmp_path / "datasets/d2/cleaned.parquet").read_bytes() == (tmp_path / "datasets/d1/cleaned.parquet").read_bytes()
+
+    # A different step implementation means a different pipeline version: no hit, old entry evicted
+    steps = list(pipeline._steps)
+    steps[-1] = PipelineStep("quality_report", lambda context: pipeline_module._load_handler(
+        "quality_report", f"{pipeline_module.BASE_SERVICE_PATH}.quality_report"
+    )(context))
+    changed = DataQualityPipeline(steps, result_cache=cache)
+    assert changed.version != pipeline.version
+    third = _run("d3", changed)
+    assert "cache" not in third["quality_report"]["report"]
+    assert [path.parent.name for path in tmp_path.glob("pipeline_cache/*/*/entry.json")] == [changed.version]
+
+
+def test_pipeline_version_covers_cleaned_output_writer(monkeypatch):
+    from app.services.data_pipeline import pipeline as pipeline_module
+
+    # The cleaned Parquet file is written by a shared module, not by a step
+    pipeline = pipeline_module.build_default_pipeline()
+    version = pipeline.version
+    module_version = pipeline_module._module_version
+    monkeypatch.setattr(
+        pipeline_module,
+        "_module_version",
+        lambda path: "edited" if path == "app.services.data_pipeline.cleaned_output" else module_version(path),
+    )
+    assert DataQualityPipeline(list(pipeline._steps)).version != version
+
+
+def test_result_cache_evicts_least_recently_used_over_budget(tmp_path):
+    from app.services.data_pipeline.result_cache import PipelineResultCache
+
+    storage = StorageService(tmp_path)
+    cache = PipelineResultCache(storage, max_age_seconds=3600, max_bytes=150)
+    for name in ("a", "b"):
+        storage.save(f"datasets/{name}/quality_report.json", io.BytesIO(b'{"x": "' + b"0" * 90 + b'"}'))
+        cache.store(f"hash-{name}", "v1", name, {"storage_key": f"datasets/{name}/quality_report.json"})
+
+    assert cache.restore("hash-a", "v1", "c") is None
+    assert cache.restore("hash-b", "v1", "c")["report"]["cache"]["source_dataset_id"] == "b"
+
+    expired = PipelineResultCache(storage, max_age_seconds=-1, max_bytes=150)
+    assert expired.restore("hash-b", "v1", "c") is None
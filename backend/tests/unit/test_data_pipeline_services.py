@@ -1,15 +1,20 @@
 import io
 
+import numpy as np
 import pandas as pd
+import pytest
 
 from app.core.config import Settings
+from app.services.data_pipeline.models import EncodedFrame
 from app.services.data_pipeline.pipeline_services import (
     header_detection,
     inconsistencies,
     ingest,
     missing_values,
+    outlier_analysis,
     schema_check,
     type_inference,
+    type_materialization,
 )
 from app.services.storage import StorageService
 
@@ -78,6 +83,22 @@ def test_missing_values_normalization_and_stats():
     assert result["missing_values"]["stats"]["total_missing"] == 2
 
 
+def test_missing_values_uses_dataset_tokens():
+    df = pd.DataFrame({"a": ["?", " N/A ", "ok", "x"], "b": ["-", "1", "2", " ? "]})
+    result = missing_values.run({"dataframe": df, "missing_tokens": ["?", "-"]})
+    normalized = result["dataframe"]
+
+    # Custom tokens replace the defaults, so "N/A" is kept as a value here.
+    assert normalized["a"].tolist() == [" N/A ", "ok", "x"]
+    assert normalized["b"].isna().tolist() == [False, False, True]
+    assert result["missing_values"]["rows_all_missing_removed"] == 1
+    assert result["missing_values"]["tokens"] == ["?", "-"]
+
+    column = result["encoded_frame"].columns[1]
+    assert column.uniques.tolist() == ["1", "2"]
+    assert column.counts.tolist() == [1, 1]
+
+
 def test_missing_values_removes_all_missing_rows():
     df = pd.DataFrame({"a": ["", "ok"], "b": ["", "1"]})
     result = missing_values.run({"dataframe": df})
@@ -105,6 +126,46 @@ def test_type_inference_detects_common_types():
     assert inferred["flag"]["inferred_type"] == "boolean"
     assert inferred["date"]["inferred_type"] == "datetime"
     assert inferred["text"]["inferred_type"] == "string"
+    assert inferred["date"]["datetime_format"] == "%Y-%m-%d"
+    assert inferred["num"]["datetime_format"] is None
+
+
+def test_type_inference_detects_datetime_format_by_shape():
+    df = pd.DataFrame(
+        {
+            "european": ["03.01.2021", "13.02.2021", "28.12.2020", "oops"],
+            "ambiguous": ["01/02/2021", "03/04/2021", "05/06/2021", None],
+        }
+    )
+    result = type_inference.run({"dataframe": df})
+    inferred = result["type_inference"]["columns"]
+
+    assert inferred["european"]["datetime_format"] == "%d.%m.%Y"
+    assert inferred["european"]["confidence"] == 0.75
+    # Month-first and day-first both parse; the earlier candidate wins, as before
+    assert inferred["ambiguous"]["datetime_format"] == "%m/%d/%Y"
+
+    from app.services.data_pipeline.cleaned_output import typed_frame
+
+    typed = typed_frame(df, result["type_inference"])
+    assert typed["ambiguous"].tolist()[:3] == list(pd.to_datetime(["2021-01-02", "2021-03-04", "2021-05-06"]))
+
+
+def test_type_inference_samples_wide_columns_and_escalates_near_thresholds():
+    rows = 5_000
+    dates = pd.date_range("2000-01-01", periods=rows).strftime("%Y-%m-%d")
+    # 72% numeric: close enough to the confidence threshold that the sample must not decide
+    borderline = [str(i) if i % 25 < 18 else f"x{i}" for i in range(rows)]
+    df = pd.DataFrame({"ids": [str(i) for i in range(rows)], "dates": dates, "borderline": borderline})
+
+    inferred = type_inference.run({"dataframe": df})["type_inference"]["columns"]
+
+    assert inferred["ids"]["inferred_type"] == "numeric"
+    assert inferred["ids"]["sample_size"] == 1_000 and not inferred["ids"]["escalated"]
+    assert inferred["dates"]["inferred_type"] == "datetime" and not inferred["dates"]["escalated"]
+    assert inferred["borderline"]["escalated"]
+    assert inferred["borderline"]["confidence"] == pytest.approx(0.72)
+    assert inferred["borderline"]["inferred_type"] == "numeric"
 
 
 def test_inconsistencies_detects_text_variants():
@@ -117,3 +178,180 @@ def test_inconsistencies_detects_text_variants():
 
     assert "berlin" in inconsist
     assert len(inconsist["berlin"]["variants"]) >= 2
+
+
+def test_inconsistencies_groups_and_rewrites_from_distinct_values():
+    df = pd.DataFrame(
+        {"city": ["Ｂerlin", "berlin ", "Munich", "Berlin\t\tWest", "berlin  west", "Ｂerlin", "", None, "Hamburg"]}
+    )
+    inferred = type_inference.run({"dataframe": df})["type_inference"]
+    result = inconsistencies.run({"dataframe": df, "type_inference": inferred})
+    report = result["inconsistencies"]["text_inconsistencies"]["city"]["inconsistent_values"]
+
+    assert report == {
+        "berlin": {"variants": ["Ｂerlin", "berlin "], "count": 3},
+        "berlin west": {"variants": ["Berlin\t\tWest", "berlin  west"], "count": 2},
+    }
+    assert result["dataframe"]["city"].tolist()[:5] == ["berlin", "berlin", "munich", "berlin west", "berlin west"]
+    assert result["encoded_frame"].columns[0].uniques.tolist() == ["berlin", "munich", "berlin west", "", "hamburg"]
+
+
+def test_outlier_analysis_matches_row_level_detectors():
+    rng = np.random.default_rng(4)
+    amounts = np.round(rng.normal(100, 10, 5_000), 1)
+    amounts[[17, 4_000]] = [900.0, -300.0]
+    df = pd.DataFrame({"amount": amounts.astype(str), "city": rng.choice(["a", "b"], 5_000)})
+    df.loc[3, "amount"] = None
+    inferred = type_inference.run({"dataframe": df})["type_inference"]
+    options = outlier_analysis.OutlierOptions(isolation=True, sample_rows=0)
+    result = outlier_analysis.run({"dataframe": df, "type_inference": inferred, "outlier_options": options})
+    report = result["outlier_analysis"]
+
+    assert report["detectors"] == ["iqr", "mad", "isolation"]
+    assert list(report["columns"]) == ["amount"]
+    column = report["columns"]["amount"]
+    values = pd.to_numeric(df["amount"]).dropna()
+    q1, q3 = np.quantile(values, [0.25, 0.75])
+    iqr_flags = (values < q1 - 1.5 * (q3 - q1)) | (values > q3 + 1.5 * (q3 - q1))
+    assert column["value_count"] == 4_999 and not column["sampled"]
+    assert (column["iqr"]["q1"], column["iqr"]["q3"]) == pytest.approx((q1, q3))
+    assert column["iqr"]["count"] == int(iqr_flags.sum())
+    assert column["iqr"]["sample_indices"] == values.index[iqr_flags].tolist()[:10]
+    median = values.median()
+    robust_z = 0.6745 * (values - median).abs() / (values - median).abs().median()
+    assert column["mad"]["count"] == int((robust_z > 3.5).sum())
+    assert {17, 4_000} <= set(column["mad"]["sample_indices"])
+    assert 17 in column["isolation"]["sample_indices"]
+    scores = outlier_analysis._isolation_scores(values.to_numpy(), np.ones(len(values)), np.array([-300.0, 100.0, 900.0]))
+    assert scores[0] > 0.65 and scores[2] > 0.65 and scores[1] < 0.5
+    assert 2 <= column["isolation"]["count"] < column["iqr"]["count"] * 10
+
+    sampled = outlier_analysis.run(
+        {
+            "dataframe": df,
+            "type_inference": inferred,
+            "outlier_options": outlier_analysis.OutlierOptions(sample_rows=1_000),
+        }
+    )["outlier_analysis"]["columns"]["amount"]
+    assert sampled["sampled"] and sampled["sample_size"] == 1_000 and not sampled["counts_estimated"]
+    assert sampled["iqr"]["q1"] == pytest.approx(q1, rel=0.02)
+    assert 17 in sampled["mad"]["sample_indices"]
+
+
+def test_type_materialization_converts_and_reports_memory():
+    rows = 2_000
+    df = pd.DataFrame(
+        {
+            "id": [str(i) for i in range(rows)],
+            "price": ["1.5", "2.25"] * (rows // 2),
+            "city": ["berlin", "munich", None, "hamburg"] * (rows // 4),
+            "note": [f"note {i}" for i in range(rows)],
+            "day": ["2021-01-02", "2021-03-04"] * (rows // 2),
+        }
+    )
+    inferred = type_inference.run({"dataframe": df})["type_inference"]
+    result = type_materialization.run({"dataframe": df, "type_inference": inferred})
+    typed = result["typed_dataframe"]
+    report = result["type_materialization"]
+
+    assert [str(dtype) for dtype in typed.dtypes] == ["Int64", "Float64", "category", "string", "datetime64[ns]"]
+    assert list(typed["city"].cat.categories) == ["berlin", "munich", "hamburg"]
+    assert typed["city"].isna().sum() == rows // 4
+    assert report["columns"]["city"]["dtype"] == "category"
+    assert report["columns"]["city"]["memory_bytes_after"] < report["columns"]["city"]["memory_bytes_before"] / 4
+    assert report["memory_bytes_after"] < report["memory_bytes_before"]
+    assert report["memory_bytes_before"] == int(df.memory_usage(deep=True, index=False).sum())
+
+
+def test_ingest_engines_produce_same_frame(tmp_path):
+    storage = StorageService(tmp_path)
+    content = 'id,name,name,\n007,"Berlin, DE",x,\n2,,y,z\n'
+    storage.save("datasets/engines.csv", io.BytesIO(content.encode("utf-8")))
+
+    frames = {}
+    for engine in ingest.INGEST_ENGINES:
+        result = ingest.run(
+            {"storage_key": "datasets/engines.csv", "storage": storage, "ingest_engine": engine}
+        )
+        assert result["ingestion"]["engine"] == engine
+        assert result["ingestion"]["bad_row_count"] == 0
+        frames[engine] = result["dataframe"]
+
+    expected = frames["python"]
+    assert list(expected.columns) == ["id", "name", "name.1", "Unnamed: 3"]
+    for engine in ("pyarrow", "c"):
+        pd.testing.assert_frame_equal(frames[engine], expected)
+
+
+def test_ingest_falls_back_to_python_engine_for_bad_rows(tmp_path):
+    storage = StorageService(tmp_path)
+    content = "a,b\n1,2\n3,4,5\n6,7\n"
+    storage.save("datasets/bad.csv", io.BytesIO(content.encode("utf-8")))
+
+    for engine in ("pyarrow", "c"):
+        result = ingest.run(
+            {"storage_key": "datasets/bad.csv", "storage": storage, "ingest_engine": engine}
+        )
+        assert result["ingestion"]["engine"] == "python"
+        assert result["ingestion"]["bad_row_count"] == 1
+        assert result["ingestion"]["bad_row_samples"] == [["3", "4", "5"]]
+        assert result["ingestion"]["row_count"] == 2
+
+
+def test_encoded_frame_remap_and_row_filter_round_trip():
+    df = pd.DataFrame({"a": ["x", "X ", "x", "na"], "b": ["1", "1", "2", "na"]})
+    encoded = EncodedFrame.from_frame(df)
+
+    assert encoded.columns[0].distinct_count == 3
+    assert encoded.columns[0].counts.tolist() == [2, 1, 1]
+
+    remapped = encoded.with_columns(
+        [column.remap([pd.NA if v == "na" else v.strip().lower() for v in column.uniques]) for column in encoded.columns]
+    )
+    assert remapped.columns[0].uniques.tolist() == ["x"]
+    assert remapped.columns[0].null_count == 1
+
+    cleaned = remapped.take_rows(~remapped.all_missing_rows()).to_frame()
+    assert cleaned["a"].tolist() == ["x", "x", "x"]
+    assert cleaned["b"].tolist() == ["1", "1", "2"]
+    assert cleaned.index.tolist() == [0, 1, 2]
+
+
+def test_typed_frame_converts_only_lossless_columns():
+    from app.services.data_pipeline.cleaned_output import typed_frame
+
+    df = pd.DataFrame(
+        {
+            "n": ["1", "2", pd.NA],
+            "f": ["1.5", "2", "3"],
+            "zip": ["01234", "10115", "80331"],
+            "d": ["2020-01-01", "2020-01-02", "2020-01-03"],
+            "b": ["yes", "no", "y"],
+            "mixed": ["1", "2", "x"],
+        }
+    )
+    types = {"n": "numeric", "f": "numeric", "zip": "numeric", "d": "datetime", "b": "boolean", "mixed": "numeric"}
+    inferred = {"columns": {name: {"inferred_type": kind} for name, kind in types.items()}}
+
+    typed = typed_frame(df, inferred)
+
+    assert [str(dtype) for dtype in typed.dtypes] == [
+        "Int64", "Float64", "string", "datetime64[ns]", "boolean", "string"
+    ]
+    assert typed["n"].isna().tolist() == [False, False, True]
+    assert typed["zip"].tolist() == ["01234", "10115", "80331"]
+    assert typed["mixed"].tolist() == ["1", "2", "x"]
+
+
+def test_ingest_reads_headers_wider_than_the_sample_with_pyarrow(tmp_path):
+    storage = StorageService(tmp_path)
+    names = [f"measurement_column_{index:04d}" for index in range(600)]
+    content = ",".join(names) + "\n" + "\n".join(",".join(str(row) for _ in names) for row in range(3)) + "\n"
+    assert len(content.splitlines()[0]) > 8192
+    storage.save("datasets/wide.csv", io.BytesIO(content.encode("utf-8")))
+
+    result = ingest.run({"storage_key": "datasets/wide.csv", "storage": storage, "ingest_engine": "pyarrow"})
+
+    assert result["ingestion"]["engine"] == "pyarrow"
+    assert list(result["dataframe"].columns) == names
+    assert result["dataframe"].shape == (3, 600)
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.dataset_profiler import DatasetProfiler
+
+
+def _frame() -> pd.DataFrame:
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame(
+        {
+            "amount": rng.normal(size=500),
+            "count": pd.array(rng.integers(0, 5, 500), dtype="Int64"),
+            "city": rng.choice(["Berlin", "Munich", None], 500),
+            "day": pd.date_range("2021-01-01", periods=500),
+            "flag": rng.choice([True, False], 500),
+            "empty": [np.nan] * 500,
+            "single": [2.5] + [np.nan] * 499,
+        }
+    )
+    df.loc[::7, "amount"] = np.nan
+    df.loc[3, "count"] = pd.NA
+    return df
+
+
+def test_vectorized_profile_matches_per_column_mode():
+    df = _frame()
+    vectorized, vectorized_schema = DatasetProfiler(mode="vectorized").profile("d", df)
+    reference, reference_schema = DatasetProfiler(mode="per_column").profile("d", df)
+
+    assert vectorized_schema == reference_schema
+    assert vectorized.numeric_columns == ["amount", "count", "empty", "single"]
+    for fast, slow in zip(vectorized.columns, reference.columns):
+        assert fast.model_dump(exclude={"numeric_summary"}) == slow.model_dump(exclude={"numeric_summary"})
+        if slow.numeric_summary is None:
+            assert fast.numeric_summary is None
+            continue
+        for field, value in slow.numeric_summary.model_dump().items():
+            assert getattr(fast.numeric_summary, field) == pytest.approx(value, rel=1e-9, abs=1e-12)
+
+    single = next(column for column in vectorized.columns if column.name == "single")
+    assert single.numeric_summary.std == 0.0 and single.unique_count == 1
+
+
+def test_profiler_rejects_unknown_mode():
+    with pytest.raises(ValueError):
+        DatasetProfiler(mode="fast")
+
+
+def test_row_threshold_switches_to_sketches_and_chunks_merge():
+    df = _frame()
+    exact, exact_schema = DatasetProfiler(mode="vectorized").profile("d", df)
+    approximate, approximate_schema = DatasetProfiler(approx_row_threshold=len(df)).profile("d", df)
+
+    assert approximate_schema == exact_schema
+    assert approximate.numeric_columns == exact.numeric_columns
+    for sketched, reference in zip(approximate.columns, exact.columns):
+        assert sketched.approximate and sketched.error_bounds is not None
+        assert sketched.null_count == reference.null_count
+        assert sketched.unique_count == pytest.approx(reference.unique_count, rel=0.05)
+    city = next(column for column in approximate.columns if column.name == "city")
+    assert city.top_categories == next(column for column in exact.columns if column.name == "city").top_categories
+
+    profiler = DatasetProfiler(mode="approximate")
+    left, right = profiler.sketch(df), profiler.sketch(df)
+    left.update(df.iloc[:200])
+    right.update(df.iloc[200:])
+    left.merge(right)
+    merged, _ = profiler.profile_from_sketch("d", left)
+    for chunked, whole in zip(merged.columns, approximate.columns):
+        assert chunked.model_dump(exclude={"numeric_summary"}) == whole.model_dump(exclude={"numeric_summary"})
+        if whole.numeric_summary is not None:
+            for field, value in whole.numeric_summary.model_dump().items():
+                assert getattr(chunked.numeric_summary, field) == pytest.approx(value)
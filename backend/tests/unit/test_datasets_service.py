@@ -1,4 +1,5 @@
 import io
+from dataclasses import replace
 
 import pytest
 
@@ -146,3 +147,185 @@ def test_update_nonexistent_dataset(tmp_path):
         assert schema.row_count == 2
         assert len(schema.columns) == 2
         assert schema.columns[0].name == "col1"
+
+
+def test_load_dataframe_is_cached_until_update(tmp_path):
+    storage = StorageService(tmp_path)
+    svc = DatasetService(storage)
+    meta = svc.create_from_upload(DummyUpload("data.csv", b"a,b\n1,2\n"))
+    svc.wait_for_pipeline(meta.dataset_id, timeout=10)
+
+    first = svc._load_dataframe(meta, use_cleaned=True)
+    second = svc._load_dataframe(meta, use_cleaned=True)
+    assert first.equals(second)
+    assert svc.frame_cache_stats()["hits"] == 1
+
+    svc.update(meta.dataset_id, file=DummyUpload("data.csv", b"a,b\n5,6\n7,8\n"), use_cleaned=True)
+    assert svc._load_dataframe(meta, use_cleaned=True)["a"].tolist() == [5, 7]
+    assert svc.frame_cache_stats()["misses"] == 2
+
+
+@pytest.mark.parametrize(
+    "filename, content",
+    [
+        ("data.csv", b"a,b,c\n" + b"".join(f"{i},x{i},{i * 2}\n".encode() for i in range(30))),
+        ("data.json", b"".join(f'{{"a": {i}, "b": "x{i}", "c": {i * 2}}}\n'.encode() for i in range(30))),
+        ("data.json", ("[" + ",".join(f'{{"a": {i}, "b": "x{i}", "c": {i * 2}}}' for i in range(30)) + "]").encode()),
+    ],
+    ids=["csv", "json-lines", "json-array"],
+)
+def test_load_dataframe_pushes_down_columns_and_row_range(tmp_path, filename, content):
+    storage = StorageService(tmp_path)
+    svc = DatasetService(storage)
+    meta = svc.create_from_upload(DummyUpload(filename, content))
+    svc.wait_for_pipeline(meta.dataset_id, timeout=10)
+
+    # The pipeline ingests uploads as CSV, so only CSV has a comparable cleaned variant
+    for use_cleaned in (False, True) if filename.endswith(".csv") else (False,):
+        part = svc._load_dataframe(meta, use_cleaned=use_cleaned, columns=["c", "a", "missing"], start_row=10, max_rows=5)
+        assert list(part.columns) == ["c", "a"]
+        assert part["a"].tolist() == [10, 11, 12, 13, 14]
+        assert part.index.tolist() == [0, 1, 2, 3, 4]
+
+        # A cached full frame answers later projections and ranges
+        svc._frames.clear()
+        full = svc._load_dataframe(meta, use_cleaned=use_cleaned)
+        assert len(full) == 30 and list(full.columns) == ["a", "b", "c"]
+        hits = svc.frame_cache_stats()["hits"]
+        cached = svc._load_dataframe(meta, use_cleaned=use_cleaned, columns=["b"], start_row=28, max_rows=5)
+        assert cached["b"].tolist() == ["x28", "x29"]
+        assert svc.frame_cache_stats()["hits"] == hits + 1
+
+
+def test_profile_is_persisted_by_pipeline_and_recomputed_after_update(tmp_path, monkeypatch):
+    from app.services.dataset_profiler import DatasetProfiler
+
+    storage = StorageService(tmp_path)
+    svc = DatasetService(storage)
+    meta = svc.create_from_upload(DummyUpload("data.csv", b"a,b\n1,x\n2,y\n"))
+    svc.wait_for_pipeline(meta.dataset_id, timeout=10)
+    assert (tmp_path / "datasets" / meta.dataset_id / "profile.json").exists()
+
+    calls = []
+    original = DatasetProfiler.profile
+    monkeypatch.setattr(DatasetProfiler, "profile", lambda self, *args: calls.append(1) or original(self, *args))
+
+    profile, schema = svc.get_profile(meta.dataset_id)
+    assert profile.row_count == 2 and profile.numeric_columns == ["a"]
+    assert [field.name for field in schema] == ["a", "b"]
+    assert calls == []
+
+    svc.update(meta.dataset_id, file=DummyUpload("data.csv", b"a,b\n1,x\n2,y\n3,z\n"), use_cleaned=True)
+    assert svc.get_profile(meta.dataset_id)[0].row_count == 3
+    assert svc.get_profile(meta.dataset_id)[0].row_count == 3
+    assert calls == [1]
+    # Another approximation threshold shapes the profile differently
+    svc.get_profile(meta.dataset_id, DatasetProfiler(approx_row_threshold=2))
+    assert calls == [1, 1]
+
+
+def test_profiler_version_covers_the_sketches_module(monkeypatch):
+    import inspect
+
+    from app.services import profile_store, sketches
+
+    version = profile_store.profiler_version(1000)
+    getsource = inspect.getsource
+    monkeypatch.setattr(inspect, "getsource", lambda module: "edited" if module is sketches else getsource(module))
+    profile_store.profiler_version.cache_clear()
+    try:
+        assert profile_store.profiler_version(1000) != version
+    finally:
+        profile_store.profiler_version.cache_clear()
+
+
+def test_sandbox_snapshot_is_written_once_per_version(tmp_path):
+    from app.services.dataset_snapshots import read_snapshot
+
+    storage = StorageService(tmp_path)
+    svc = DatasetService(storage)
+    meta = svc.create_from_upload(DummyUpload("data.csv", b"a,b\n1,x\n2,y\n"))
+    svc.wait_for_pipeline(meta.dataset_id, timeout=10)
+
+    path, version = svc.sandbox_snapshot(meta.dataset_id)
+    written = path.stat().st_mtime_ns
+    assert svc.sandbox_snapshot(meta.dataset_id) == (path, version)
+    assert path.stat().st_mtime_ns == written
+    assert not path.stat().st_mode & 0o222
+    assert read_snapshot(path)["a"].tolist() == [1, 2]
+
+    svc.update(meta.dataset_id, file=DummyUpload("data.csv", b"a,b\n5,z\n"), use_cleaned=True)
+    new_path, new_version = svc.sandbox_snapshot(meta.dataset_id)
+    assert new_version != version and not path.exists()
+    assert read_snapshot(new_path)["a"].tolist() == [5]
+
+
+def test_uploads_above_the_size_limit_are_rejected(tmp_path):
+    storage = StorageService(tmp_path)
+    svc = DatasetService(storage)
+    svc._settings = replace(svc._settings, max_upload_size=8)
+    meta = svc.create_from_upload(DummyUpload("data.csv", b"a,b\n1,2\n"))
+
+    for attempt in (
+        lambda: svc.create_from_upload(DummyUpload("big.csv", b"a,b\n1,2\n3,4\n")),
+        lambda: svc.update(meta.dataset_id, file=DummyUpload("big.csv", b"a,b\n1,2\n3,4\n")),
+    ):
+        with pytest.raises(HTTPException) as exc:
+            attempt()
+        assert exc.value.status_code == 413
+
+    # The rejected update leaves the stored file as it was
+    assert (tmp_path / meta.storage_key).read_bytes() == b"a,b\n1,2\n"
+    assert len(svc.list_all()) == 1
+
+
+def test_sandbox_snapshot_hands_out_category_columns_as_text(tmp_path):
+    from app.services.dataset_snapshots import read_snapshot
+
+    storage = StorageService(tmp_path)
+    svc = DatasetService(storage)
+    content = "city,amount\n" + "Berlin,1\nMunich,2\n,3\nBerlin,4\n" * 10
+    meta = svc.create_from_upload(DummyUpload("data.csv", content.encode("utf-8")))
+    svc.wait_for_pipeline(meta.dataset_id, timeout=10)
+    assert svc._load_dataframe(meta, use_cleaned=True)["city"].dtype == "category"
+
+    df = read_snapshot(svc.sandbox_snapshot(meta.dataset_id)[0])
+    df["city"] = df["city"].fillna("Unknown")
+    totals = df.groupby("city")["amount"].sum()
+    assert totals.to_dict() == {"berlin": 50, "munich": 20, "Unknown": 30}
+
+
+def test_repeated_upload_restored_from_the_result_cache_keeps_its_profile(tmp_path, monkeypatch):
+    from app.services.dataset_profiler import DatasetProfiler
+
+    storage = StorageService(tmp_path)
+    svc = DatasetService(storage)
+    content = b"a,b\n1,x\n2,y\n"
+    first = svc.create_from_upload(DummyUpload("data.csv", content))
+    svc.wait_for_pipeline(first.dataset_id, timeout=10)
+    second = svc.create_from_upload(DummyUpload("again.csv", content))
+    svc.wait_for_pipeline(second.dataset_id, timeout=10)
+
+    report = svc.get_quality_report(second.dataset_id)
+    assert report["cache"]["hit"] is True
+    assert (tmp_path / "datasets" / second.dataset_id / "profile.json").exists()
+
+    calls = []
+    original = DatasetProfiler.profile
+    monkeypatch.setattr(DatasetProfiler, "profile", lambda self, *args: calls.append(1) or original(self, *args))
+    profile, _ = svc.get_profile(second.dataset_id)
+    assert profile.dataset_id == second.dataset_id and profile.row_count == 2
+    assert calls == []
+
+
+def test_update_refreshes_the_content_hash(tmp_path):
+    import hashlib
+
+    storage = StorageService(tmp_path)
+    svc = DatasetService(storage)
+    meta = svc.create_from_upload(DummyUpload("data.csv", b"a,b\n1,2\n"))
+    svc.wait_for_pipeline(meta.dataset_id, timeout=10)
+
+    updated = svc.update(meta.dataset_id, file=DummyUpload("data.csv", b"a,b\n3,4\n5,6\n"))
+    assert updated.content_hash == hashlib.sha256(b"a,b\n3,4\n5,6\n").hexdigest()
+    assert updated.size_bytes == len(b"a,b\n3,4\n5,6\n")
@@ -0,0 +1,79 @@
+import pandas as pd
+
+from app.services.frame_cache import DataFrameCache
+
+
+def _frame(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({"a": range(rows), "b": [f"value-{i}" for i in range(rows)]})
+
+
+def test_frame_cache_hits_misses_and_row_limits():
+    cache = DataFrameCache(max_bytes=10 * 1024 * 1024)
+    df = _frame(100)
+
+    assert cache.get("d1", "cleaned", (1, 10)) is None
+    cache.put("d1", "cleaned", (1, 10), df)
+
+    full = cache.get("d1", "cleaned", (1, 10))
+    assert full.equals(df)
+    full["extra"] = 1
+    assert "extra" not in cache.get("d1", "cleaned", (1, 10)).columns
+    assert len(cache.get("d1", "cleaned", (1, 10), max_rows=5)) == 5
+
+    # A new file version replaces the stale frame instead of serving it
+    assert cache.get("d1", "cleaned", (2, 10)) is None
+    cache.put("d1", "cleaned", (2, 10), _frame(3))
+    assert cache.stats()["entries"] == 1
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (3, 2, 0)
+
+
+def test_in_place_edits_of_returned_frames_do_not_leak_into_the_cache():
+    cache = DataFrameCache(max_bytes=10 * 1024 * 1024)
+    df = pd.DataFrame({"a": [1.0, None, 3.0], "b": ["x", "y", "z"]})
+    cache.put("d1", "cleaned", (1, 10), df)
+
+    # The frame passed to put stays the caller's own
+    df.loc[0, "a"] = 99.0
+    hit = cache.get("d1", "cleaned", (1, 10))
+    hit.fillna(0.0, inplace=True)
+    hit.loc[2, "b"] = "changed"
+
+    cached = cache.get("d1", "cleaned", (1, 10))
+    pd.testing.assert_frame_equal(cached, pd.DataFrame({"a": [1.0, None, 3.0], "b": ["x", "y", "z"]}))
+
+
+def test_frame_cache_evicts_least_recently_used_within_budget():
+    size = int(_frame(1000).memory_usage(index=True, deep=True).sum())
+    cache = DataFrameCache(max_bytes=int(size * 2.5))
+    for name in ("a", "b"):
+        cache.put(name, "raw", 1, _frame(1000))
+    assert cache.get("a", "raw", 1) is not None
+
+    cache.put("c", "raw", 1, _frame(1000))
+
+    assert cache.get("b", "raw", 1) is None
+    assert cache.get("a", "raw", 1) is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] <= cache.stats()["max_bytes"]
+
+    cache.put("huge", "raw", 1, _frame(10_000))
+    assert cache.get("huge", "raw", 1) is None
+
+    cache.invalidate("a")
+    assert cache.get("a", "raw", 1) is None
+
+
+def test_frame_cache_answers_projections_and_row_ranges():
+    cache = DataFrameCache(max_bytes=10 * 1024 * 1024)
+    cache.put("d1", "raw", 1, _frame(10)[["b"]], max_rows=None, columns=["b"])
+
+    assert cache.get("d1", "raw", 1, columns=["b"])["b"].tolist() == _frame(10)["b"].tolist()
+    assert cache.get("d1", "raw", 1, columns=["a", "b"]) is None
+    assert cache.get("d1", "raw", 1, max_rows=2, columns=["b"], start_row=8)["b"].tolist() == ["value-8", "value-9"]
+
+    cache.put("d1", "raw", 1, _frame(10))
+    projected = cache.get("d1", "raw", 1, max_rows=3, columns=["b", "a"], start_row=4)
+    assert list(projected.columns) == ["b", "a"]
+    assert projected["a"].tolist() == [4, 5, 6] and projected.index.tolist() == [0, 1, 2]
@@ -0,0 +1,129 @@
+from pathlib import Path
+
+from app.graph.nodes import AnalysisNodes, GraphDependencies
+from app.schemas.agent import AnalysisPlan, ClarificationRequest, DatasetProfile, FreeCodeSpec, OutputMode, SandboxResult
+from app.services.llm_cache import LLMResponseCache
+from app.services.llm_service import LLMService
+from app.state.workflow import WorkflowState
+
+
+class _FakeStructuredModel:
+    def __init__(self, calls: list):
+        self.calls = calls
+        self.response_model = ClarificationRequest
+
+    def with_structured_output(self, response_model):
+        self.response_model = response_model
+        return self
+
+    def invoke(self, messages):
+        self.calls.append(messages[-1].content)
+        if self.response_model is FreeCodeSpec:
+            return FreeCodeSpec(code=f"print({len(self.calls)})", code_goal="g", rationale="r")
+        return ClarificationRequest(reason="r", question=f"call {len(self.calls)}", options=["a"])
+
+
+class _FakeLLMService(LLMService):
+    def __init__(self, cache: LLMResponseCache, temperature: float = 0.1):
+        super().__init__(temperature=temperature, cache=cache)
+        self.calls: list = []
+
+    def _build_model(self):
+        return _FakeStructuredModel(self.calls)
+
+
+def _ask(service: LLMService, prompt: str) -> ClarificationRequest:
+    fallback = ClarificationRequest(reason="fallback", question="fallback", options=[])
+    return service._invoke_structured(ClarificationRequest, "system", prompt, fallback)
+
+
+def test_identical_structured_calls_are_answered_from_the_cache(tmp_path) -> None:
+    cache = LLMResponseCache(2, ttl_seconds=60, max_temperature=0.3, sqlite_path=tmp_path / "llm.sqlite3")
+    service = _FakeLLMService(cache)
+
+    first = _ask(service, "same question")
+    assert _ask(service, "same question") == first
+    assert _ask(service, "other question").question == "call 2"
+    assert service.calls == ["same question", "other question"]
+    assert cache.stats() == {
+        "hits": 1,
+        "disk_hits": 0,
+        "misses": 2,
+        "bypassed": 0,
+        "entries": 2,
+        "max_entries": 2,
+        "persistent": True,
+    }
+
+    # The SQLite tier outlives the in-memory one
+    reopened = LLMResponseCache(2, ttl_seconds=60, max_temperature=0.3, sqlite_path=tmp_path / "llm.sqlite3")
+    restarted = _FakeLLMService(reopened)
+    assert _ask(restarted, "same question") == first
+    assert restarted.calls == [] and reopened.stats()["disk_hits"] == 1
+
+    # Other model settings or expired entries are not served
+    assert _ask(_FakeLLMService(reopened, temperature=0.2), "same question").question == "call 1"
+    expired = LLMResponseCache(2, ttl_seconds=-1, max_temperature=0.3, sqlite_path=tmp_path / "llm.sqlite3")
+    assert _ask(_FakeLLMService(expired), "same question").question == "call 1"
+
+
+def test_calls_above_the_temperature_threshold_bypass_the_cache() -> None:
+    cache = LLMResponseCache(8, ttl_seconds=60, max_temperature=0.3)
+    service = _FakeLLMService(cache, temperature=0.9)
+
+    assert [_ask(service, "q").question for _ in range(2)] == ["call 1", "call 2"]
+    assert cache.stats()["bypassed"] == 2 and cache.stats()["entries"] == 0
+
+
+def test_rejected_free_code_is_not_served_again(tmp_path) -> None:
+    cache = LLMResponseCache(8, ttl_seconds=60, max_temperature=0.3, sqlite_path=tmp_path / "llm.sqlite3")
+    service = _FakeLLMService(cache)
+    nodes = AnalysisNodes(
+        GraphDependencies(
+            dataset_service=None,  # type: ignore[arg-type]
+            profiler=None,  # type: ignore[arg-type]
+            llm_service=service,
+            renderer=None,  # type: ignore[arg-type]
+            policies=None,  # type: ignore[arg-type]
+            storage_dir=Path(tmp_path),
+        )
+    )
+    state = WorkflowState(
+        user_question="Umsatz je Stadt",
+        dataset_profile=DatasetProfile(dataset_id="d", row_count=0, column_count=0, columns=[]),
+        analysis_plan=AnalysisPlan(
+            objective="o", strategy_summary="s", output_mode=OutputMode.FREE_CODE, rationale="r"
+        ),
+    )
+
+    first = state.model_copy(update=nodes.generate_free_code(state))
+    assert first.free_code_spec.code == "print(1)"
+    failed = first.model_copy(update={"sandbox_result": SandboxResult(success=False, stderr="KeyError: 'stadt'")})
+    assert nodes.review_sandbox_output(failed)["code_review_result"].approved is False
+
+    # Re-asking the same question asks the model again instead of replaying the failed code
+    again = state.model_copy(update=nodes.generate_free_code(state))
+    assert again.free_code_spec.code == "print(2)"
+    assert again.free_code_cache_key == first.free_code_cache_key
+    # Approved code stays cached
+    assert state.model_copy(update=nodes.generate_free_code(state)).free_code_spec.code == "print(2)"
+
+
+def test_sqlite_tier_keeps_only_the_newest_entries(tmp_path) -> None:
+    cache = LLMResponseCache(2, ttl_seconds=60, max_temperature=0.3, sqlite_path=tmp_path / "llm.sqlite3")
+    for name in ("a", "b", "c"):
+        cache.put(name, f'"{name}"')
+
+    reopened = LLMResponseCache(2, ttl_seconds=60, max_temperature=0.3, sqlite_path=tmp_path / "llm.sqlite3")
+    assert [reopened.get(name) for name in ("a", "b", "c")] == [None, '"b"', '"c"']
+
+
+def test_free_code_cache_key_follows_the_temperature_rule() -> None:
+    cache = LLMResponseCache(8, ttl_seconds=60, max_temperature=0.3)
+    plan = AnalysisPlan(objective="o", strategy_summary="s", output_mode=OutputMode.FREE_CODE, rationale="r")
+    profile = DatasetProfile(dataset_id="d", row_count=0, column_count=0, columns=[])
+
+    assert _FakeLLMService(cache).free_code_cache_key("q", plan, profile) is not None
+    # Sampled calls are never cached, so they have no key to discard either
+    assert _FakeLLMService(cache, temperature=0.9).free_code_cache_key("q", plan, profile) is None
+    assert cache.stats()["bypassed"] == 0
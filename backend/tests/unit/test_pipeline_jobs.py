@@ -0,0 +1,62 @@
+import threading
+
+import pytest
+
+from app.models.datasets import PipelineJobStatus, PipelineStepStatus
+from app.services.data_pipeline.pipeline import DataQualityPipeline, PipelineStep
+from app.services.pipeline_jobs import PipelineJobManager, PipelineQueueFull
+
+
+def _blocking_pipeline(release: threading.Event) -> DataQualityPipeline:
+    def _wait(context):
+        release.wait(5)
+        return context
+
+    return DataQualityPipeline([PipelineStep("wait", _wait), PipelineStep("done", lambda context: context)])
+
+
+def test_job_manager_rejects_submissions_when_queue_is_full():
+    release = threading.Event()
+    manager = PipelineJobManager(max_workers=1, max_queued=1)
+
+    running = manager.submit("d1", _blocking_pipeline(release), {})
+    queued = manager.submit("d2", _blocking_pipeline(release), {})
+    with pytest.raises(PipelineQueueFull):
+        manager.submit("d3", _blocking_pipeline(release), {})
+
+    release.set()
+    assert manager.wait(running.job_id, timeout=5).status == PipelineJobStatus.completed
+    assert manager.wait(queued.job_id, timeout=5).status == PipelineJobStatus.completed
+
+    # Capacity is released once jobs finish
+    again = manager.submit("d4", _blocking_pipeline(release), {})
+    assert manager.wait(again.job_id, timeout=5).status == PipelineJobStatus.completed
+
+
+def test_job_manager_tracks_failed_step():
+    def _boom(context):
+        raise ValueError("broken file")
+
+    manager = PipelineJobManager(max_workers=1, max_queued=0)
+    pipeline = DataQualityPipeline([PipelineStep("ingestion", _boom), PipelineStep("report", lambda c: c)])
+
+    job = manager.wait(manager.submit("d1", pipeline, {}).job_id, timeout=5)
+
+    assert job.status == PipelineJobStatus.failed
+    assert job.error == "ValueError: broken file"
+    assert job.steps[0].status == PipelineStepStatus.failed
+    assert job.steps[1].status == PipelineStepStatus.pending
+
+
+def test_job_manager_keeps_only_the_latest_finished_jobs():
+    manager = PipelineJobManager(max_workers=1, max_queued=4, max_finished=2)
+    pipeline = DataQualityPipeline([PipelineStep("done", lambda context: context)])
+
+    jobs = [manager.wait(manager.submit(f"d{i}", pipeline, {}).job_id, timeout=5) for i in range(4)]
+
+    assert all(job.status == PipelineJobStatus.completed for job in jobs)
+    for job in jobs[:2]:
+        with pytest.raises(KeyError):
+            manager.get(job.job_id)
+    assert [manager.get(job.job_id).dataset_id for job in jobs[2:]] == ["d2", "d3"]
+    assert len(manager._jobs) == len(manager._done) == 2
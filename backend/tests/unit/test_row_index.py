@@ -0,0 +1,32 @@
+import io
+
+import pandas as pd
+import pytest
+
+from app.services import row_index
+from app.services.row_index import build_row_index, read_indexed_rows
+
+
+@pytest.mark.parametrize("block_bytes", [7, 1024])
+def test_csv_row_index_reads_the_same_rows_as_a_full_parse(monkeypatch, block_bytes):
+    # Quoted newlines and quotes, blank lines, CRLF endings and no final newline
+    monkeypatch.setattr(row_index, "_BLOCK_BYTES", block_bytes)
+    lines = ["id,text"] + [f'{i},"say ""hi""\r\n{i}"' if i % 3 == 0 else f"{i},plain" for i in range(40)]
+    lines.insert(10, "")
+    content = "\r\n".join(lines).encode()
+    full = pd.read_csv(io.BytesIO(content))
+
+    index = build_row_index(io.BytesIO(content), stride=6, csv=True)
+    assert index.row_count == len(full) == 40
+    assert index.header == ["id", "text"]
+    for start, limit in [(0, 5), (5, 7), (17, 1), (36, 10), (40, 3)]:
+        part = read_indexed_rows(io.BytesIO(content), index, start, limit, columns=["text", "id"])
+        expected = full.iloc[start : start + limit][["text", "id"]].reset_index(drop=True)
+        pd.testing.assert_frame_equal(part, expected, check_index_type=False, check_dtype=False)
+
+
+def test_json_lines_row_index_skips_blank_lines():
+    content = b"".join(f'{{"a": {i}}}\n'.encode() + (b"\n" if i % 4 == 0 else b"") for i in range(25))
+    index = build_row_index(io.BytesIO(content), stride=4, csv=False)
+    assert index.row_count == 25 and index.header is None
+    assert read_indexed_rows(io.BytesIO(content), index, 21, 10)["a"].tolist() == [21, 22, 23, 24]
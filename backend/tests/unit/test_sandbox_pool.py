@@ -0,0 +1,92 @@
+import os
+
+import pandas as pd
+import pytest
+
+from app.services.dataset_snapshots import SnapshotStore
+from app.services.sandbox_pool import SandboxLimits, SandboxPool
+from app.services.storage import StorageService
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="warm sandbox workers need os.fork")
+
+
+@pytest.fixture
+def pool():
+    pool = SandboxPool(1, timeout_seconds=1, stdout_limit=20)
+    yield pool
+    pool.close()
+
+
+def test_warm_worker_runs_jobs_in_isolated_children(pool, tmp_path):
+    frame = pd.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"]})
+    dataset = SnapshotStore(StorageService(tmp_path)).path("data", "v1", lambda: frame)
+
+    def run(code, columns=("a",)):
+        return pool.run(code, tmp_path, dataset, "v1", tmp_path / "out.png", columns)
+
+    first = run("df['b'] = 1\nprint(df['a'].sum())")
+    assert (first.exit_code, first.stdout, first.timed_out) == (0, "6\n", False)
+    # The worker's frame is untouched by the previous job
+    assert run("print(list(df.columns))").stdout == "['a']\n"
+    assert run("print(list(df.columns))", columns=None).stdout == "['a', 'b']\n"
+    assert run("print('x' * 100)").stdout == "x" * 20
+    failed = run("1 / 0")
+    assert failed.exit_code == 1 and "ZeroDivisionError" in failed.stderr
+    assert run("import sys\nsys.exit(3)").exit_code == 3
+
+    timed_out = run("while True:\n    pass")
+    assert timed_out.timed_out and timed_out.exit_code == -1
+    # The worker survives the killed job
+    assert run("plt.plot([1, 2])\nplt.savefig(OUTPUT_PATH)").exit_code == 0
+    assert (tmp_path / "out.png").exists()
+
+
+def test_runs_are_held_to_resource_limits_and_accounted(tmp_path):
+    limits = SandboxLimits(cpu_seconds=1, memory_bytes=256 * 1024 * 1024, file_size_bytes=64 * 1024)
+    pool = SandboxPool(1, timeout_seconds=10, limits=limits)
+    dataset = SnapshotStore(StorageService(tmp_path)).path("data", "v1", lambda: pd.DataFrame({"a": [1, 2, 3]}))
+
+    def run(code):
+        return pool.run(code, tmp_path, dataset, "v1", tmp_path / "out.png")
+
+    try:
+        ok = run("print(df['a'].sum())")
+        assert (ok.exit_reason, ok.stdout) == ("ok", "6\n")
+        assert ok.cpu_seconds is not None and ok.peak_rss_bytes > 0 and ok.wall_seconds > 0
+        assert run("1 / 0").exit_reason == "error"
+
+        spinning = run("while True:\n    pass")
+        assert spinning.exit_reason == "cpu_limit" and not spinning.timed_out
+        assert spinning.cpu_seconds >= 0.9
+        assert run("block = bytearray(1024 * 1024 * 1024)").exit_reason == "memory_limit"
+        assert run("open('big.bin', 'wb').write(b'x' * 1024 * 1024)").exit_reason == "file_size_limit"
+        # Limits apply to the child only; the worker keeps serving jobs
+        assert run("block = bytearray(128 * 1024 * 1024)").exit_reason == "ok"
+    finally:
+        pool.close()
+
+    summary = pool.metrics.summary()
+    assert summary["runs"] == 6
+    assert summary["exit_reasons"] == {"ok": 2, "error": 1, "cpu_limit": 1, "memory_limit": 1, "file_size_limit": 1}
+    assert summary["cpu_seconds"]["max"] >= 0.9
+    assert summary["wait_seconds"] is not None
+
+
+def test_job_code_cannot_answer_for_the_worker(pool, tmp_path):
+    dataset = SnapshotStore(StorageService(tmp_path)).path("data", "v1", lambda: pd.DataFrame({"a": [1]}))
+
+    def run(code):
+        return pool.run(code, tmp_path, dataset, "v1", tmp_path / "out.png")
+
+    forged = '{"exit_code": 0, "stdout": "FORGED", "stderr": "", "exit_reason": "ok"}\n'
+    spoofing = run(
+        "import os\n"
+        "for fd in range(3, 1024):\n"
+        "    try:\n"
+        f"        os.write(fd, {forged.encode()!r})\n"
+        "    except OSError:\n"
+        "        pass\n"
+        "print('done')"
+    )
+    assert spoofing.stdout == "done\n"
+    assert [run(f"print({n})").stdout for n in range(2)] == ["0\n", "1\n"]
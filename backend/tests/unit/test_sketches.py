@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.sketches import HeavyHitters, HyperLogLog, Moments, QuantileSketch
+
+
+def test_hyperloglog_estimate_is_within_error_and_mergeable():
+    values = pd.Series(np.arange(200_000)).astype(str)
+    whole = HyperLogLog()
+    whole.update(values)
+    left, right = HyperLogLog(), HyperLogLog()
+    left.update(values[:120_000])
+    right.update(values[80_000:])
+    left.merge(right)
+
+    assert left.estimate() == whole.estimate()
+    assert whole.estimate() == pytest.approx(200_000, rel=4 * whole.relative_error)
+
+    small = HyperLogLog()
+    small.update(pd.Series(["a", "b", "c", None, "a"]))
+    assert small.estimate() == 3
+
+
+def test_quantile_sketch_stays_small_and_within_rank_error():
+    values = np.random.default_rng(0).lognormal(size=300_000)
+    sketch = QuantileSketch()
+    for chunk in np.array_split(values, 17):
+        other = QuantileSketch()
+        other.update(chunk)
+        sketch.merge(other)
+
+    ordered = np.sort(values)
+    assert sketch.count == len(values)
+    assert sum(len(level) for level in sketch.levels) < 10 * sketch.k
+    for q in (0.01, 0.25, 0.5, 0.75, 0.99):
+        rank = np.searchsorted(ordered, sketch.quantile(q)) / len(values)
+        assert abs(rank - q) <= sketch.rank_error
+
+
+def test_heavy_hitters_counts_are_bounded_lower_bounds():
+    rng = np.random.default_rng(1)
+    values = pd.Series(np.concatenate([np.repeat(["x", "y"], [5_000, 3_000]), rng.integers(0, 10_000, 20_000).astype(str)]))
+    values = values.sample(frac=1, random_state=2)
+    sketch = HeavyHitters(capacity=16)
+    for chunk in np.array_split(values, 9):
+        sketch.update(chunk)
+
+    truth = values.value_counts()
+    (first, first_count), (second, second_count) = sketch.top(2)
+    assert (first, second) == ("x", "y")
+    for value, count in ((first, first_count), (second, second_count)):
+        assert truth[value] - sketch.error <= count <= truth[value]
+    assert sketch.total == len(values)
+
+
+def test_moments_merge_matches_numpy():
+    values = np.random.default_rng(2).normal(size=1_000)
+    left, right = Moments(), Moments()
+    left.update(values[:300])
+    right.update(values[300:])
+    left.merge(right)
+    assert (left.count, left.minimum, left.maximum) == (1_000, values.min(), values.max())
+    assert left.mean == pytest.approx(values.mean())
+    assert left.std == pytest.approx(values.std(ddof=1))
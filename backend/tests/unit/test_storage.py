@@ -19,3 +19,19 @@ def test_save_and_delete(tmp_path):
 
     storage.delete(key)
     assert not path.exists()
+
+
+def test_save_with_digest_and_copy(tmp_path):
+    import hashlib
+
+    storage = StorageService(tmp_path)
+    data = b"a,b\n1,2\n" * 1000
+
+    size, digest = storage.save_with_digest("datasets/x/raw.csv", io.BytesIO(data))
+    assert size == len(data)
+    assert digest == hashlib.sha256(data).hexdigest()
+
+    assert storage.copy("datasets/x/raw.csv", "cache/raw.csv") == len(data)
+    assert storage.glob("cache/*") == ["cache/raw.csv"]
+    storage.delete_prefix("cache")
+    assert not storage.exists("cache/raw.csv")
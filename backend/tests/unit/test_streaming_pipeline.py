@@ -0,0 +1,157 @@
+import io
+import os
+from pathlib import Path
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+
+from app.services.data_pipeline.cleaned_output import read_parquet
+from app.services.data_pipeline.pipeline import DataQualityPipeline, build_default_pipeline
+from app.services.data_pipeline import streaming
+from app.services.data_pipeline.pipeline_services.outlier_analysis import OutlierOptions
+from app.services.data_pipeline.streaming import StreamingQualityPipeline
+from app.services.storage import StorageService
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+# Set to e.g. 3000000000 to run the bounded-memory check on a multi-GB file
+LARGE_FILE_BYTES = int(os.environ.get("MNEMOS_STREAMING_TEST_BYTES", 40 * 1024 * 1024))
+
+_PEAK_RSS_SCRIPT = """
+import resource, sys
+from app.services.data_pipeline.pipeline_services.outlier_analysis import OutlierOptions
+from app.services.data_pipeline.streaming import StreamingQualityPipeline
+from app.services.storage import StorageService
+
+storage = StorageService(sys.argv[1])
+# The outlier sample is bounded separately from the chunks; keep it small so only chunks count
+pipeline = StreamingQualityPipeline(chunk_rows=20_000, row_group_size=10_000, outlier_options=OutlierOptions(sample_rows=20_000))
+result = pipeline.run(
+    {"dataset_id": sys.argv[2], "storage_key": sys.argv[3], "storage": storage}
+)
+assert not result.get("pipeline_error"), result.get("pipeline_error")
+print(result["quality_report"]["report"]["missing_values"]["row_count_after"])
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024)
+"""
+
+
+def _write_csv(path: Path, size_bytes: int) -> None:
+    # Append generated blocks until the file reaches the requested size.
+    rng = np.random.default_rng(5)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    header = True
+    offset = 0
+    with open(path, "w", encoding="utf-8") as handle:
+        while handle.tell() < size_bytes:
+            rows = 50_000
+            block = pd.DataFrame(
+                {
+                    "id": np.arange(offset, offset + rows),
+                    "amount": np.round(rng.normal(100, 25, rows), 2),
+                    "city": rng.choice(["Berlin", "berlin", "Munich", "n/a", "Hamburg "], rows),
+                    "day": pd.Timestamp("2000-01-01") + pd.to_timedelta(rng.integers(0, 9000, rows), unit="D"),
+                    "note": rng.choice(["ok", "late", "", "damaged"], rows),
+                }
+            )
+            block["day"] = block["day"].dt.strftime("%Y-%m-%d")
+            block.to_csv(handle, index=False, header=header)
+            header = False
+            offset += rows
+
+
+def _peak_rss(storage_dir: Path, dataset_id: str, storage_key: str) -> tuple[int, int]:
+    output = subprocess.run(
+        [sys.executable, "-c", _PEAK_RSS_SCRIPT, str(storage_dir), dataset_id, storage_key],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout.split()
+    return int(output[-2]), int(output[-1])
+
+
+def test_streaming_pipeline_matches_in_memory_pipeline(tmp_path):
+    storage = StorageService(tmp_path)
+    rng = np.random.default_rng(0)
+    rows = 12_000
+    df = pd.DataFrame(
+        {
+            "Order ID": np.arange(rows).astype(str),
+            "Amount": np.round(rng.normal(50, 10, rows), 2).astype(str),
+            "City": rng.choice(["Berlin", "berlin ", "Munich", "N/A", ""], rows),
+            "Day": pd.date_range("2001-01-01", periods=rows, freq="h").strftime("%d.%m.%Y"),
+            "Flag": rng.choice(["yes", "no"], rows),
+            "Zip": rng.choice(["01234", "10115"], rows),
+        }
+    )
+    df.loc[5] = [""] * df.shape[1]
+    content = df.to_csv(index=False).encode("utf-8")
+
+    reports = {}
+    cleaned = {}
+    pipelines = {
+        "memory": build_default_pipeline(),
+        "stream": StreamingQualityPipeline(chunk_rows=2_000, row_group_size=5_000),
+    }
+    for name, pipeline in pipelines.items():
+        storage.save(f"datasets/{name}/raw.csv", io.BytesIO(content))
+        events = []
+        result = pipeline.run(
+            {"dataset_id": name, "storage_key": f"datasets/{name}/raw.csv", "storage": storage},
+            listener=lambda event, step: events.append((event, step)),
+        )
+        assert result.get("pipeline_error") is None
+        assert (tmp_path / "datasets" / name / "profile.json").exists()
+        reports[name] = result["quality_report"]["report"]
+        with storage.open(result["quality_report"]["cleaned_storage_key"]) as handle:
+            cleaned[name] = read_parquet(handle)
+
+    assert isinstance(pipelines["memory"], DataQualityPipeline)
+    assert {event for event, _ in events} == {"start", "end"}
+    assert reports["stream"]["ingestion"]["chunk_count"] > 1
+    for section in ("header_detection", "schema_check", "missing_values", "inconsistencies", "outlier_analysis"):
+        assert reports["stream"][section] == reports["memory"][section]
+    for column, details in reports["memory"]["type_inference"]["columns"].items():
+        streamed = reports["stream"]["type_inference"]["columns"][column]
+        assert (streamed["inferred_type"], streamed["datetime_format"]) == (details["inferred_type"], details["datetime_format"])
+    pd.testing.assert_frame_equal(cleaned["stream"], cleaned["memory"])
+
+
+def test_streaming_pipeline_memory_is_bounded_by_chunk_size(tmp_path):
+    small_key, large_key = "datasets/small/raw.csv", "datasets/large/raw.csv"
+    small_bytes = LARGE_FILE_BYTES // 4
+    _write_csv(tmp_path / small_key, small_bytes)
+    _write_csv(tmp_path / large_key, LARGE_FILE_BYTES)
+
+    small_rows, small_peak = _peak_rss(tmp_path, "small", small_key)
+    large_rows, large_peak = _peak_rss(tmp_path, "large", large_key)
+
+    assert large_rows > 3 * small_rows
+    # Loading the file whole as text would grow peak memory by several times the extra bytes
+    assert large_peak - small_peak < LARGE_FILE_BYTES - small_bytes
+    assert (tmp_path / "datasets" / "large" / "cleaned.parquet").exists()
+
+
+def test_streaming_summaries_stay_bounded_for_high_cardinality_columns(tmp_path, monkeypatch):
+    monkeypatch.setattr(streaming, "_MAX_TRACKED_VARIANTS", 50)
+    storage = StorageService(tmp_path)
+    rows = 3_000
+    df = pd.DataFrame(
+        {
+            "note": [f"free text {i}" for i in range(rows)],
+            "city": ["Berlin", "berlin "] * (rows // 2),
+            "amount": np.arange(rows, dtype=float),
+        }
+    )
+    storage.save("datasets/d/raw.csv", io.BytesIO(df.to_csv(index=False).encode("utf-8")))
+
+    pipeline = StreamingQualityPipeline(chunk_rows=500, row_group_size=1_000, outlier_options=OutlierOptions(sample_rows=200))
+    report = pipeline.run({"dataset_id": "d", "storage_key": "datasets/d/raw.csv", "storage": storage})["quality_report"]["report"]
+
+    texts = report["inconsistencies"]["text_inconsistencies"]
+    assert texts["note"]["truncated"] is True
+    assert "truncated" not in texts["city"]
+    assert texts["city"]["inconsistent_values"]["berlin"]["count"] == rows
+    amount = report["outlier_analysis"]["columns"]["amount"]
+    assert (amount["sample_size"], amount["value_count"]) == (200, rows)